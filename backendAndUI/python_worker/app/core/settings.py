@@ -38,6 +38,73 @@ class Settings:
         self.aura_agent_client_secret: str | None = os.getenv("AURA_AGENT_CLIENT_SECRET")
         self.aura_agent_endpoint_url: str | None = os.getenv("AURA_AGENT_ENDPOINT_URL")
 
+        # In-process autocomplete index
+        self.autocomplete_index_enabled: bool = os.getenv("AUTOCOMPLETE_INDEX_ENABLED", "true").lower() == "true"
+        try:
+            self.autocomplete_refresh_seconds: int = int(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "30"))
+        except ValueError:
+            self.autocomplete_refresh_seconds = 30
+        try:
+            self.autocomplete_rebuild_seconds: int = int(os.getenv("AUTOCOMPLETE_REBUILD_SECONDS", "1800"))
+        except ValueError:
+            self.autocomplete_rebuild_seconds = 1800
+
+        # In-memory graph projection for pathway queries
+        try:
+            self.graph_projection_check_seconds: float = float(os.getenv("GRAPH_PROJECTION_CHECK_SECONDS", "2"))
+        except ValueError:
+            self.graph_projection_check_seconds = 2.0
+        try:
+            self.graph_projection_rebuild_seconds: int = int(os.getenv("GRAPH_PROJECTION_REBUILD_SECONDS", "3600"))
+        except ValueError:
+            self.graph_projection_rebuild_seconds = 3600
+
+        # Batched entity consolidation
+        try:
+            self.consolidation_batch_size: int = int(os.getenv("CONSOLIDATION_BATCH_SIZE", "200"))
+        except ValueError:
+            self.consolidation_batch_size = 200
+        try:
+            self.consolidation_parallelism: int = int(os.getenv("CONSOLIDATION_PARALLELISM", "1"))
+        except ValueError:
+            self.consolidation_parallelism = 1
+        try:
+            self.consolidation_stats_reconcile_seconds: int = int(os.getenv("CONSOLIDATION_STATS_RECONCILE_SECONDS", "3600"))
+        except ValueError:
+            self.consolidation_stats_reconcile_seconds = 3600
+
+        # Workspace access checks: per-process and shared (Redis) cache lifetimes
+        self.permission_cache_redis: bool = os.getenv("PERMISSION_CACHE_REDIS", "true").lower() == "true"
+        try:
+            self.permission_cache_ttl_seconds: int = int(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "60"))
+        except ValueError:
+            self.permission_cache_ttl_seconds = 60
+        try:
+            self.permission_cache_local_ttl_seconds: int = int(os.getenv("PERMISSION_CACHE_LOCAL_TTL_SECONDS", "5"))
+        except ValueError:
+            self.permission_cache_local_ttl_seconds = 5
+
+        # Maintained review/workspace counters are recounted on this interval
+        try:
+            self.stats_reconcile_seconds: int = int(os.getenv("STATS_RECONCILE_SECONDS", "3600"))
+        except ValueError:
+            self.stats_reconcile_seconds = 3600
+
+        # Scheduled centrality analytics (degree, PageRank, betweenness)
+        self.centrality_enabled: bool = os.getenv("CENTRALITY_ENABLED", "true").lower() == "true"
+        try:
+            self.centrality_check_seconds: int = int(os.getenv("CENTRALITY_CHECK_SECONDS", "600"))
+        except ValueError:
+            self.centrality_check_seconds = 600
+        try:
+            self.centrality_version_threshold: int = int(os.getenv("CENTRALITY_VERSION_THRESHOLD", "50"))
+        except ValueError:
+            self.centrality_version_threshold = 50
+        try:
+            self.centrality_betweenness_samples: int = int(os.getenv("CENTRALITY_BETWEENNESS_SAMPLES", "64"))
+        except ValueError:
+            self.centrality_betweenness_samples = 64
+
 
 settings = Settings()
 
@@ -39,6 +39,12 @@ from .routes.aura_agent import router as aura_agent_router
 from .routes.conversations import router as conversations_router
 from .routes.workspaces import router as workspaces_router
 from .routes.migrate import router as migrate_router
+from .routes.consolidation import router as consolidation_router
+from .services.autocomplete_index import autocomplete_index
+from .services.centrality_service import start_centrality_scheduler
+from .services.entity_consolidation import start_consolidation_stats_scheduler
+from .services.stats_counters import start_stats_reconciler
+from .core.settings import settings
 
 
 app = FastAPI(title="Knowledge Synthesis Worker", version="0.1.0")
@@ -49,6 +55,12 @@ async def startup_event():
     logger.info("=" * 60)
     logger.info("Knowledge Synthesis Worker - Application Starting")
     logger.info("=" * 60)
+    if settings.autocomplete_index_enabled:
+        autocomplete_index.build_in_background()
+    if settings.centrality_enabled:
+        start_centrality_scheduler()
+    start_consolidation_stats_scheduler()
+    start_stats_reconciler()
 
 
 @app.on_event("shutdown")
@@ -120,3 +132,4 @@ app.include_router(aura_agent_router, prefix="/api/agent", tags=["aura-agent"])
 app.include_router(conversations_router, prefix="/api", tags=["conversations"])
 app.include_router(workspaces_router, prefix="/api", tags=["workspaces"])
 app.include_router(migrate_router, prefix="/api", tags=["migrate"])
+app.include_router(consolidation_router, prefix="/api/consolidation", tags=["consolidation"])
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -33,6 +33,9 @@ class WorkspaceStats(BaseModel):
     entity_count: int = 0
     relationship_count: int = 0
     member_count: int = 0
+    unverified_count: int = 0
+    verified_count: int = 0
+    incorrect_count: int = 0
     last_activity: Optional[datetime] = None
 
 
@@ -79,7 +82,7 @@ class InviteMemberRequest(BaseModel):
 
 class UpdateMemberRequest(BaseModel):
     """Request to update a member's role or permissions."""
-    role: Optional[str] = None
+    role: Optional[Literal["editor", "viewer"]] = None
     permissions: Optional[WorkspacePermissions] = None
 
 
@@ -5,28 +5,49 @@ from ..services.entity_consolidation import (
     consolidate_identical_entities,
     find_duplicate_entities,
     merge_specific_entities,
-    get_consolidation_stats
+    get_consolidation_stats,
+    schedule_consolidation,
+    consolidation_status,
+    check_apoc
 )
+from ..services.duplicate_detection import find_duplicate_candidates
 
 router = APIRouter()
 
 
 @router.post("/consolidate")
-def consolidate_entities():
+def consolidate_entities(
+    batch_size: Optional[int] = Q(None, ge=1, le=10000, description="Duplicate groups merged per transaction"),
+    parallelism: Optional[int] = Q(None, ge=1, le=16, description="Batches merged concurrently"),
+    background: bool = Q(False, description="Start the consolidation and return immediately")
+):
     """
     Consolidate all identical entities in the knowledge graph using APOC.
     
     This endpoint identifies entities with the same name and type, then merges them
     using APOC's mergeNodes function, consolidating all their relationships.
+    Groups are merged in bounded batches; progress is available from
+    /consolidate/status, and an interrupted run resumes where it left off.
     """
+    if background:
+        started = schedule_consolidation(batch_size, parallelism)
+        return {
+            "started": started,
+            "message": "Consolidation started" if started else "Consolidation already in progress",
+            "success": True
+        }
+
     try:
-        result = consolidate_identical_entities()
+        result = consolidate_identical_entities(batch_size, parallelism)
         
         if result["success"]:
             return {
                 "message": result["message"],
                 "merged_entity_groups": result["merged_entity_groups"],
+                "merged_entity_nodes": result["merged_entity_nodes"],
                 "merged_entity_names": result["merged_entity_names"],
+                "batches": result["batches"],
+                "resumed": result["resumed"],
                 "success": True
             }
         else:
@@ -39,6 +60,19 @@ def consolidate_entities():
         raise HTTPException(status_code=500, detail=f"Consolidation failed: {exc}")
 
 
+@router.get("/consolidate/status")
+def get_consolidation_status():
+    """
+    Progress of the current or most recent consolidation run.
+
+    Counts are checkpointed with every merged batch.
+    """
+    try:
+        return consolidation_status()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to get consolidation status: {exc}")
+
+
 @router.get("/duplicates")
 def get_duplicate_entities():
     """
@@ -59,6 +93,34 @@ def get_duplicate_entities():
         raise HTTPException(status_code=500, detail=f"Failed to find duplicates: {exc}")
 
 
+@router.get("/duplicates/candidates")
+def get_duplicate_candidates(
+    threshold: float = Q(0.6, ge=0.0, le=1.0, description="Minimum estimated trigram Jaccard similarity"),
+    verify_embeddings: bool = Q(False, description="Reject pairs whose stored embeddings disagree"),
+    min_cosine: float = Q(0.85, ge=-1.0, le=1.0, description="Embedding cosine required when verifying"),
+    limit: int = Q(100, ge=1, le=5000, description="Maximum number of merge suggestions")
+):
+    """
+    Suggest merges for entities whose names are near-duplicates.
+
+    Unlike /duplicates, names do not have to be identical: case, accents,
+    punctuation, plurals and small spelling differences are tolerated.
+    Each suggestion's entity_ids can be passed to /merge.
+    """
+    try:
+        result = find_duplicate_candidates(
+            threshold=threshold,
+            verify_embeddings=verify_embeddings,
+            min_cosine=min_cosine,
+            limit=limit,
+        )
+        result["message"] = f"Found {result['suggestion_count']} merge suggestions"
+        return result
+
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to find duplicate candidates: {exc}")
+
+
 @router.post("/merge")
 def merge_entities(
     entity_ids: List[str] = Q(..., description="List of entity element IDs to merge")
@@ -126,8 +188,7 @@ def consolidation_health():
     Returns the health status of the APOC consolidation system.
     """
     try:
-        # Try to get stats to verify APOC is working
-        stats = get_consolidation_stats()
+        stats = check_apoc()
         
         if "error" in stats:
             return {
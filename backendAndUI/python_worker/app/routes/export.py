@@ -4,12 +4,23 @@ from __future__ import annotations
 import csv
 import io
 import json
+import zlib
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Response, Query as Q
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from ..services.neo4j_client import neo4j_client
+from ..services.graph_export import iter_export_nodes, iter_export_relationships
+from ..services.columnar_export import (
+    COLUMNAR_FORMATS,
+    COLUMNAR_TABLES,
+    DEFAULT_BATCH_SIZE,
+    stream_columnar,
+)
+
 
 router = APIRouter()
 
@@ -32,6 +43,29 @@ def generate_json_export(data: Dict[str, Any]) -> str:
     return json.dumps(data, indent=2, default=str)
 
 
+RELATIONSHIP_CSV_FIELDS = [
+    'source', 'relation', 'target', 'status', 'polarity', 
+    'confidence', 'significance', 'source_count'
+]
+
+
+def csv_relationship_row(edge: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a relationship into a row for the relationships CSV."""
+    sources = edge.get('sources', [])
+    source_count = len(sources) if isinstance(sources, list) else 0
+    
+    return {
+        'source': edge.get('source', ''),
+        'relation': edge.get('relation', ''),
+        'target': edge.get('target', ''),
+        'status': edge.get('status', 'unverified'),
+        'polarity': edge.get('polarity', 'positive'),
+        'confidence': edge.get('confidence', ''),
+        'significance': edge.get('significance', ''),
+        'source_count': source_count
+    }
+
+
 def generate_csv_relationships(edges: List[Dict[str, Any]]) -> str:
     """Generate CSV export for relationships."""
     output = io.StringIO()
@@ -39,104 +73,104 @@ def generate_csv_relationships(edges: List[Dict[str, Any]]) -> str:
     if not edges:
         return "No relationships to export"
     
-    # Define CSV columns
-    fieldnames = [
-        'source', 'relation', 'target', 'status', 'polarity', 
-        'confidence', 'significance', 'source_count'
-    ]
-    
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    writer = csv.DictWriter(output, fieldnames=RELATIONSHIP_CSV_FIELDS)
     writer.writeheader()
     
     for edge in edges:
-        sources = edge.get('sources', [])
-        source_count = len(sources) if isinstance(sources, list) else 0
-        
-        writer.writerow({
-            'source': edge.get('source', ''),
-            'relation': edge.get('relation', ''),
-            'target': edge.get('target', ''),
-            'status': edge.get('status', 'unverified'),
-            'polarity': edge.get('polarity', 'positive'),
-            'confidence': edge.get('confidence', ''),
-            'significance': edge.get('significance', ''),
-            'source_count': source_count
-        })
+        writer.writerow(csv_relationship_row(edge))
     
     return output.getvalue()
 
 
+def _escape_xml(value: Any) -> str:
+    """Escape a value for use in GraphML text or attribute content."""
+    return (
+        str(value)
+        .replace('&', '&amp;')
+        .replace('"', '&quot;')
+        .replace('<', '&lt;')
+        .replace('>', '&gt;')
+    )
+
+
+GRAPHML_HEADER = [
+    '<?xml version="1.0" encoding="UTF-8"?>',
+    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns"',
+    '         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"',
+    '         xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns',
+    '         http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">',
+    # Define keys (attributes)
+    '  <key id="label" for="node" attr.name="label" attr.type="string"/>',
+    '  <key id="type" for="node" attr.name="type" attr.type="string"/>',
+    '  <key id="significance" for="node" attr.name="significance" attr.type="int"/>',
+    '  <key id="relation" for="edge" attr.name="relation" attr.type="string"/>',
+    '  <key id="status" for="edge" attr.name="status" attr.type="string"/>',
+    '  <key id="polarity" for="edge" attr.name="polarity" attr.type="string"/>',
+    '  <key id="confidence" for="edge" attr.name="confidence" attr.type="double"/>',
+    '  <key id="significance_edge" for="edge" attr.name="significance" attr.type="int"/>',
+    '  <graph id="KnowledgeGraph" edgedefault="directed">',
+]
+
+GRAPHML_FOOTER = [
+    '  </graph>',
+    '</graphml>',
+]
+
+
+def graphml_node_lines(node: Dict[str, Any]) -> List[str]:
+    """Render a single node as GraphML lines."""
+    lines = [f'    <node id="{_escape_xml(node.get("id", ""))}">']
+    lines.append(f'      <data key="label">{_escape_xml(node.get("label", ""))}</data>')
+    
+    node_type_value = node.get('type')
+    if not node_type_value:
+        types_list = node.get('types')
+        if isinstance(types_list, list) and types_list:
+            node_type_value = ", ".join(types_list)
+    if node_type_value:
+        lines.append(f'      <data key="type">{_escape_xml(node_type_value)}</data>')
+    
+    if node.get('significance'):
+        lines.append(f'      <data key="significance">{node["significance"]}</data>')
+    
+    lines.append('    </node>')
+    return lines
+
+
+def graphml_edge_lines(edge_id: str, edge: Dict[str, Any]) -> List[str]:
+    """Render a single edge as GraphML lines."""
+    source = _escape_xml(edge.get('source', ''))
+    target = _escape_xml(edge.get('target', ''))
+    lines = [f'    <edge id="{edge_id}" source="{source}" target="{target}">']
+    lines.append(f'      <data key="relation">{_escape_xml(edge.get("relation", ""))}</data>')
+    
+    if edge.get('status'):
+        lines.append(f'      <data key="status">{_escape_xml(edge["status"])}</data>')
+    
+    if edge.get('polarity'):
+        lines.append(f'      <data key="polarity">{_escape_xml(edge["polarity"])}</data>')
+    
+    if edge.get('confidence') is not None:
+        lines.append(f'      <data key="confidence">{edge["confidence"]}</data>')
+    
+    if edge.get('significance'):
+        lines.append(f'      <data key="significance_edge">{edge["significance"]}</data>')
+    
+    lines.append('    </edge>')
+    return lines
+
+
 def generate_graphml(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> str:
     """Generate GraphML format for Cytoscape and other tools."""
-    graphml = ['<?xml version="1.0" encoding="UTF-8"?>']
-    graphml.append('<graphml xmlns="http://graphml.graphdrawing.org/xmlns"')
-    graphml.append('         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"')
-    graphml.append('         xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns')
-    graphml.append('         http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">')
+    graphml = list(GRAPHML_HEADER)
     
-    # Define keys (attributes)
-    graphml.append('  <key id="label" for="node" attr.name="label" attr.type="string"/>')
-    graphml.append('  <key id="type" for="node" attr.name="type" attr.type="string"/>')
-    graphml.append('  <key id="significance" for="node" attr.name="significance" attr.type="int"/>')
-    graphml.append('  <key id="relation" for="edge" attr.name="relation" attr.type="string"/>')
-    graphml.append('  <key id="status" for="edge" attr.name="status" attr.type="string"/>')
-    graphml.append('  <key id="polarity" for="edge" attr.name="polarity" attr.type="string"/>')
-    graphml.append('  <key id="confidence" for="edge" attr.name="confidence" attr.type="double"/>')
-    graphml.append('  <key id="significance_edge" for="edge" attr.name="significance" attr.type="int"/>')
-    
-    graphml.append('  <graph id="KnowledgeGraph" edgedefault="directed">')
-    
-    # Add nodes
     for node in nodes:
-        node_id = str(node.get('id', '')).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-        graphml.append(f'    <node id="{node_id}">')
-        
-        label = str(node.get('label', '')).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-        graphml.append(f'      <data key="label">{label}</data>')
-        
-        node_type_value = node.get('type')
-        if not node_type_value:
-            types_list = node.get('types')
-            if isinstance(types_list, list) and types_list:
-                node_type_value = ", ".join(types_list)
-        if node_type_value:
-            node_type = str(node_type_value).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-            graphml.append(f'      <data key="type">{node_type}</data>')
-        
-        if node.get('significance'):
-            graphml.append(f'      <data key="significance">{node["significance"]}</data>')
-        
-        graphml.append('    </node>')
+        graphml.extend(graphml_node_lines(node))
     
-    # Add edges
     for i, edge in enumerate(edges):
-        source = str(edge.get('source', '')).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-        target = str(edge.get('target', '')).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-        edge_id = f"e{i}"
-        
-        graphml.append(f'    <edge id="{edge_id}" source="{source}" target="{target}">')
-        
-        relation = str(edge.get('relation', '')).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-        graphml.append(f'      <data key="relation">{relation}</data>')
-        
-        if edge.get('status'):
-            status = str(edge['status']).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-            graphml.append(f'      <data key="status">{status}</data>')
-        
-        if edge.get('polarity'):
-            polarity = str(edge['polarity']).replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-            graphml.append(f'      <data key="polarity">{polarity}</data>')
-        
-        if edge.get('confidence') is not None:
-            graphml.append(f'      <data key="confidence">{edge["confidence"]}</data>')
-        
-        if edge.get('significance'):
-            graphml.append(f'      <data key="significance_edge">{edge["significance"]}</data>')
-        
-        graphml.append('    </edge>')
+        graphml.extend(graphml_edge_lines(f"e{i}", edge))
     
-    graphml.append('  </graph>')
-    graphml.append('</graphml>')
+    graphml.extend(GRAPHML_FOOTER)
     
     return '\n'.join(graphml)
 
@@ -244,6 +278,186 @@ async def export_graph(request: GraphExportRequest):
         raise HTTPException(status_code=500, detail=f"Export failed: {exc}")
 
 
+# Flush streamed output to the client in roughly this many characters
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _chunked(lines: Iterable[str]) -> Iterator[bytes]:
+    """Group small text fragments into larger UTF-8 chunks for the response."""
+    buffer: List[str] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_SIZE:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a byte stream incrementally into a single gzip member."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_ndjson(workspace_id: Optional[str], verified_only: bool) -> Iterator[str]:
+    """Stream the graph as newline-delimited JSON: metadata, then nodes, then edges.
+    
+    Each line carries a ``record`` field (metadata, node or edge) identifying its kind.
+    """
+    yield json.dumps({
+        "record": "metadata",
+        "exported_at": datetime.now().isoformat(),
+        "workspace_id": workspace_id,
+        "verified_only": verified_only
+    }) + "\n"
+    
+    for node in iter_export_nodes(workspace_id):
+        yield json.dumps({"record": "node", **node}, default=str) + "\n"
+    
+    for edge in iter_export_relationships(workspace_id, verified_only):
+        yield json.dumps({"record": "edge", **edge}, default=str) + "\n"
+
+
+def stream_csv_relationships(workspace_id: Optional[str], verified_only: bool) -> Iterator[str]:
+    """Stream the relationships CSV one row at a time."""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=RELATIONSHIP_CSV_FIELDS)
+    writer.writeheader()
+    
+    for edge in iter_export_relationships(workspace_id, verified_only):
+        writer.writerow(csv_relationship_row(edge))
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate(0)
+    
+    # Header only when there were no relationships
+    if output.tell():
+        yield output.getvalue()
+
+
+def stream_graphml(workspace_id: Optional[str], verified_only: bool) -> Iterator[str]:
+    """Stream a GraphML document node by node and edge by edge."""
+    for line in GRAPHML_HEADER:
+        yield line + "\n"
+    
+    for node in iter_export_nodes(workspace_id):
+        for line in graphml_node_lines(node):
+            yield line + "\n"
+    
+    for i, edge in enumerate(iter_export_relationships(workspace_id, verified_only)):
+        for line in graphml_edge_lines(f"e{i}", edge):
+            yield line + "\n"
+    
+    for line in GRAPHML_FOOTER:
+        yield line + "\n"
+
+
+# format -> (line generator, media type, file extension)
+STREAM_FORMATS = {
+    "ndjson": (stream_ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (stream_csv_relationships, "text/csv", "csv"),
+    "graphml": (stream_graphml, "application/xml", "graphml"),
+}
+
+
+@router.get("/graph/stream")
+def stream_graph_export(
+    format: str = Q("ndjson", description="ndjson, csv (relationships) or graphml"),
+    workspace_id: Optional[str] = Q(None, description="Only export entities from this workspace"),
+    verified_only: bool = Q(False, description="Only include verified relationships"),
+    gzip: bool = Q(False, description="Gzip-compress the response body")
+):
+    """
+    Export the graph directly from Neo4j as a chunked stream.
+    
+    Unlike POST /graph, the client does not send the graph. Nodes and
+    relationships are read lazily from Bolt and written out as they arrive,
+    so server memory stays flat regardless of graph size.
+    """
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    
+    # Errors after the first byte cannot change the status code, so fail fast here
+    if not neo4j_client.verify_connection():
+        raise HTTPException(status_code=503, detail="Export failed: Neo4j is unavailable")
+    
+    generator, media_type, extension = STREAM_FORMATS[format]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    prefix = "knowledge_graph_relationships" if format == "csv" else "knowledge_graph"
+    filename = f"{prefix}_{timestamp}.{extension}"
+    
+    body = _chunked(generator(workspace_id, verified_only))
+    if gzip:
+        body = _gzipped(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        }
+    )
+
+
+# columnar format -> (media type, file extension)
+COLUMNAR_MEDIA_TYPES = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+@router.get("/graph/columnar")
+def export_graph_columnar(
+    table: str = Q("nodes", description="nodes or relationships"),
+    format: str = Q("parquet", description="arrow (IPC stream), parquet or csv"),
+    workspace_id: Optional[str] = Q(None, description="Only export entities from this workspace"),
+    verified_only: bool = Q(False, description="Only include verified relationships"),
+    batch_size: int = Q(DEFAULT_BATCH_SIZE, ge=1000, le=500000, description="Rows per record batch / row group")
+):
+    """
+    Export one graph table with typed columns for pandas, Polars or DuckDB.
+    
+    Strings that repeat (types, relation, status, polarity, source ids) are
+    dictionary-encoded. Rows are read from Neo4j and written one record batch
+    at a time, so memory is bounded by ``batch_size``.
+    """
+    if table not in COLUMNAR_TABLES:
+        raise HTTPException(status_code=400, detail=f"Unsupported table: {table}")
+    if format not in COLUMNAR_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Columnar export requires the 'pyarrow' package")
+    
+    if not neo4j_client.verify_connection():
+        raise HTTPException(status_code=503, detail="Export failed: Neo4j is unavailable")
+    
+    media_type, extension = COLUMNAR_MEDIA_TYPES[format]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"knowledge_graph_{table}_{timestamp}.{extension}"
+    
+    return StreamingResponse(
+        stream_columnar(table, format, workspace_id, verified_only, batch_size),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        }
+    )
+
+
 @router.post("/review")
 async def export_review_queue(request: ReviewExportRequest):
     """
@@ -8,6 +8,9 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from ..services.neo4j_client import neo4j_client
+from ..services.graph_version import MARK_SOURCE_CHANGED_CYPHER, bump_all_graph_versions
+from ..services.review_queue import REVIEW_ITEM_SYNC_CYPHER, REVIEW_PRIORITY, ensure_review_schema
+from ..services.stats_counters import STATUS_COUNTER_PARAMS, STATUS_COUNTERS_CYPHER
 from ..core.settings import settings
 
 
@@ -62,7 +65,11 @@ def create_manual_relationship(payload: ManualRelationshipRequest):
         created_by_last_name: $created_by_last_name,
         is_manual: true
     }]->(o)
-    
+    SET r.review_priority = """ + REVIEW_PRIORITY + """
+    """ + REVIEW_ITEM_SYNC_CYPHER + """
+    """ + MARK_SOURCE_CHANGED_CYPHER + """
+    WITH s, r, o, null AS old_status
+    """ + STATUS_COUNTERS_CYPHER + """
     RETURN elementId(r) as relationship_id, 
            s.name as subject_name, 
            o.name as object_name,
@@ -70,6 +77,7 @@ def create_manual_relationship(payload: ManualRelationshipRequest):
     """
     
     try:
+        ensure_review_schema()
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
             result = session.run(
                 cypher,
@@ -80,7 +88,8 @@ def create_manual_relationship(payload: ManualRelationshipRequest):
                 confidence=payload.confidence,
                 created_by=payload.created_by or "expert-user",
                 created_by_first_name=payload.created_by_first_name or "",
-                created_by_last_name=payload.created_by_last_name or ""
+                created_by_last_name=payload.created_by_last_name or "",
+                **STATUS_COUNTER_PARAMS,
             )
             record = result.single()
             
@@ -90,6 +99,8 @@ def create_manual_relationship(payload: ManualRelationshipRequest):
                     detail="Could not find one or both entities. Please ensure they exist in the graph."
                 )
             
+            bump_all_graph_versions()
+            
             return {
                 "status": "created",
                 "relationship_id": record["relationship_id"],
@@ -2,7 +2,11 @@
 from fastapi import APIRouter, HTTPException, Depends
 from ..core.auth import get_current_user
 from ..models.user import User
+from ..services.name_resolution import backfill_normalized_names
 from ..services.neo4j_client import neo4j_client
+from ..services.review_queue import backfill_review_priority
+from ..services.stats_counters import reconcile_all_stats
+from ..services.type_closure import rebuild_type_closure
 from ..core.settings import settings
 import logging
 
@@ -47,6 +51,81 @@ def link_entities_to_workspaces(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
 
 
+@router.post("/migrate/normalize-entity-names")
+def normalize_entity_names(current_user: User = Depends(get_current_user)):
+    """
+    Backfill the name_lower property (and its index) used for exact name resolution.
+    Only entities that do not have it yet are updated, in batches.
+    """
+    try:
+        updated = backfill_normalized_names()
+        return {
+            "success": True,
+            "entities_updated": updated,
+            "message": f"Set name_lower on {updated} entities"
+        }
+    except Exception as e:
+        logger.error(f"Failed to normalize entity names: {e}")
+        raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
+
+
+@router.post("/migrate/type-closure")
+def build_type_closure(current_user: User = Depends(get_current_user)):
+    """
+    Backfill ancestor_keys, the materialized IS_A closure used to include type ancestors.
+    Only entities that do not have it yet are updated, in batches.
+    """
+    try:
+        updated = rebuild_type_closure()
+        return {
+            "success": True,
+            "entities_updated": updated,
+            "message": f"Set ancestor_keys on {updated} entities"
+        }
+    except Exception as e:
+        logger.error(f"Failed to build type closure: {e}")
+        raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
+
+
+@router.post("/migrate/review-priority")
+def migrate_review_priority(current_user: User = Depends(get_current_user)):
+    """
+    Backfill review queue fields on existing relationships.
+    Sets a missing status to 'unverified', computes review_priority, creates the
+    review item of every relationship and drops the old per-type queue indexes.
+    """
+    try:
+        updated = backfill_review_priority()
+        total = sum(updated.values())
+        return {
+            "success": True,
+            "relationships_updated": total,
+            "relationship_types": updated,
+            "message": f"Set review_priority on {total} relationships"
+        }
+    except Exception as e:
+        logger.error(f"Failed to backfill review priority: {e}")
+        raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
+
+
+@router.post("/migrate/reconcile-stats")
+def migrate_reconcile_stats(current_user: User = Depends(get_current_user)):
+    """
+    Recount the maintained review and workspace statistics now.
+    Run after bulk changes made outside the application, e.g. linking entities to workspaces.
+    """
+    try:
+        workspaces = reconcile_all_stats()
+        return {
+            "success": True,
+            "workspaces_reconciled": workspaces,
+            "message": f"Reconciled statistics for {workspaces} workspaces"
+        }
+    except Exception as e:
+        logger.error(f"Failed to reconcile statistics: {e}")
+        raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
+
+
 @router.get("/migrate/check-workspace-links")
 def check_workspace_links():
     """
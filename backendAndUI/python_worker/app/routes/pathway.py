@@ -4,18 +4,28 @@ Pathway Discovery API Endpoints
 
 Provides advanced graph discovery capabilities:
 - Shortest path between concepts
+- Batch shortest paths (streamed)
+- Most credible (evidence-weighted) path
 - All paths discovery
 - Multi-hop exploration
 - Pattern-based queries
+- Batch concept-name resolution
 """
 
+import json
+
 from fastapi import APIRouter, HTTPException, Query as Q
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Literal, Tuple
 
+from ..services.name_resolution import MAX_CANDIDATES, resolve_names
+from ..services.path_engine import CostModel
 from ..services.pathway_discovery import (
     find_shortest_path,
     find_all_paths,
+    iter_batch_shortest_paths,
+    find_most_credible_path,
     find_connecting_concepts,
     explore_multi_hop,
     pattern_query
@@ -30,7 +40,9 @@ def get_shortest_path(
     source: str = Q(..., min_length=1, description="Source concept name"),
     target: str = Q(..., min_length=1, description="Target concept name"),
     max_hops: int = Q(5, ge=1, le=10, description="Maximum hops to explore"),
-    verified_only: bool = Q(False, description="Only consider verified relationships")
+    verified_only: bool = Q(False, description="Only consider verified relationships"),
+    algorithm: Literal["bidirectional", "bfs"] = Q("bidirectional", description="Unweighted search strategy"),
+    weight: Literal["hops", "confidence", "credibility"] = Q("hops", description="Minimize hop count, or find the most confident (or credible) path within max_hops")
 ):
     """
     Find the shortest path between two concepts in the knowledge graph.
@@ -45,7 +57,9 @@ def get_shortest_path(
             source_name=source,
             target_name=target,
             max_hops=max_hops,
-            verified_only=verified_only
+            verified_only=verified_only,
+            algorithm=algorithm,
+            weight=weight
         )
         
         if not result["success"]:
@@ -59,19 +73,70 @@ def get_shortest_path(
         raise HTTPException(status_code=500, detail=f"Shortest path query failed: {exc}")
 
 
+class BatchPathRequest(BaseModel):
+    """Request model for batch shortest paths: explicit pairs and/or sources x targets."""
+    pairs: List[Tuple[str, str]] = []
+    sources: List[str] = []
+    targets: List[str] = []
+    max_hops: int = 5
+    verified_only: bool = False
+
+
+MAX_BATCH_PAIRS = 10000
+
+
+def _stream_batch(pairs: List[Tuple[str, str]], max_hops: int, verified_only: bool) -> Iterator[str]:
+    try:
+        for record in iter_batch_shortest_paths(pairs, max_hops=max_hops, verified_only=verified_only):
+            yield json.dumps(record, default=str) + "\n"
+    except Exception as exc:
+        # The status code is already sent, so report failures in-band
+        yield json.dumps({"record": "error", "error": str(exc)}) + "\n"
+
+
+@router.post("/batch")
+def batch_shortest_paths(request: BatchPathRequest):
+    """
+    Find shortest paths for many source/target pairs in one request.
+    
+    Pairs come from ``pairs`` plus every combination of ``sources`` x
+    ``targets`` (e.g. a 50 drug x 30 target panel). Names are resolved once
+    and each distinct source is searched once. Results stream back as
+    newline-delimited JSON: a "resolution" record, one "path" record per pair
+    as soon as its source has been searched, and a final "summary" record.
+    """
+    pairs = [tuple(pair) for pair in request.pairs]
+    pairs += [(source, target) for source in request.sources for target in request.targets]
+    if not pairs:
+        raise HTTPException(status_code=400, detail="Provide pairs, or both sources and targets")
+    if len(pairs) > MAX_BATCH_PAIRS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PAIRS} pairs can be queried per request")
+    if not 1 <= request.max_hops <= 10:
+        raise HTTPException(status_code=400, detail="max_hops must be between 1 and 10")
+    
+    return StreamingResponse(
+        _stream_batch(pairs, request.max_hops, request.verified_only),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.get("/all-paths")
 def get_all_paths(
     source: str = Q(..., min_length=1, description="Source concept name"),
     target: str = Q(..., min_length=1, description="Target concept name"),
     max_hops: int = Q(5, ge=1, le=10, description="Maximum hops to explore"),
     max_paths: int = Q(10, ge=1, le=50, description="Maximum paths to return"),
-    verified_only: bool = Q(False, description="Only consider verified relationships")
+    verified_only: bool = Q(False, description="Only consider verified relationships"),
+    algorithm: Literal["yen", "all_shortest"] = Q("yen", description="k-shortest loopless paths, or only the equal-length shortest ones"),
+    weight: Literal["hops", "confidence", "credibility"] = Q("hops", description="Rank k-shortest paths by hop count, confidence or default credibility cost")
 ):
     """
     Find all paths between two concepts (up to max_paths).
     
     Useful for exploring multiple ways concepts are connected and discovering
-    alternative relationship pathways.
+    alternative relationship pathways. With the default ``yen`` algorithm the
+    paths come in order of increasing length (or cost), so longer alternatives
+    are returned once the shortest ones are exhausted.
     """
     try:
         result = find_all_paths(
@@ -79,7 +144,9 @@ def get_all_paths(
             target_name=target,
             max_hops=max_hops,
             max_paths=max_paths,
-            verified_only=verified_only
+            verified_only=verified_only,
+            algorithm=algorithm,
+            weight=weight
         )
         
         if not result["success"]:
@@ -91,6 +158,61 @@ def get_all_paths(
         raise HTTPException(status_code=500, detail=f"All paths query failed: {exc}")
 
 
+@router.get("/most-credible-path")
+def get_most_credible_path(
+    source: str = Q(..., min_length=1, description="Source concept name"),
+    target: str = Q(..., min_length=1, description="Target concept name"),
+    max_hops: Optional[int] = Q(None, ge=1, le=20, description="Optional limit on path length"),
+    verified_only: bool = Q(False, description="Only consider verified relationships"),
+    confidence_weight: Optional[float] = Q(None, ge=0, description="Weight of -log(confidence) in an edge's cost"),
+    default_confidence: Optional[float] = Q(None, gt=0, le=1, description="Confidence assumed for relationships without one"),
+    unverified_penalty: Optional[float] = Q(None, ge=0, description="Extra cost for unverified relationships"),
+    untyped_penalty: Optional[float] = Q(None, ge=0, description="Extra cost for relationships without a review status (e.g. IS_A)"),
+    exclude_incorrect: Optional[bool] = Q(None, description="Never traverse relationships flagged as incorrect"),
+    incorrect_penalty: Optional[float] = Q(None, ge=0, description="Extra cost for incorrect relationships when they are allowed"),
+    significance_weight: Optional[float] = Q(None, ge=0, description="Extra cost for low-significance relationships"),
+    sources_weight: Optional[float] = Q(None, ge=0, description="Discount for relationships supported by several documents"),
+    hop_cost: Optional[float] = Q(None, ge=0, description="Base cost of every hop")
+):
+    """
+    Find the path best supported by evidence between two concepts.
+    
+    Unlike ``/shortest-path`` this minimizes an evidence cost rather than the
+    number of hops: low-confidence, unverified and weakly sourced
+    relationships are expensive. Every cost model parameter can be overridden
+    per request; omitted ones keep their defaults.
+    """
+    try:
+        cost_model = CostModel.from_options(
+            confidence_weight=confidence_weight,
+            default_confidence=default_confidence,
+            unverified_penalty=unverified_penalty,
+            untyped_penalty=untyped_penalty,
+            exclude_incorrect=exclude_incorrect,
+            incorrect_penalty=incorrect_penalty,
+            significance_weight=significance_weight,
+            sources_weight=sources_weight,
+            hop_cost=hop_cost
+        )
+        result = find_most_credible_path(
+            source_name=source,
+            target_name=target,
+            max_hops=max_hops,
+            verified_only=verified_only,
+            cost_model=cost_model
+        )
+        
+        if not result["success"] and "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Most credible path query failed: {exc}")
+
+
 @router.get("/connectors")
 def get_connecting_concepts(
     source: str = Q(..., min_length=1, description="Source concept name"),
@@ -189,6 +311,39 @@ def query_pattern(request: PatternQueryRequest):
         raise HTTPException(status_code=500, detail=f"Pattern query failed: {exc}")
 
 
+class ResolveRequest(BaseModel):
+    """Request model for batch name resolution."""
+    names: List[str] = []
+    limit: int = MAX_CANDIDATES
+
+
+MAX_RESOLVE_NAMES = 1000
+
+
+@router.post("/resolve")
+def resolve_concept_names(request: ResolveRequest):
+    """
+    Resolve many concept names to entity names in one call.
+    
+    Each name maps to its exact (case-insensitive) matches, or failing that to
+    the best fulltext candidates. Names that match nothing are listed under
+    ``unresolved``.
+    """
+    if len(request.names) > MAX_RESOLVE_NAMES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_RESOLVE_NAMES} names can be resolved per request")
+    if not 1 <= request.limit <= 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    try:
+        resolved = resolve_names(request.names, request.limit)
+        return {
+            "resolved": resolved,
+            "unresolved": [name for name, candidates in resolved.items() if not candidates]
+        }
+        
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Name resolution failed: {exc}")
+
+
 @router.get("/stats")
 def get_pathway_stats():
     """
@@ -1,8 +1,16 @@
 from fastapi import APIRouter, HTTPException, Query as Q
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 from ..services.neo4j_client import neo4j_client
+from ..services.autocomplete_index import autocomplete_index
+from ..services.graph_export import STRUCTURAL_REL_TYPES
+from ..services.graph_layout import layout_scope, merge_positions, save_layout
+from ..services.centrality_service import centrality_status, compute_centrality, schedule_centrality, top_nodes
+from ..services.community_service import compute_communities, expand_community, get_overview, schedule_communities
+from ..services.layout_service import attach_layout, compute_layout, layout_status, schedule_layout
+from ..services.neighborhood import DEFAULT_FAN_OUT, expand_neighborhood
+from ..services.spatial_index import viewport_index
 from ..core.settings import settings
 
 
@@ -19,12 +27,22 @@ def autocomplete(
     q: str = Q(..., min_length=1, description="Partial entity name to autocomplete"),
     limit: int = Q(10, ge=1, le=50),
     page_number: int = Q(1, ge=1, description="Page number for pagination"),
+    workspace_id: Optional[str] = Q(None, description="Restrict suggestions to a workspace"),
+    fuzzy: bool = Q(True, description="Add trigram fuzzy matches when prefix matches run out"),
 ):
     """Lightweight entity autocomplete using case-insensitive prefix/contains match.
 
-    Tries fulltext index if available; falls back to CONTAINS.
+    Served from the in-process autocomplete index once it has been built, so
+    keystrokes do not hit Neo4j. Until then, tries the fulltext index if
+    available and falls back to CONTAINS.
     Returns minimal payload for fast UI usage.
     """
+    skip = (page_number - 1) * limit
+    if autocomplete_index.ready:
+        autocomplete_index.maybe_refresh()
+        items = autocomplete_index.search(q, workspace_id=workspace_id, limit=limit, skip=skip, fuzzy=fuzzy)
+        return {"results": items, "page_number": page_number}
+
     cypher_fulltext_only = """
     CALL db.index.fulltext.queryNodes('entity_search', $fulltext) YIELD node, score
     OPTIONAL MATCH (node)-[:IS_A]->(type:Concept)
@@ -42,7 +60,6 @@ def autocomplete(
     RETURN {id: coalesce(node.id, node.name, elementId(node)), label: coalesce(node.label, node.name, node.id), types: types, type: types[0], score: 0.0} AS item
     SKIP $skip LIMIT $limit
     """
-    skip = (page_number - 1) * limit
     try:
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
             try:
@@ -120,33 +137,42 @@ def get_all(
     """
     skip = (page_number - 1) * limit
     
-    # Add workspace filter if provided
-    workspace_filter = ""
+    # Add workspace filter if provided. Type ancestors of the scope's concepts
+    # come from their materialized ancestor_keys (see type_closure), collected once.
     if workspace_id:
+        ancestors_cypher = (
+            "CALL { "
+            "  MATCH (:Workspace {workspace_id: $workspace_id})<-[:BELONGS_TO]-(:Document)<-[:EXTRACTED_FROM]-(concept:Entity) "
+            "  UNWIND coalesce(concept.ancestor_keys, []) AS ancestor_key "
+            "  RETURN collect(DISTINCT ancestor_key) AS ancestor_keys "
+            "} "
+        )
         workspace_filter = (
             " AND ("
             "EXISTS { "
             "  MATCH (n)-[:EXTRACTED_FROM]->(d1:Document)-[:BELONGS_TO]->(:Workspace {workspace_id: $workspace_id}) "
             "} "
-            "OR EXISTS { "
-            "  MATCH (concept:Entity)-[:EXTRACTED_FROM]->(d2:Document)-[:BELONGS_TO]->(:Workspace {workspace_id: $workspace_id}) "
-            "  MATCH (concept)-[:IS_A*1..5]->(n) "
-            "} "
+            "OR n.name IN ancestor_keys"
             ") "
         )
     else:
-        # Global view: exclude nodes from private workspaces
+        # Global view: exclude nodes from private workspaces and their type ancestors
+        ancestors_cypher = (
+            "CALL { "
+            "  MATCH (:Workspace {privacy: 'private'})<-[:BELONGS_TO]-(:Document)<-[:EXTRACTED_FROM]-(concept) "
+            "  UNWIND coalesce(concept.ancestor_keys, []) AS ancestor_key "
+            "  RETURN collect(DISTINCT ancestor_key) AS ancestor_keys "
+            "} "
+        )
         workspace_filter = (
             " AND NOT EXISTS { "
             "  MATCH (n)-[:EXTRACTED_FROM]->(d:Document)-[:BELONGS_TO]->(:Workspace {privacy: 'private'}) "
             "} "
-            "AND NOT EXISTS { "
-            "  MATCH (concept)-[:EXTRACTED_FROM]->(d:Document)-[:BELONGS_TO]->(:Workspace {privacy: 'private'}) "
-            "  WHERE (concept)-[:IS_A*1..5]->(n) "
-            "} "
+            "AND NOT n.name IN ancestor_keys "
         )
     
     nodes_cypher = (
+        f"{ancestors_cypher}"
         "MATCH (n:Concept) "
         "WHERE 1=1"
         f"{workspace_filter}"
@@ -185,7 +211,8 @@ def get_all(
             rels_result = session.run(rels_cypher, node_ids=node_ids)
             relationships = [record["relationship"] for record in rels_result]
 
-            return {"nodes": nodes, "relationships": relationships, "page_number": page_number}
+            layout = attach_layout(nodes, workspace_id)
+            return {"nodes": nodes, "relationships": relationships, "page_number": page_number, "layout": layout}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to fetch graph: {exc}")
 
@@ -247,7 +274,8 @@ def graph_by_documents(
     page_number: int = Q(1, ge=1, description="Page number for pagination"),
     limit: int = Q(100, ge=1, le=1000, description="Number of items per page"),
     viewport_bounds: str = Q(None, description="Viewport bounds as 'minX,minY,maxX,maxY' for spatial filtering"),
-    center_node_id: str = Q(None, description="Center node ID for neighborhood-based loading")
+    center_node_id: str = Q(None, description="Center node ID for neighborhood-based loading"),
+    workspace_id: Optional[str] = Q(None, description="Workspace whose layout positions to attach (global layout if omitted)")
 ):
     ids = [s.strip() for s in doc_ids.split(',') if s.strip()]
     skip = (page_number - 1) * limit
@@ -265,7 +293,8 @@ def graph_by_documents(
         "  MATCH (d:Document) WHERE d.document_id IN $ids "
         "  MATCH (base)-[:EXTRACTED_FROM]->(d) "
         "  WHERE base:Entity OR base:Concept "
-        "  MATCH (base)-[:IS_A*1..5]->(candidate) "
+        "  UNWIND coalesce(base.ancestor_keys, []) AS ancestor_key "
+        "  MATCH (candidate:Entity {name: ancestor_key}) "
         "  WHERE candidate:Concept "
         "  RETURN DISTINCT candidate "
         "} "
@@ -279,13 +308,18 @@ def graph_by_documents(
         "SKIP $skip LIMIT $limit"
     )
     rels_cypher = (
+        f"CALL {{ "
+        f"  MATCH (d:Document) WHERE d.document_id IN $ids "
+        f"  MATCH (concept)-[:EXTRACTED_FROM]->(d) "
+        f"  WHERE concept:Entity OR concept:Concept "
+        f"  UNWIND coalesce(concept.ancestor_keys, []) AS ancestor_key "
+        f"  RETURN collect(DISTINCT ancestor_key) AS ancestor_keys "
+        f"}} "
         f"MATCH (d:Document) WHERE d.document_id IN $ids "
         f"MATCH (s)-[r]->(t) "
         f"WHERE (s:Entity OR s:Concept) AND (t:Entity OR t:Concept) "
         f"  AND ( (s)-[:EXTRACTED_FROM]->(d) OR (t)-[:EXTRACTED_FROM]->(d) "
-        f"        OR EXISTS {{ MATCH (concept)-[:EXTRACTED_FROM]->(d) "
-        f"                   WHERE (concept:Entity OR concept:Concept) "
-        f"                   AND ((concept)-[:IS_A*1..5]->(s) OR (concept)-[:IS_A*1..5]->(t)) }} ) "
+        f"        OR s.name IN ancestor_keys OR t.name IN ancestor_keys ) "
         f"{status_filter} "
         f"WITH r, s, t "
         f"OPTIONAL MATCH (doc:Document) WHERE doc.document_id IN r.sources "
@@ -297,7 +331,8 @@ def graph_by_documents(
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
             nodes = [rec["node"] for rec in session.run(nodes_cypher, ids=ids, skip=skip, limit=limit)]
             rels = [rec["relationship"] for rec in session.run(rels_cypher, ids=ids, skip=skip, limit=limit)]
-            return {"nodes": nodes, "relationships": rels, "page_number": page_number}
+            layout = attach_layout(nodes, workspace_id)
+            return {"nodes": nodes, "relationships": rels, "page_number": page_number, "layout": layout}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to fetch graph: {exc}")
 
@@ -409,235 +444,468 @@ def search_concept(
         raise HTTPException(status_code=500, detail=f"Failed to search concept: {exc}")
 
 
+# Entities are keyed by name in the write path, so ids resolve via the name index.
+# $ids optionally restricts nodes to those extracted from the given documents.
+# Smallest share of ``max_nodes`` a zoomed-out viewport still gets
+MIN_ZOOM_BUDGET_FRACTION = 0.25
+
+NODES_BY_ID_CYPHER = (
+    "UNWIND $node_ids AS node_id "
+    "MATCH (e:Entity {name: node_id}) "
+    "WHERE size($ids) = 0 OR EXISTS { MATCH (e)-[:EXTRACTED_FROM]->(d:Document) WHERE d.document_id IN $ids } "
+    "OPTIONAL MATCH (e)-[:EXTRACTED_FROM]->(doc:Document) "
+    "WITH e, collect({id: doc.document_id, title: coalesce(doc.title, doc.document_id), created_by_first_name: doc.created_by_first_name, created_by_last_name: doc.created_by_last_name}) as source_docs "
+    "OPTIONAL MATCH (e)-[:IS_A]->(type:Concept) "
+    "WITH e, source_docs, collect(DISTINCT type.name) AS type_names "
+    "WITH e, source_docs, CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS types "
+    "RETURN {id: coalesce(e.id, e.name, elementId(e)), label: coalesce(e.label, e.name, e.id), strength: coalesce(e.strength, 0), types: types, type: head(types), significance: coalesce(e.significance, null), sources: source_docs} AS node"
+)
+
+
+# Viewport fallback for scopes without a layout: the most significant nodes
+# extracted from $ids, plus their type ancestors
+DOC_NODES_CYPHER = (
+    "CALL { "
+    "  MATCH (d:Document) WHERE d.document_id IN $ids "
+    "  MATCH (base:Entity)-[:EXTRACTED_FROM]->(d) "
+    "  RETURN DISTINCT base AS candidate "
+    "  UNION "
+    "  MATCH (d:Document) WHERE d.document_id IN $ids "
+    "  MATCH (base:Entity)-[:EXTRACTED_FROM]->(d) "
+    "  UNWIND coalesce(base.ancestor_keys, []) AS ancestor_key "
+    "  MATCH (candidate:Entity {name: ancestor_key}) "
+    "  RETURN DISTINCT candidate "
+    "} "
+    "WITH DISTINCT candidate AS e "
+    "ORDER BY coalesce(e.significance, 0) DESC "
+    "LIMIT $limit "
+    "OPTIONAL MATCH (e)-[:EXTRACTED_FROM]->(doc:Document) "
+    "WITH e, collect({id: doc.document_id, title: coalesce(doc.title, doc.document_id), created_by_first_name: doc.created_by_first_name, created_by_last_name: doc.created_by_last_name}) as source_docs "
+    "OPTIONAL MATCH (e)-[:IS_A]->(type:Concept) "
+    "WITH e, source_docs, collect(DISTINCT type.name) AS type_names "
+    "WITH e, source_docs, CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS types "
+    "RETURN {id: coalesce(e.id, e.name, elementId(e)), label: coalesce(e.label, e.name, e.id), strength: coalesce(e.strength, 0), types: types, type: head(types), significance: coalesce(e.significance, null), sources: source_docs} AS node"
+)
+
+
+def rels_between_cypher(verified_only: bool) -> str:
+    """Relationships whose endpoints are both in $node_ids, capped at $rel_limit."""
+    status_filter = "AND r.status = 'verified'" if verified_only else ""
+    return (
+        f"UNWIND $node_ids AS node_id "
+        f"MATCH (s:Entity {{name: node_id}})-[r]->(t:Entity) "
+        f"WHERE t.name IN $node_ids AND NOT type(r) IN $structural_types "
+        f"{status_filter} "
+        f"WITH r, s, t "
+        f"OPTIONAL MATCH (doc:Document) WHERE doc.document_id IN r.sources "
+        f"WITH r, s, t, collect({{id: doc.document_id, title: coalesce(doc.title, doc.document_id), created_by_first_name: doc.created_by_first_name, created_by_last_name: doc.created_by_last_name}}) as source_docs "
+        f"RETURN DISTINCT {{id: elementId(r), source: coalesce(s.id, s.name, elementId(s)), target: coalesce(t.id, t.name, elementId(t)), relation: coalesce(r.relation, type(r)), polarity: coalesce(r.polarity,'positive'), confidence: coalesce(r.confidence,0), significance: coalesce(r.significance, null), status: r.status, sources: source_docs, page_number: coalesce(r.page_number, null), original_text: coalesce(r.original_text, null), reviewed_by_first_name: coalesce(r.reviewed_by_first_name, null), reviewed_by_last_name: coalesce(r.reviewed_by_last_name, null), reviewed_at: coalesce(r.reviewed_at, null)}} AS relationship "
+        f"LIMIT $rel_limit"
+    )
+
+
+class NodePosition(BaseModel):
+    """A node's layout position."""
+    id: str
+    x: float
+    y: float
+
+
+class SaveLayoutRequest(BaseModel):
+    """Layout positions to persist for a workspace (or the global graph)."""
+    workspace_id: Optional[str] = None
+    positions: List[NodePosition]
+    replace: bool = False
+
+
 @router.get("/viewport")
 def get_viewport_graph(
-    doc_ids: str = Q(..., description="Comma-separated document IDs"),
+    doc_ids: Optional[str] = Q(None, description="Comma-separated document IDs to restrict nodes to"),
+    workspace_id: Optional[str] = Q(None, description="Workspace whose layout to query (global layout if omitted)"),
     verified_only: bool = Q(False, description="Only include verified relationships"),
     min_x: float = Q(None, description="Minimum X coordinate of viewport"),
     min_y: float = Q(None, description="Minimum Y coordinate of viewport"),
     max_x: float = Q(None, description="Maximum X coordinate of viewport"),
     max_y: float = Q(None, description="Maximum Y coordinate of viewport"),
-    zoom_level: float = Q(1.0, description="Current zoom level for detail adjustment"),
-    center_node_id: str = Q(None, description="Center node ID for neighborhood-based loading"),
+    zoom_level: float = Q(1.0, gt=0, description="Current zoom level; below 1 the node budget shrinks with it"),
+    center_node_id: str = Q(None, description="Node to always include in the result"),
     max_nodes: int = Q(200, ge=50, le=500, description="Maximum number of nodes to return")
 ):
     """
     Get graph data optimized for viewport-based rendering.
-    Returns nodes and relationships within the specified viewport bounds.
+
+    Nodes are looked up in the per-workspace spatial index over the persisted
+    layout, so only nodes inside the bounding box are fetched. When the box
+    holds more nodes than the budget, level-of-detail thinning keeps the most
+    significant, best-connected nodes spread across the box. The budget is
+    ``max_nodes`` at zoom 1 and above and shrinks with ``zoom_level`` when
+    zoomed out (down to a quarter), where labels and detail are not readable
+    anyway. Relationships are those between the returned nodes.
+
+    Scopes without a stored layout get a layout computed in the background;
+    meanwhile ``doc_ids`` requests return the most significant nodes of those
+    documents, without positions.
     """
-    ids = [s.strip() for s in doc_ids.split(',') if s.strip()]
-    
-    # Add status filter if verified_only is True
-    status_filter = "AND r.status = 'verified'" if verified_only else ""
-    
-    # Build spatial filter if viewport bounds are provided
-    spatial_filter = ""
+    ids = [s.strip() for s in doc_ids.split(',') if s.strip()] if doc_ids else []
+    bounds = None
     if min_x is not None and min_y is not None and max_x is not None and max_y is not None:
-        spatial_filter = f"AND e.x >= {min_x} AND e.y >= {min_y} AND e.x <= {max_x} AND e.y <= {max_y}"
-    
-    # Build center node filter for neighborhood loading
-    center_filter = ""
-    if center_node_id:
-        center_filter = (
-            f"AND (coalesce(e.id, e.name, elementId(e)) = '{center_node_id}' "
-            f"     OR EXISTS {{ MATCH (center) "
-            f"       WHERE center:Concept "
-            f"         AND coalesce(center.id, center.name, elementId(center)) = '{center_node_id}' "
-            f"       AND (e)-[:RELATES_TO*1..2]-(center) }})"
-        )
-    
-    # Adjust node limit based on zoom level (fewer nodes when zoomed out)
-    adjusted_limit = int(max_nodes / max(zoom_level, 0.5))
-    
-    nodes_cypher = (
-        f"CALL {{ "
-        f"  MATCH (d:Document) WHERE d.document_id IN $ids "
-        f"  MATCH (base:Entity)-[:EXTRACTED_FROM]->(d) "
-        f"  RETURN DISTINCT base AS candidate "
-        f"  UNION "
-        f"  MATCH (d:Document) WHERE d.document_id IN $ids "
-        f"  MATCH (base:Entity)-[:EXTRACTED_FROM]->(d) "
-        f"  MATCH (base)-[:IS_A*1..5]->(candidate) "
-        f"  WHERE candidate:Concept "
-        f"  RETURN DISTINCT candidate "
-        f"}} "
-        f"WITH DISTINCT candidate AS e "
-        f"WHERE 1=1 {spatial_filter} {center_filter} "
-        f"OPTIONAL MATCH (e)-[:EXTRACTED_FROM]->(doc:Document) "
-        f"WITH e, collect({{id: doc.document_id, title: coalesce(doc.title, doc.document_id), created_by_first_name: doc.created_by_first_name, created_by_last_name: doc.created_by_last_name}}) as source_docs "
-        f"OPTIONAL MATCH (e)-[:IS_A]->(type:Concept) "
-        f"WITH e, source_docs, collect(DISTINCT type.name) AS type_names "
-        f"WITH e, source_docs, CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS types "
-        f"RETURN {{id: coalesce(e.id, e.name, elementId(e)), label: coalesce(e.label, e.name, e.id), strength: coalesce(e.strength, 0), types: types, type: head(types), significance: coalesce(e.significance, null), sources: source_docs, x: coalesce(e.x, 0), y: coalesce(e.y, 0)}} AS node "
-        f"LIMIT $limit"
-    )
-    
-    # Get relationships for the returned nodes
-    rels_cypher = (
-        f"MATCH (d:Document) WHERE d.document_id IN $ids "
-        f"MATCH (s:Concept)-[r]->(t:Concept) "
-        f"  AND ( (s)-[:EXTRACTED_FROM]->(d) OR (t)-[:EXTRACTED_FROM]->(d) "
-        f"        OR EXISTS {{ MATCH (concept:Entity)-[:EXTRACTED_FROM]->(d) "
-        f"                   WHERE (concept)-[:IS_A*1..5]->(s) OR (concept)-[:IS_A*1..5]->(t) }} ) "
-        f"{status_filter} "
-        f"WITH r, s, t "
-        f"OPTIONAL MATCH (doc:Document) WHERE doc.document_id IN r.sources "
-        f"WITH r, s, t, collect({{id: doc.document_id, title: coalesce(doc.title, doc.document_id), created_by_first_name: doc.created_by_first_name, created_by_last_name: doc.created_by_last_name}}) as source_docs "
-        f"RETURN DISTINCT {{id: elementId(r), source: coalesce(s.id, s.name, elementId(s)), target: coalesce(t.id, t.name, elementId(t)), relation: coalesce(r.relation, type(r)), polarity: coalesce(r.polarity,'positive'), confidence: coalesce(r.confidence,0), significance: coalesce(r.significance, null), status: r.status, sources: source_docs, page_number: coalesce(r.page_number, null), original_text: coalesce(r.original_text, null), reviewed_by_first_name: coalesce(r.reviewed_by_first_name, null), reviewed_by_last_name: coalesce(r.reviewed_by_last_name, null), reviewed_at: coalesce(r.reviewed_at, null)}} AS relationship "
-        f"LIMIT $rel_limit"
-    )
-    
+        bounds = (min_x, min_y, max_x, max_y)
+    viewport = {"min_x": min_x, "min_y": min_y, "max_x": max_x, "max_y": max_y, "zoom_level": zoom_level}
+    # Fewer nodes when zoomed out
+    budget = max(1, int(max_nodes * min(max(zoom_level, MIN_ZOOM_BUDGET_FRACTION), 1.0)))
+
+    try:
+        index = viewport_index.get(workspace_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to load viewport index: {exc}")
+    if index is None:
+        scheduled = schedule_layout(workspace_id)
+        nodes: List[dict] = []
+        rels: List[dict] = []
+        if ids:
+            try:
+                with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+                    nodes = [rec["node"] for rec in session.run(DOC_NODES_CYPHER, ids=ids, limit=budget)]
+                    rels = [
+                        rec["relationship"]
+                        for rec in session.run(
+                            rels_between_cypher(verified_only),
+                            node_ids=[n["id"] for n in nodes],
+                            structural_types=STRUCTURAL_REL_TYPES,
+                            rel_limit=budget * 4,
+                        )
+                    ]
+            except Exception as exc:
+                raise HTTPException(status_code=500, detail=f"Failed to fetch viewport graph: {exc}")
+        return {
+            "nodes": nodes, "relationships": rels, "viewport": viewport,
+            "total_nodes": len(nodes), "total_relationships": len(rels), "total_in_viewport": len(nodes),
+            "layout_scheduled": scheduled,
+            "message": "No layout stored for this scope; computing one",
+        }
+
+    # Over-select when a document filter will drop some candidates
+    candidate_limit = budget * 2 if ids else budget
+    selected, total_in_viewport = index.query(bounds, candidate_limit)
+    selected = [int(i) for i in selected]
+    center_index = index.index_of.get(center_node_id) if center_node_id else None
+    if center_index is not None and center_index not in selected:
+        selected.insert(0, center_index)
+    node_ids = [index.node_ids[i] for i in selected]
+    rank = {node_id: i for i, node_id in enumerate(node_ids)}
+
     try:
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            nodes = [rec["node"] for rec in session.run(nodes_cypher, ids=ids, limit=adjusted_limit)]
-            rels = [rec["relationship"] for rec in session.run(rels_cypher, ids=ids, rel_limit=adjusted_limit * 2)]
-            
+            nodes = [rec["node"] for rec in session.run(NODES_BY_ID_CYPHER, node_ids=node_ids, ids=ids)]
+            nodes.sort(key=lambda n: rank.get(n["id"], len(rank)))
+            nodes = nodes[:budget]
+            for node in nodes:
+                i = index.index_of.get(node["id"])
+                node["x"], node["y"] = index.position(i) if i is not None else (0.0, 0.0)
+            returned_ids = [n["id"] for n in nodes]
+            rels = [
+                rec["relationship"]
+                for rec in session.run(
+                    rels_between_cypher(verified_only),
+                    node_ids=returned_ids,
+                    structural_types=STRUCTURAL_REL_TYPES,
+                    rel_limit=budget * 4,
+                )
+            ]
+
             return {
-                "nodes": nodes, 
-                "relationships": rels, 
-                "viewport": {
-                    "min_x": min_x,
-                    "min_y": min_y,
-                    "max_x": max_x,
-                    "max_y": max_y,
-                    "zoom_level": zoom_level
-                },
+                "nodes": nodes,
+                "relationships": rels,
+                "viewport": viewport,
                 "total_nodes": len(nodes),
-                "total_relationships": len(rels)
+                "total_relationships": len(rels),
+                "total_in_viewport": total_in_viewport,
+                "layout_version": index.version,
             }
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to fetch viewport graph: {exc}")
 
 
+@router.post("/viewport/layout")
+def save_viewport_layout(request: SaveLayoutRequest):
+    """
+    Persist node positions for a workspace layout.
+
+    By default positions are merged into the stored layout; with ``replace`` the
+    stored layout is overwritten. The viewport index reloads on the next request.
+    """
+    scope = layout_scope(request.workspace_id)
+    try:
+        if request.replace:
+            version = save_layout(
+                scope,
+                [p.id for p in request.positions],
+                [p.x for p in request.positions],
+                [p.y for p in request.positions],
+            )
+        else:
+            version = merge_positions(scope, [p.model_dump() for p in request.positions])
+        viewport_index.invalidate(request.workspace_id)
+        return {"scope": scope, "version": version, "saved": len(request.positions)}
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to save layout: {exc}")
+
+
+@router.get("/layout")
+def get_layout(
+    workspace_id: Optional[str] = Q(None, description="Workspace whose layout to return (global layout if omitted)")
+):
+    """Return stored layout positions and whether they reflect the current graph version."""
+    try:
+        status = layout_status(workspace_id)
+        index = viewport_index.get(workspace_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to load layout: {exc}")
+    positions = []
+    if index is not None:
+        positions = [
+            {"id": node_id, "x": float(x), "y": float(y)}
+            for node_id, x, y in zip(index.node_ids, index.xs, index.ys)
+        ]
+    return {**status, "version": index.version if index else None, "positions": positions}
+
+
+@router.post("/layout/compute")
+def compute_graph_layout(
+    workspace_id: Optional[str] = Q(None, description="Workspace to lay out (global graph if omitted)"),
+    full: bool = Q(False, description="Recompute from scratch instead of placing new nodes incrementally"),
+    wait: bool = Q(False, description="Compute synchronously and return the result"),
+):
+    """Compute the server-side force-directed layout for a workspace."""
+    if not wait:
+        scheduled = schedule_layout(workspace_id, full=full)
+        return {"scope": layout_scope(workspace_id), "scheduled": scheduled}
+    try:
+        return compute_layout(workspace_id, full=full)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to compute layout: {exc}")
+
+
+@router.get("/overview")
+def get_overview_graph(
+    workspace_id: Optional[str] = Q(None, description="Workspace to summarize (global graph if omitted)"),
+    level: Optional[int] = Q(None, ge=0, description="Community level, 0 = finest (defaults to the coarsest useful level)"),
+    max_links: int = Q(1000, ge=1, le=10000, description="Maximum inter-community links to return")
+):
+    """
+    Level-of-detail overview: one super-node per community with member counts,
+    plus weighted links between communities. Expand a community with
+    ``/query/overview/{level}/{community_id}``.
+    """
+    try:
+        overview = get_overview(workspace_id, level=level, max_links=max_links)
+        if overview is None:
+            scheduled = schedule_communities(workspace_id)
+            return {
+                "scope": layout_scope(workspace_id), "communities": [], "links": [],
+                "computing": True, "scheduled": scheduled,
+                "message": "Community detection has not run for this scope yet",
+            }
+        if overview["stale"]:
+            schedule_communities(workspace_id)
+        return overview
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch overview: {exc}")
+
+
+@router.get("/overview/{level}/{community_id}")
+def expand_overview_community(
+    level: int,
+    community_id: int,
+    workspace_id: Optional[str] = Q(None, description="Workspace the overview belongs to"),
+    verified_only: bool = Q(False, description="Only include verified relationships"),
+    max_links: int = Q(1000, ge=1, le=10000, description="Maximum links or relationships to return"),
+    max_nodes: int = Q(500, ge=1, le=10000, description="Maximum member entities to return at level 0")
+):
+    """
+    Drill down into one community: its child communities for levels above 0,
+    or its most significant member entities and the relationships between
+    them at level 0 (``member_count`` and ``truncated`` report the rest).
+    """
+    try:
+        expanded = expand_community(workspace_id, level, community_id, max_links=max_links, max_nodes=max_nodes)
+        if expanded is None:
+            raise HTTPException(status_code=404, detail="Community not found")
+        if level > 0:
+            return expanded
+
+        member_ids = expanded.pop("member_ids")
+        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+            nodes = [rec["node"] for rec in session.run(NODES_BY_ID_CYPHER, node_ids=member_ids, ids=[])]
+            rels = [
+                rec["relationship"]
+                for rec in session.run(
+                    rels_between_cypher(verified_only),
+                    node_ids=member_ids,
+                    structural_types=STRUCTURAL_REL_TYPES,
+                    rel_limit=max_links,
+                )
+            ]
+        layout = attach_layout(nodes, workspace_id)
+        return {**expanded, "nodes": nodes, "relationships": rels, "layout": layout}
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to expand community: {exc}")
+
+
+@router.post("/overview/compute")
+def compute_overview(
+    workspace_id: Optional[str] = Q(None, description="Workspace to analyse (global graph if omitted)"),
+    wait: bool = Q(False, description="Compute synchronously and return the result"),
+):
+    """Run community detection for a scope."""
+    if not wait:
+        return {"scope": layout_scope(workspace_id), "scheduled": schedule_communities(workspace_id)}
+    try:
+        return compute_communities(workspace_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Community detection failed: {exc}")
+
+
+@router.get("/centrality")
+def get_centrality(
+    by: Literal["pagerank", "betweenness", "degree"] = Q("pagerank", description="Score to rank entities by"),
+    limit: int = Q(50, ge=1, le=1000, description="Number of top entities to return")
+):
+    """Status of the centrality job and the most central entities by one score."""
+    try:
+        return {**centrality_status(), "by": by, "nodes": top_nodes(by, limit)}
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch centrality: {exc}")
+
+
+@router.post("/centrality/compute")
+def compute_graph_centrality(
+    wait: bool = Q(False, description="Compute synchronously and return the result"),
+):
+    """Recompute degree, PageRank and betweenness scores for the global graph."""
+    if not wait:
+        return {"scheduled": schedule_centrality()}
+    try:
+        return compute_centrality()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Centrality computation failed: {exc}")
+
+
 @router.get("/neighborhood")
 def get_node_neighborhood(
     node_id: str = Q(..., description="Node ID to get neighborhood for"),
     max_hops: int = Q(2, ge=1, le=3, description="Maximum relationship hops"),
     verified_only: bool = Q(False, description="Only include verified relationships"),
-    limit: int = Q(100, ge=10, le=300, description="Maximum number of nodes to return")
+    limit: int = Q(100, ge=10, le=300, description="Maximum number of nodes to return"),
+    fan_out: int = Q(DEFAULT_FAN_OUT, ge=1, le=200, description="Maximum neighbours expanded per node and hop"),
+    rank_by: Literal["significance", "confidence", "pagerank"] = Q("significance", description="How to rank neighbours when a hop exceeds its budget"),
+    workspace_id: Optional[str] = Q(None, description="Workspace whose layout positions to attach (global layout if omitted)")
 ):
     """
     Get the neighborhood around a specific node for incremental loading.
+
+    Expands hop by hop, keeping only the best-ranked neighbours of every
+    frontier node, so hubs cost no more than the requested limit.
     """
-    status_filter = "AND r.status = 'verified'" if verified_only else ""
-    
-    cypher = f"""
-    MATCH (center:Concept)
-    WHERE coalesce(center.id, center.name, elementId(center)) = $node_id
-    WITH center
-    
-    OPTIONAL MATCH path = (center)-[r*1..{max_hops}]-(neighbor:Concept)
-    WHERE 1=1 {status_filter}
-    
-    WITH center, collect(DISTINCT neighbor) AS neighbors, collect(DISTINCT r) AS all_rels
-    
-    WITH [center] + neighbors AS all_nodes, all_rels
-    
-    UNWIND all_nodes AS n
-    WITH DISTINCT n, all_rels
-    OPTIONAL MATCH (n)-[:EXTRACTED_FROM]->(doc:Document)
-    WITH n, all_rels, collect({{id: doc.document_id, title: coalesce(doc.title, doc.document_id), created_by_first_name: doc.created_by_first_name, created_by_last_name: doc.created_by_last_name}}) as source_docs
-    OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
-    WITH n, all_rels, source_docs, collect(DISTINCT type.name) AS type_names
-    WITH collect(DISTINCT {{
-        id: coalesce(n.id, n.name, elementId(n)),
-        label: coalesce(n.label, n.name, n.id),
-        types: CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END,
-        type: CASE WHEN size(type_names) = 0 THEN 'Concept' ELSE head(type_names) END,
-        strength: coalesce(n.strength, 0),
-        significance: coalesce(n.significance, null),
-        sources: source_docs,
-        x: coalesce(n.x, 0),
-        y: coalesce(n.y, 0)
-    }}) AS nodes, all_rels
-    
-    UNWIND all_rels AS rel_chain
-    UNWIND rel_chain AS r
-    WITH nodes, collect(DISTINCT r) AS relationships
-    
-    RETURN nodes[0..$limit] AS nodes, relationships[0..$rel_limit] AS relationships
-    """
-    
     try:
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(cypher, node_id=node_id, limit=limit, rel_limit=limit * 2)
-            record = result.single()
-            
-            if not record:
+            expanded = expand_neighborhood(
+                session, node_id, max_hops, limit,
+                verified_only=verified_only, rank_by=rank_by, fan_out=fan_out, rel_limit=limit * 2,
+            )
+            if expanded is None:
                 return {"nodes": [], "relationships": [], "center_node_id": node_id}
-            
-            return {
-                "nodes": record["nodes"] or [],
-                "relationships": record["relationships"] or [],
-                "center_node_id": node_id,
-                "max_hops": max_hops
-            }
+            nodes = [rec["node"] for rec in session.run(NODES_BY_ID_CYPHER, node_ids=expanded["node_ids"], ids=[])]
+        for node in nodes:
+            node["hop"] = expanded["hops"].get(node["id"])
+        nodes.sort(key=lambda node: node["hop"] if node["hop"] is not None else max_hops + 1)
+        layout = attach_layout(nodes, workspace_id)
+        return {
+            "nodes": nodes,
+            "relationships": expanded["relationships"],
+            "center_node_id": node_id,
+            "max_hops": max_hops,
+            "layout": layout
+        }
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to fetch neighborhood: {exc}")
 
 
+# Selections are resolved node by node through the name index and each
+# selected node's outgoing relationships are kept when the target is also
+# selected (Cypher caches the $node_ids list as a hash set for IN), so the
+# cost grows with the selection and its degree rather than its square.
+MAX_SUBGRAPH_NODES = 20000
+
+SUBGRAPH_NODES_CYPHER = """
+UNWIND $node_ids AS node_id
+MATCH (n:Entity {name: node_id})
+OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
+WITH n, collect(DISTINCT type.name) AS type_names
+RETURN {
+    id: coalesce(n.id, n.name, elementId(n)),
+    label: coalesce(n.label, n.name),
+    types: CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END,
+    type: CASE WHEN size(type_names) = 0 THEN 'Concept' ELSE head(type_names) END,
+    significance: n.significance
+} AS node
+"""
+
+SUBGRAPH_RELS_CYPHER = """
+UNWIND $node_ids AS node_id
+MATCH (s:Entity {name: node_id})-[r]->(t:Entity)
+WHERE t.name IN $node_ids
+RETURN {
+    id: elementId(r),
+    source: coalesce(s.id, s.name, elementId(s)),
+    target: coalesce(t.id, t.name, elementId(t)),
+    relation: coalesce(r.relation, type(r)),
+    status: coalesce(r.status, 'unverified'),
+    significance: r.significance,
+    original_text: r.original_text,
+    confidence: r.confidence
+} AS relationship
+"""
+
+
+class SubgraphRequest(BaseModel):
+    """Node ids whose induced subgraph should be returned."""
+    node_ids: List[str] = []
+
+
+def fetch_subgraph(session, node_ids: List[str]) -> dict:
+    """Nodes for ``node_ids`` and every relationship between two of them."""
+    node_ids = list(dict.fromkeys(node_ids))
+    nodes = [record["node"] for record in session.run(SUBGRAPH_NODES_CYPHER, node_ids=node_ids)]
+    relationships = [
+        record["relationship"]
+        for record in session.run(SUBGRAPH_RELS_CYPHER, node_ids=node_ids)
+    ]
+    return {"nodes": nodes, "relationships": relationships}
+
+
 @router.post("/subgraph")
-def get_subgraph(request: dict):
+def get_subgraph(request: SubgraphRequest):
     """
     Get the subgraph for a set of node IDs.
     Returns all nodes and relationships between them.
     
     Args:
-        request: Dict with 'node_ids' list
+        request: The selected node ids (up to MAX_SUBGRAPH_NODES)
     """
-    from pydantic import BaseModel
-    from typing import List
-    
-    node_ids = request.get('node_ids', [])
-    
-    if not node_ids:
+    if not request.node_ids:
         return {"nodes": [], "relationships": []}
-    
-    # Query to get nodes and their relationships
-    cypher = """
-    MATCH (n:Concept)
-    WHERE coalesce(n.id, n.name, elementId(n)) IN $node_ids
-    WITH collect(n) as nodes
-    UNWIND nodes as n1
-    UNWIND nodes as n2
-    OPTIONAL MATCH (n1)-[r]->(n2)
-    WITH nodes, collect(DISTINCT r) as rels
-    UNWIND nodes AS n
-    OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
-    WITH nodes, rels, n, collect(DISTINCT type.name) AS type_names
-    WITH nodes, rels, collect(DISTINCT {
-        id: coalesce(n.id, n.name, elementId(n)),
-        label: coalesce(n.label, n.name),
-        types: CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END,
-        type: CASE WHEN size(type_names) = 0 THEN 'Concept' ELSE head(type_names) END,
-        significance: n.significance
-    }) AS node_payload
-    RETURN 
-        node_payload as nodes,
-        [r IN rels WHERE r IS NOT NULL | {
-            id: elementId(r),
-            source: coalesce(startNode(r).id, startNode(r).name, elementId(startNode(r))),
-            target: coalesce(endNode(r).id, endNode(r).name, elementId(endNode(r))),
-            relation: coalesce(r.relation, type(r)),
-            status: coalesce(r.status, 'unverified'),
-            significance: r.significance,
-            original_text: r.original_text,
-            confidence: r.confidence
-        }] as relationships
-    """
+    if len(request.node_ids) > MAX_SUBGRAPH_NODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many nodes selected ({len(request.node_ids)}); the limit is {MAX_SUBGRAPH_NODES}",
+        )
     
     try:
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(cypher, node_ids=node_ids)
-            record = result.single()
-            
-            if not record:
-                return {"nodes": [], "relationships": []}
-            
-            return {
-                "nodes": record["nodes"],
-                "relationships": record["relationships"]
-            }
+            return fetch_subgraph(session, request.node_ids)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to get subgraph: {exc}")
 
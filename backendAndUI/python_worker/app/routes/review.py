@@ -1,12 +1,16 @@
 """Review and verification endpoints for expert curation."""
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query as Q, Request
+from pydantic import BaseModel, Field
 
+from ..services.graph_version import MARK_SOURCE_CHANGED_CYPHER, bump_graph_version
 from ..services.neo4j_client import neo4j_client
+from ..services.review_actions import apply_review_actions, apply_review_to_matching
+from ..services.review_queue import REVIEW_ITEM_SYNC_CYPHER, REVIEW_PRIORITY, fetch_review_queue
+from ..services.stats_counters import STATUS_COUNTER_PARAMS, STATUS_COUNTERS_CYPHER, get_review_counts, get_workspace_counters
 from ..core.settings import settings
 
 
@@ -40,172 +44,163 @@ class ReviewFlagRequest(BaseModel):
     reviewer_last_name: Optional[str] = None
 
 
+MAX_BULK_ITEMS = 5000
+
+
+class BulkReviewItem(BaseModel):
+    """One action in a bulk review request."""
+    relationship_id: str
+    action: Literal["confirm", "edit", "flag"] = "confirm"
+    reason: Optional[str] = None
+    confidence: Optional[float] = None
+    original_text: Optional[str] = None
+
+
+class BulkReviewFilter(BaseModel):
+    """Selects relationships for a bulk action without listing their ids."""
+    action: Literal["confirm", "flag"] = "confirm"
+    status: str = "unverified"
+    predicates: Optional[List[str]] = None
+    min_confidence: float = Field(0.0, ge=0.0, le=1.0)
+    max_confidence: float = Field(1.0, ge=0.0, le=1.0)
+    min_priority: float = 0.0
+    workspace_id: Optional[str] = None
+    reason: Optional[str] = None
+    limit: Optional[int] = Field(None, ge=1)
+
+
+class BulkReviewRequest(BaseModel):
+    """Request to review many relationships: explicit items, a filter, or both."""
+    items: List[BulkReviewItem] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+    filter: Optional[BulkReviewFilter] = None
+    reviewer_id: Optional[str] = None
+    reviewer_first_name: Optional[str] = None
+    reviewer_last_name: Optional[str] = None
+
+
 @router.get("/queue")
-def get_review_queue(limit: int = 50, status_filter: str = "unverified", node_ids: Optional[str] = None, workspace_id: Optional[str] = None):
+def get_review_queue(
+    limit: int = Q(50, ge=1, le=500),
+    status_filter: str = "unverified",
+    node_ids: Optional[str] = None,
+    workspace_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+):
     """
-    Fetch relationships that need review.
+    Fetch relationships that need review, most valuable first.
+
+    Items are ordered by ``review_priority`` (significance, source count and
+    extraction confidence). Pass the returned ``next_cursor`` to get the next
+    page; it is null on the last page.
     
     Args:
         limit: Maximum number of items to return
         status_filter: Filter by status (unverified, verified, incorrect)
         node_ids: Optional comma-separated list of node IDs to filter by
         workspace_id: Optional workspace ID to filter by
+        cursor: Cursor from the previous page
     """
-    # Build query based on whether we're filtering by nodes
-    if node_ids:
-        # Parse node IDs
-        ids_list = [id.strip() for id in node_ids.split(',') if id.strip()]
-        
-        workspace_filter = ""
-        if workspace_id:
-            workspace_filter = """
-            AND (
-                r.sources IS NULL
-                OR size(coalesce(r.sources, [])) = 0
-                OR EXISTS {
-                    MATCH (d:Document)-[:IN_WORKSPACE]->(:Workspace {workspace_id: $workspace_id})
-                    WHERE d.document_id IN r.sources
-                }
-            )
-            """
-        
-        cypher = f"""
-        MATCH (s)-[r]->(o)
-        WHERE (s:Entity OR s:Concept) AND (o:Entity OR o:Concept)
-        AND coalesce(r.status, 'unverified') = $status
-        AND (coalesce(s.id, s.name, elementId(s)) IN $node_ids 
-             OR coalesce(o.id, o.name, elementId(o)) IN $node_ids)
-        {workspace_filter}
-        WITH s, r, o, type(r) AS rel_type
-        OPTIONAL MATCH (d:Document) WHERE d.document_id IN r.sources
-        WITH s, r, o, rel_type, collect(DISTINCT {{id: d.document_id, title: coalesce(d.title, d.document_id)}}) as docs
-        CALL {{
-            WITH s
-            OPTIONAL MATCH (s)-[:IS_A]->(stype:Concept)
-            RETURN CASE WHEN count(stype) = 0 THEN ['Concept'] ELSE collect(DISTINCT stype.name) END AS subject_types
-        }}
-        CALL {{
-            WITH o
-            OPTIONAL MATCH (o)-[:IS_A]->(otype:Concept)
-            RETURN CASE WHEN count(otype) = 0 THEN ['Concept'] ELSE collect(DISTINCT otype.name) END AS object_types
-        }}
-        RETURN 
-            elementId(r) AS relationship_id,
-            s.name AS subject,
-            subject_types AS subject_types,
-            head(subject_types) AS subject_type,
-            rel_type AS predicate,
-            o.name AS object,
-            object_types AS object_types,
-            head(object_types) AS object_type,
-            coalesce(r.confidence, 0.0) AS confidence,
-            coalesce(r.original_text, '') AS original_text,
-            coalesce(r.sources, []) AS sources,
-            coalesce(r.status, 'unverified') AS status,
-            r.created_at AS created_at,
-            coalesce(r.flag_reason, '') AS flag_reason,
-            docs AS documents
-        ORDER BY r.created_at DESC
-        LIMIT $limit
-        """
-        params = {"status": status_filter, "limit": limit, "node_ids": ids_list}
-        if workspace_id:
-            params["workspace_id"] = workspace_id
-    else:
-        workspace_filter = ""
-        if workspace_id:
-            workspace_filter = """
-            AND (
-                r.sources IS NULL
-                OR size(coalesce(r.sources, [])) = 0
-                OR EXISTS {
-                    MATCH (d:Document)-[:IN_WORKSPACE]->(:Workspace {workspace_id: $workspace_id})
-                    WHERE d.document_id IN r.sources
-                }
-            )
-            """
-        
-        cypher = f"""
-        MATCH (s)-[r]->(o)
-        WHERE (s:Entity OR s:Concept) AND (o:Entity OR o:Concept)
-        AND coalesce(r.status, 'unverified') = $status
-        {workspace_filter}
-        WITH s, r, o, type(r) as rel_type
-        OPTIONAL MATCH (d:Document) WHERE d.document_id IN r.sources
-        WITH s, r, o, rel_type, collect(DISTINCT {{id: d.document_id, title: coalesce(d.title, d.document_id)}}) as docs
-        CALL {{
-            WITH s
-            OPTIONAL MATCH (s)-[:IS_A]->(stype:Concept)
-            RETURN CASE WHEN count(stype) = 0 THEN ['Concept'] ELSE collect(DISTINCT stype.name) END AS subject_types
-        }}
-        CALL {{
-            WITH o
-            OPTIONAL MATCH (o)-[:IS_A]->(otype:Concept)
-            RETURN CASE WHEN count(otype) = 0 THEN ['Concept'] ELSE collect(DISTINCT otype.name) END AS object_types
-        }}
-        RETURN 
-            elementId(r) AS relationship_id,
-            s.name AS subject,
-            subject_types AS subject_types,
-            head(subject_types) AS subject_type,
-            rel_type AS predicate,
-            o.name AS object,
-            object_types AS object_types,
-            head(object_types) AS object_type,
-            coalesce(r.confidence, 0.0) AS confidence,
-            coalesce(r.original_text, '') AS original_text,
-            coalesce(r.sources, []) AS sources,
-            coalesce(r.status, 'unverified') AS status,
-            r.created_at AS created_at,
-            coalesce(r.flag_reason, '') AS flag_reason,
-            docs AS documents
-        ORDER BY r.created_at DESC
-        LIMIT $limit
-        """
-        params = {"status": status_filter, "limit": limit}
-        if workspace_id:
-            params["workspace_id"] = workspace_id
+    ids_list = [id.strip() for id in node_ids.split(',') if id.strip()] if node_ids else None
     
     try:
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(cypher, **params)
-            items = []
-            for record in result:
-                items.append({
-                    "relationship_id": record["relationship_id"],
-                    "subject": record["subject"],
-                    "subject_type": record["subject_type"],
-                    "subject_types": record.get("subject_types") or [record["subject_type"]] if record["subject_type"] else [],
-                    "predicate": record["predicate"],
-                    "object": record["object"],
-                    "object_type": record["object_type"],
-                    "object_types": record.get("object_types") or [record["object_type"]] if record["object_type"] else [],
-                    "confidence": record["confidence"],
-                    "original_text": record["original_text"],
-                    "sources": record["sources"],
-                    "status": record["status"],
-                    "created_at": str(record["created_at"]) if record["created_at"] else None,
-                    "flag_reason": record["flag_reason"],
-                    "documents": [d for d in record["documents"] if d.get("id")],
-                })
-            return {"items": items, "count": len(items)}
+        page = fetch_review_queue(
+            status=status_filter,
+            limit=limit,
+            cursor=cursor,
+            node_ids=ids_list,
+            workspace_id=workspace_id,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to fetch review queue: {exc}")
 
+    items = []
+    for record in page["records"]:
+        items.append({
+            "relationship_id": record["relationship_id"],
+            "subject": record["subject"],
+            "subject_type": record["subject_type"],
+            "subject_types": record.get("subject_types") or [record["subject_type"]] if record["subject_type"] else [],
+            "predicate": record["predicate"],
+            "object": record["object"],
+            "object_type": record["object_type"],
+            "object_types": record.get("object_types") or [record["object_type"]] if record["object_type"] else [],
+            "confidence": record["confidence"],
+            "original_text": record["original_text"],
+            "sources": record["sources"],
+            "status": record["status"],
+            "review_priority": record["review_priority"],
+            "created_at": str(record["created_at"]) if record["created_at"] else None,
+            "flag_reason": record["flag_reason"],
+            "documents": [d for d in record["documents"] if d.get("id")],
+        })
+    return {"items": items, "count": len(items), "next_cursor": page["next_cursor"]}
+
+
+@router.post("/bulk")
+def bulk_review(payload: BulkReviewRequest):
+    """
+    Confirm, edit or flag many relationships in one request.
+
+    Explicit items are applied in bounded UNWIND batches and each reports its
+    outcome (applied, not_found or failed). A filter applies one action to
+    every matching relationship server-side, e.g. confirming all unverified
+    relations above a confidence threshold.
+    """
+    if not payload.items and payload.filter is None:
+        raise HTTPException(status_code=400, detail="Provide items, a filter, or both")
+
+    reviewer = {
+        "reviewer_id": payload.reviewer_id,
+        "reviewer_first_name": payload.reviewer_first_name,
+        "reviewer_last_name": payload.reviewer_last_name,
+    }
+    response = {}
+    try:
+        if payload.items:
+            response.update(apply_review_actions(
+                [item.model_dump() for item in payload.items], reviewer, bump_version=False
+            ))
+        if payload.filter is not None:
+            f = payload.filter
+            response["filter"] = apply_review_to_matching(
+                f.action,
+                reviewer,
+                from_status=f.status,
+                predicates=f.predicates,
+                min_confidence=f.min_confidence,
+                max_confidence=f.max_confidence,
+                min_priority=f.min_priority,
+                workspace_id=f.workspace_id,
+                reason=f.reason,
+                limit=f.limit,
+                bump_version=False,
+            )
+        if response.get("applied") or response.get("filter", {}).get("updated"):
+            bump_graph_version(structural=False)
+        return response
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Bulk review failed: {exc}")
+
 
 @router.post("/{relationship_id}/confirm")
 def confirm_relationship(relationship_id: str, payload: ReviewConfirmRequest):
     """
     Mark a relationship as verified/confirmed.
     """
-    cypher = """
+    cypher = f"""
     MATCH ()-[r]->()
     WHERE elementId(r) = $rel_id
+    WITH r, coalesce(r.status, 'unverified') AS old_status
     SET r.status = 'verified',
         r.reviewed_at = datetime(),
         r.reviewed_by = $reviewer_id,
         r.reviewed_by_first_name = $reviewer_first_name,
         r.reviewed_by_last_name = $reviewer_last_name
+    {REVIEW_ITEM_SYNC_CYPHER}
+    {MARK_SOURCE_CHANGED_CYPHER}
+    {STATUS_COUNTERS_CYPHER}
     RETURN r.status AS status
     """
     
@@ -216,12 +211,14 @@ def confirm_relationship(relationship_id: str, payload: ReviewConfirmRequest):
                 rel_id=relationship_id,
                 reviewer_id=payload.reviewer_id or "system",
                 reviewer_first_name=payload.reviewer_first_name or "",
-                reviewer_last_name=payload.reviewer_last_name or ""
+                reviewer_last_name=payload.reviewer_last_name or "",
+                **STATUS_COUNTER_PARAMS,
             )
             record = result.single()
             if not record:
                 raise HTTPException(status_code=404, detail="Relationship not found")
             
+            bump_graph_version(structural=False)
             return {"status": "confirmed", "new_status": record["status"]}
     except HTTPException:
         raise
@@ -277,7 +274,12 @@ def edit_relationship(relationship_id: str, payload: ReviewEditRequest):
         cypher = f"""
         MATCH ()-[r]->()
         WHERE elementId(r) = $rel_id
+        WITH r, coalesce(r.status, 'unverified') AS old_status
         SET {', '.join(set_clauses)}
+        SET r.review_priority = {REVIEW_PRIORITY}
+        {REVIEW_ITEM_SYNC_CYPHER}
+        {MARK_SOURCE_CHANGED_CYPHER}
+        {STATUS_COUNTERS_CYPHER}
         RETURN r.status AS status
         """
     else:
@@ -307,17 +309,23 @@ def edit_relationship(relationship_id: str, payload: ReviewEditRequest):
         cypher = f"""
         MATCH ()-[r]->()
         WHERE elementId(r) = $rel_id
+        WITH r, coalesce(r.status, 'unverified') AS old_status
         SET {', '.join(set_clauses)}
+        SET r.review_priority = {REVIEW_PRIORITY}
+        {REVIEW_ITEM_SYNC_CYPHER}
+        {MARK_SOURCE_CHANGED_CYPHER}
+        {STATUS_COUNTERS_CYPHER}
         RETURN r.status AS status
         """
     
     try:
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(cypher, **params)
+            result = session.run(cypher, **params, **STATUS_COUNTER_PARAMS)
             record = result.single()
             if not record:
                 raise HTTPException(status_code=404, detail="Relationship not found")
             
+            bump_graph_version(structural=False)
             return {"status": "edited", "new_status": record["status"]}
     except HTTPException:
         raise
@@ -330,15 +338,19 @@ def flag_relationship(relationship_id: str, payload: ReviewFlagRequest):
     """
     Flag a relationship as incorrect.
     """
-    cypher = """
+    cypher = f"""
     MATCH ()-[r]->()
     WHERE elementId(r) = $rel_id
+    WITH r, coalesce(r.status, 'unverified') AS old_status
     SET r.status = 'incorrect',
         r.reviewed_at = datetime(),
         r.reviewed_by = $reviewer_id,
         r.reviewed_by_first_name = $reviewer_first_name,
         r.reviewed_by_last_name = $reviewer_last_name,
         r.flag_reason = $reason
+    {REVIEW_ITEM_SYNC_CYPHER}
+    {MARK_SOURCE_CHANGED_CYPHER}
+    {STATUS_COUNTERS_CYPHER}
     RETURN r.status AS status
     """
     
@@ -350,12 +362,14 @@ def flag_relationship(relationship_id: str, payload: ReviewFlagRequest):
                 reviewer_id=payload.reviewer_id or "system",
                 reviewer_first_name=payload.reviewer_first_name or "",
                 reviewer_last_name=payload.reviewer_last_name or "",
-                reason=payload.reason or ""
+                reason=payload.reason or "",
+                **STATUS_COUNTER_PARAMS,
             )
             record = result.single()
             if not record:
                 raise HTTPException(status_code=404, detail="Relationship not found")
             
+            bump_graph_version(structural=False)
             return {"status": "flagged", "new_status": record["status"]}
     except HTTPException:
         raise
@@ -367,40 +381,21 @@ def flag_relationship(relationship_id: str, payload: ReviewFlagRequest):
 def get_review_stats(workspace_id: Optional[str] = None):
     """
     Get statistics about the review status of relationships.
+
+    Served from the maintained counters: reviewable relationships overall, or
+    relationships between a workspace's entities.
     """
-    workspace_filter = ""
-    if workspace_id:
-        workspace_filter = """
-        WHERE EXISTS {
-            MATCH (d:Document)-[:IN_WORKSPACE]->(:Workspace {workspace_id: $workspace_id})
-            WHERE d.document_id IN r.sources
-        }
-        """
-    
-    cypher = f"""
-    MATCH (s:Entity)-[r]->(o:Entity)
-    {workspace_filter}
-    RETURN 
-        coalesce(r.status, 'unverified') AS status,
-        count(r) AS count
-    """
-    
     try:
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            params = {}
-            if workspace_id:
-                params["workspace_id"] = workspace_id
-            
-            result = session.run(cypher, **params)
-            stats = {record["status"] or "unknown": record["count"] for record in result}
-            
-            return {
-                "unverified": stats.get("unverified", 0),
-                "verified": stats.get("verified", 0),
-                "incorrect": stats.get("incorrect", 0),
-                "total": sum(stats.values())
-            }
+        if workspace_id:
+            counters = get_workspace_counters(workspace_id)
+            stats = {status: counters[f"{status}_count"] for status in ("unverified", "verified", "incorrect")}
+        else:
+            stats = get_review_counts()
+        return {
+            "unverified": stats.get("unverified", 0),
+            "verified": stats.get("verified", 0),
+            "incorrect": stats.get("incorrect", 0),
+            "total": sum(stats.values())
+        }
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to get review stats: {exc}")
-
-
@@ -226,8 +226,17 @@ def update_member(
     current_user: User = Depends(get_current_user)
 ):
     """Update a member's role or permissions."""
-    # TODO: Implement update member functionality
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+    success = workspace_service.update_member(
+        workspace_id=workspace_id,
+        updater_id=current_user.user_id,
+        member_id=member_id,
+        request=request
+    )
+    
+    if not success:
+        raise HTTPException(status_code=403, detail="Permission denied or member not found")
+    
+    return {"message": "Member updated successfully"}
 
 
 @router.get("/workspaces/{workspace_id}/documents")
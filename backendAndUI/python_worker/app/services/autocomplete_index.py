@@ -0,0 +1,369 @@
+"""In-process autocomplete index for entity names.
+
+Keeps sorted arrays of lowercased name tokens per scope (the whole graph plus
+one scope per workspace) so ``/query/autocomplete`` can answer prefix lookups
+with a binary search instead of a Neo4j round-trip. Tokens are bucketed by
+significance tier, so ranking (full-name matches first, then significance) only
+ever scans as many entries as the page needs. A trigram index provides
+optional fuzzy matching for typos.
+
+The index is built in a background thread at startup, updated directly by the
+write path, and kept in sync with writes from other processes (e.g. the
+RabbitMQ worker) through a lightweight change feed on the indexed
+``changed_at`` property, which every entity write sets, plus a periodic full
+rebuild that also drops merged entities.
+
+Type nodes reached through ``IS_A`` are not extracted from any document, so
+they belong to the global scope only, both when built and when added by the
+write path.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "__global__"
+
+MAX_TIER = 5
+# Minimum trigram similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.3
+# Trigrams shared by more names than this are ignored when fuzzy matching
+MAX_TRIGRAM_POSTINGS = 5000
+
+
+BUILD_CYPHER = """
+MATCH (n:Entity)
+OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
+WITH n, collect(DISTINCT type.name) AS type_names
+OPTIONAL MATCH (n)-[:EXTRACTED_FROM]->(:Document)-[:BELONGS_TO]->(w:Workspace)
+WITH n, type_names, collect(DISTINCT w.workspace_id) AS workspace_ids
+RETURN coalesce(n.id, n.name, elementId(n)) AS id,
+       coalesce(n.label, n.name, n.id) AS label,
+       CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS types,
+       n.significance AS significance,
+       workspace_ids
+"""
+
+CHANGED_AT_INDEX_CYPHER = "CREATE INDEX entity_changed_at IF NOT EXISTS FOR (e:Entity) ON (e.changed_at)"
+
+CHANGES_CYPHER = """
+MATCH (n:Entity)
+WHERE n.changed_at >= datetime($since)
+OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
+WITH n, collect(DISTINCT type.name) AS type_names
+OPTIONAL MATCH (n)-[:EXTRACTED_FROM]->(:Document)-[:BELONGS_TO]->(w:Workspace)
+WITH n, type_names, collect(DISTINCT w.workspace_id) AS workspace_ids
+RETURN coalesce(n.id, n.name, elementId(n)) AS id,
+       coalesce(n.label, n.name, n.id) AS label,
+       CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS types,
+       n.significance AS significance,
+       workspace_ids
+"""
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _significance(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _tier(significance: float) -> int:
+    """Bucket significance into the 0-5 scale used by extraction."""
+    return max(0, min(MAX_TIER, int(round(significance))))
+
+
+def _name_tokens(key: str) -> List[Tuple[bool, str]]:
+    """The full name plus every suffix starting at a later word, flagged as word tokens."""
+    words = key.split()
+    return [(i > 0, " ".join(words[i:])) for i in range(len(words))]
+
+
+# Token buckets in ranking order: full-name matches before later-word matches,
+# higher significance tiers first within each
+BUCKET_ORDER = [(is_word, tier) for is_word in (False, True) for tier in range(MAX_TIER, -1, -1)]
+
+
+@dataclass
+class _Entry:
+    id: str
+    label: str
+    types: List[str]
+    significance: float
+
+    def to_item(self, score: float) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "types": self.types,
+            "type": self.types[0] if self.types else "Concept",
+            "score": score,
+        }
+
+
+@dataclass
+class _ScopeIndex:
+    """Sorted token arrays and trigram postings for one scope."""
+    # (is_word_token, significance tier) -> sorted list of (token, name_key)
+    buckets: Dict[Tuple[bool, int], List[Tuple[str, str]]] = field(default_factory=dict)
+    entries: Dict[str, _Entry] = field(default_factory=dict)
+    trigrams: Dict[str, Set[str]] = field(default_factory=dict)
+    gram_counts: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, key: str, entry: _Entry, grams: Set[str], bulk: bool = False) -> None:
+        existing = self.entries.get(key)
+        self.entries[key] = entry
+        tier = _tier(entry.significance)
+        if existing is not None:
+            old_tier = _tier(existing.significance)
+            if old_tier != tier:
+                for is_word, token in _name_tokens(key):
+                    bucket = self.buckets[(is_word, old_tier)]
+                    pos = bisect_left(bucket, (token, key))
+                    if pos < len(bucket) and bucket[pos] == (token, key):
+                        del bucket[pos]
+                    insort(self.buckets.setdefault((is_word, tier), []), (token, key))
+            return
+        for is_word, token in _name_tokens(key):
+            bucket = self.buckets.setdefault((is_word, tier), [])
+            if bulk:
+                bucket.append((token, key))
+            else:
+                insort(bucket, (token, key))
+        for gram in grams:
+            self.trigrams.setdefault(gram, set()).add(key)
+        self.gram_counts[key] = len(grams)
+
+    def finish_bulk(self) -> None:
+        for bucket in self.buckets.values():
+            bucket.sort()
+
+    def prefix(self, q: str, wanted: int) -> List[Tuple[bool, str]]:
+        """Return up to ``wanted`` (is_word_match, key) pairs in ranking order."""
+        found: List[Tuple[bool, str]] = []
+        seen: Set[str] = set()
+        for bucket_key in BUCKET_ORDER:
+            bucket = self.buckets.get(bucket_key)
+            if not bucket:
+                continue
+            pos = bisect_left(bucket, (q, ""))
+            while pos < len(bucket) and len(found) < wanted:
+                token, key = bucket[pos]
+                if not token.startswith(q):
+                    break
+                if key not in seen:
+                    seen.add(key)
+                    found.append((bucket_key[0], key))
+                pos += 1
+            if len(found) >= wanted:
+                break
+        return found
+
+    def fuzzy(self, q: str, exclude: Set[str]) -> List[Tuple[float, str]]:
+        grams = _trigrams(q)
+        counts: Dict[str, int] = {}
+        for gram in grams:
+            postings = self.trigrams.get(gram, ())
+            # Very common trigrams add little signal and dominate the cost
+            if len(postings) > MAX_TRIGRAM_POSTINGS:
+                continue
+            for key in postings:
+                if key not in exclude:
+                    counts[key] = counts.get(key, 0) + 1
+        scored = []
+        for key, shared in counts.items():
+            similarity = shared / (len(grams) + self.gram_counts[key] - shared)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((similarity, key))
+        return scored
+
+
+class AutocompleteIndex:
+    """Per-workspace in-memory autocomplete over entity names."""
+
+    def __init__(self) -> None:
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._lock = threading.RLock()
+        self._ready = False
+        self._synced_at: Optional[str] = None
+        self._built_monotonic = 0.0
+        self._refreshed_monotonic = 0.0
+        self._refreshing = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    # ------------------------------------------------------------------ building
+
+    def build(self) -> int:
+        """Load every entity from Neo4j and atomically replace the index."""
+        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+            session.run(CHANGED_AT_INDEX_CYPHER).consume()
+            synced_at = session.run("RETURN toString(datetime()) AS now").single()["now"]
+            rows = list(session.run(BUILD_CYPHER))
+
+        scopes: Dict[str, _ScopeIndex] = {GLOBAL_SCOPE: _ScopeIndex()}
+        for row in rows:
+            self._add_row(scopes, row, bulk=True)
+        for scope in scopes.values():
+            scope.finish_bulk()
+
+        with self._lock:
+            self._scopes = scopes
+            self._synced_at = synced_at
+            self._ready = True
+            self._built_monotonic = self._refreshed_monotonic = time.monotonic()
+
+        logger.info(f"Autocomplete index built: {len(rows)} entities across {len(scopes) - 1} workspaces")
+        return len(rows)
+
+    def build_in_background(self) -> None:
+        """Build the index without blocking application startup."""
+        def run():
+            try:
+                self.build()
+            except Exception as exc:
+                logger.warning(f"Autocomplete index build failed, falling back to Neo4j lookups: {exc}")
+
+        threading.Thread(target=run, name="autocomplete-index-build", daemon=True).start()
+
+    def refresh(self) -> int:
+        """Apply entities created or updated since the last sync (the change feed)."""
+        if not self._ready or not self._synced_at:
+            return 0
+        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+            synced_at = session.run("RETURN toString(datetime()) AS now").single()["now"]
+            rows = list(session.run(CHANGES_CYPHER, since=self._synced_at))
+
+        with self._lock:
+            for row in rows:
+                self._add_row(self._scopes, row)
+            self._synced_at = synced_at
+            self._refreshed_monotonic = time.monotonic()
+        return len(rows)
+
+    def maybe_refresh(self) -> None:
+        """Kick off a change-feed refresh or full rebuild in the background when stale."""
+        now = time.monotonic()
+        rebuild_due = now - self._built_monotonic >= settings.autocomplete_rebuild_seconds
+        refresh_due = now - self._refreshed_monotonic >= settings.autocomplete_refresh_seconds
+        if not (rebuild_due or refresh_due):
+            return
+        if not self._refreshing.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                if rebuild_due:
+                    self.build()
+                else:
+                    self.refresh()
+            except Exception as exc:
+                logger.warning(f"Autocomplete index refresh failed: {exc}")
+            finally:
+                self._refreshing.release()
+
+        threading.Thread(target=run, name="autocomplete-index-refresh", daemon=True).start()
+
+    def _add_row(self, scopes: Dict[str, _ScopeIndex], row: Any, bulk: bool = False) -> None:
+        label = row["label"]
+        if not label:
+            return
+        entry = _Entry(
+            id=str(row["id"]),
+            label=str(label),
+            types=list(row["types"] or ["Concept"]),
+            significance=_significance(row["significance"]),
+        )
+        key = " ".join(entry.label.lower().split())
+        grams = _trigrams(key)
+        scopes.setdefault(GLOBAL_SCOPE, _ScopeIndex()).add(key, entry, grams, bulk=bulk)
+        for workspace_id in row["workspace_ids"] or []:
+            scopes.setdefault(workspace_id, _ScopeIndex()).add(key, entry, grams, bulk=bulk)
+
+    # ------------------------------------------------------------------ write path
+
+    def add_entities(self, entities: Iterable[Dict[str, Any]], workspace_id: Optional[str] = None) -> None:
+        """Insert entities written by this process.
+
+        Each entity is a dict with ``name`` and optional ``types`` / ``significance``.
+        Significance only ever increases, mirroring the write path's MERGE logic.
+        Entities with ``workspace_scoped=False`` (type nodes) only go into the
+        global scope, as in a full build.
+        """
+        if not self._ready:
+            return
+        with self._lock:
+            for entity in entities:
+                name = entity.get("name")
+                if not name:
+                    continue
+                key = " ".join(name.lower().split())
+                grams = _trigrams(key)
+                existing = self._scopes[GLOBAL_SCOPE].entries.get(key)
+                types = [t for t in (entity.get("types") or []) if t]
+                significance = _significance(entity.get("significance"))
+                if existing:
+                    entry = _Entry(
+                        id=existing.id,
+                        label=existing.label,
+                        types=sorted(set(existing.types + types) - {"Concept"}) or ["Concept"],
+                        significance=max(existing.significance, significance),
+                    )
+                else:
+                    entry = _Entry(id=name, label=name, types=types or ["Concept"], significance=significance)
+                self._scopes[GLOBAL_SCOPE].add(key, entry, grams)
+                if workspace_id and entity.get("workspace_scoped", True):
+                    self._scopes.setdefault(workspace_id, _ScopeIndex()).add(key, entry, grams)
+
+    # ------------------------------------------------------------------ lookups
+
+    def search(
+        self,
+        q: str,
+        workspace_id: Optional[str] = None,
+        limit: int = 10,
+        skip: int = 0,
+        fuzzy: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Return ranked autocomplete items for ``q`` within a scope."""
+        needle = " ".join(q.lower().split())
+        if not needle:
+            return []
+        with self._lock:
+            scope = self._scopes.get(workspace_id or GLOBAL_SCOPE)
+            if scope is None:
+                return []
+            wanted = skip + limit
+            matches = scope.prefix(needle, wanted)
+            items = [
+                scope.entries[key].to_item(1.0 if is_word else 2.0)
+                for is_word, key in matches
+            ]
+
+            if fuzzy and len(items) < wanted and len(needle) >= 3:
+                fuzzy_matches = scope.fuzzy(needle, {key for _, key in matches})
+                fuzzy_matches.sort(key=lambda m: (-m[0], -scope.entries[m[1]].significance, m[1]))
+                for similarity, key in fuzzy_matches[: wanted - len(items)]:
+                    items.append(scope.entries[key].to_item(round(similarity, 3)))
+
+        return items[skip: skip + limit]
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,123 @@
+"""Vectorized structural centrality scores for the entity graph.
+
+PageRank runs power iteration over the directed graph, applying the
+transition matrix as a sparse matrix-vector product (a ``bincount`` over the
+edge arrays), so every iteration is linear in the number of edges. Iteration
+can start from previous scores, which after a small change to the graph
+converges in a few rounds instead of dozens.
+
+Betweenness is approximated with Brandes' algorithm on the undirected graph
+from a random sample of source nodes and scaled up to the whole graph; each
+source's BFS and dependency accumulation run level by level over CSR arrays.
+"""
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+# Total L1 change (scores sum to 1) below which PageRank has converged
+TOLERANCE = 1e-6
+BETWEENNESS_SAMPLES = 64
+
+
+def degree(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Number of relationships touching each node, in either direction."""
+    return np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+
+
+def pagerank(
+    n: int,
+    src: np.ndarray,
+    dst: np.ndarray,
+    damping: float = DAMPING,
+    start: Optional[np.ndarray] = None,
+    tolerance: float = TOLERANCE,
+    max_iterations: int = MAX_ITERATIONS,
+) -> Tuple[np.ndarray, int]:
+    """Return (scores summing to 1, iterations used).
+
+    Dangling nodes spread their score uniformly. ``start`` warm-starts the
+    iteration, e.g. from the previous run's scores.
+    """
+    if n == 0:
+        return np.zeros(0), 0
+    out_degree = np.bincount(src, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    inverse_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    scores = np.full(n, 1.0 / n) if start is None else np.asarray(start, dtype=np.float64).copy()
+    total = scores.sum()
+    scores = scores / total if total > 0 else np.full(n, 1.0 / n)
+
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        share = scores * inverse_degree
+        updated = damping * np.bincount(dst, weights=share[src], minlength=n)
+        updated += (1.0 - damping + damping * scores[dangling].sum()) / n
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < tolerance:
+            break
+    return scores, iterations
+
+
+def _undirected_csr(n: int, src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(indptr, neighbours) of the simple undirected graph: no self loops or parallel edges."""
+    keep = src != dst
+    keys = np.unique(np.r_[src[keep] * n + dst[keep], dst[keep] * n + src[keep]])
+    rows, cols = keys // n, keys % n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols
+
+
+def approximate_betweenness(
+    n: int,
+    src: np.ndarray,
+    dst: np.ndarray,
+    samples: int = BETWEENNESS_SAMPLES,
+    seed: int = 0,
+) -> np.ndarray:
+    """Normalized betweenness (0..1) estimated from ``samples`` BFS sources."""
+    scores = np.zeros(n)
+    if n < 3:
+        return scores
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    indptr, neighbours = _undirected_csr(n, src, dst)
+    sources = np.random.default_rng(seed).choice(n, size=min(samples, n), replace=False)
+
+    for source in sources:
+        distance = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n)
+        distance[source] = 0
+        sigma[source] = 1.0
+        frontier = np.array([source], dtype=np.int64)
+        levels = []
+        depth = 0
+        while len(frontier):
+            counts = indptr[frontier + 1] - indptr[frontier]
+            heads = np.repeat(frontier, counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            tails = neighbours[np.repeat(indptr[frontier], counts) + offsets]
+            discovered = np.unique(tails[distance[tails] < 0])
+            distance[discovered] = depth + 1
+            on_path = distance[tails] == depth + 1
+            heads, tails = heads[on_path], tails[on_path]
+            sigma += np.bincount(tails, weights=sigma[heads], minlength=n)
+            levels.append((heads, tails))
+            frontier = discovered
+            depth += 1
+
+        dependency = np.zeros(n)
+        for heads, tails in reversed(levels):
+            dependency += np.bincount(heads, weights=sigma[heads] / sigma[tails] * (1.0 + dependency[tails]), minlength=n)
+        dependency[source] = 0.0
+        scores += dependency
+
+    # Scale the sample up to all sources; each unordered pair was counted from both ends
+    scores *= n / len(sources) / 2.0
+    return scores / ((n - 1) * (n - 2) / 2.0)
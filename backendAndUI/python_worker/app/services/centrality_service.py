@@ -0,0 +1,212 @@
+"""Scheduled structural importance scores for entities.
+
+A background job computes ``degree``, ``pagerank`` and ``betweenness`` (see
+``centrality``) over the global entity graph and writes them onto Entity nodes
+in batched ``UNWIND`` updates, only for nodes whose scores actually moved.
+PageRank warm-starts from the stored scores, so a rerun after a modest change
+costs a few iterations. The run is recorded on ``(:CentralityRun {scope})``
+with the graph version it was computed from; a scheduler thread reruns the job
+once the graph version has advanced by ``centrality_version_threshold``.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .centrality import approximate_betweenness, degree, pagerank
+from .graph_version import GLOBAL_SCOPE, get_graph_version
+from .neo4j_client import neo4j_client
+from .scope_graph import load_scope_graph
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 5000
+# Relative change below which a stored score is left as is
+CHANGE_TOLERANCE = 0.01
+
+INDEX_CYPHERS = [
+    "CREATE INDEX entity_pagerank IF NOT EXISTS FOR (e:Entity) ON (e.pagerank)",
+    "CREATE INDEX entity_betweenness IF NOT EXISTS FOR (e:Entity) ON (e.betweenness)",
+]
+
+PREVIOUS_SCORES_CYPHER = """
+MATCH (n:Entity) WHERE n.pagerank IS NOT NULL
+RETURN n.name AS id, n.degree AS degree, n.pagerank AS pagerank, n.betweenness AS betweenness
+"""
+
+WRITE_SCORES_CYPHER = """
+UNWIND $rows AS row
+MATCH (n:Entity {name: row.id})
+SET n.degree = row.degree, n.pagerank = row.pagerank, n.betweenness = row.betweenness
+"""
+
+STATUS_CYPHER = """
+OPTIONAL MATCH (r:CentralityRun {scope: $scope})
+OPTIONAL MATCH (v:GraphVersion {scope: $scope})
+RETURN r.graph_version AS run_graph_version, r.computed_at AS computed_at, r.nodes AS nodes,
+       coalesce(v.version, 0) AS graph_version
+"""
+
+TOP_CYPHER = """
+MATCH (n:Entity) WHERE n.{key} IS NOT NULL
+RETURN {{id: coalesce(n.id, n.name, elementId(n)), label: coalesce(n.label, n.name, n.id),
+        degree: n.degree, pagerank: n.pagerank, betweenness: n.betweenness,
+        significance: n.significance}} AS node
+ORDER BY n.{key} DESC LIMIT $limit
+"""
+
+SCORE_KEYS = ("pagerank", "betweenness", "degree")
+
+_running = threading.Event()
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def _changed(new: np.ndarray, old: np.ndarray) -> np.ndarray:
+    return ~np.isclose(new, old, rtol=CHANGE_TOLERANCE, atol=0.0)
+
+
+def compute_centrality() -> Dict[str, Any]:
+    """Compute and store centrality scores for the global entity graph."""
+    started = time.monotonic()
+    graph_version = get_graph_version()
+    node_ids, _, src, dst = load_scope_graph()
+    n = len(node_ids)
+    if n == 0:
+        return {"scope": GLOBAL_SCOPE, "nodes": 0, "updated": 0}
+
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        for cypher in INDEX_CYPHERS:
+            session.run(cypher)
+        previous = {r["id"]: r for r in session.run(PREVIOUS_SCORES_CYPHER)}
+
+    stored = np.zeros(n, dtype=bool)
+    old = {key: np.zeros(n) for key in SCORE_KEYS}
+    for i, node_id in enumerate(node_ids):
+        record = previous.get(node_id)
+        if record is not None:
+            stored[i] = True
+            for key in SCORE_KEYS:
+                old[key][i] = float(record[key] or 0)
+
+    # New nodes start from the uniform share, existing ones from their last score
+    start = np.where(stored, old["pagerank"], 1.0 / n) if stored.any() else None
+    scores = {
+        "degree": degree(n, src, dst).astype(np.float64),
+        "betweenness": approximate_betweenness(n, src, dst, samples=settings.centrality_betweenness_samples),
+    }
+    scores["pagerank"], iterations = pagerank(n, src, dst, start=start)
+
+    changed = ~stored
+    for key in SCORE_KEYS:
+        changed |= _changed(scores[key], old[key])
+    rows: List[Dict[str, Any]] = [
+        {
+            "id": node_ids[i],
+            "degree": int(scores["degree"][i]),
+            "pagerank": float(scores["pagerank"][i]),
+            "betweenness": float(scores["betweenness"][i]),
+        }
+        for i in np.flatnonzero(changed)
+    ]
+
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        for start_row in range(0, len(rows), WRITE_BATCH_SIZE):
+            session.run(WRITE_SCORES_CYPHER, rows=rows[start_row:start_row + WRITE_BATCH_SIZE])
+        session.run(
+            "MERGE (r:CentralityRun {scope: $scope}) "
+            "SET r.graph_version = $graph_version, r.nodes = $nodes, r.iterations = $iterations, "
+            "    r.computed_at = datetime()",
+            scope=GLOBAL_SCOPE, graph_version=graph_version, nodes=n, iterations=iterations,
+        )
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Centrality computed: {n} nodes, {len(rows)} updated, "
+        f"{iterations} PageRank iterations in {elapsed:.1f}s"
+    )
+    return {
+        "scope": GLOBAL_SCOPE,
+        "nodes": n,
+        "updated": len(rows),
+        "pagerank_iterations": iterations,
+        "graph_version": graph_version,
+        "seconds": round(elapsed, 2),
+    }
+
+
+def schedule_centrality() -> bool:
+    """Run the centrality job in a background thread; False if one is already running."""
+    with _scheduler_lock:
+        if _running.is_set():
+            return False
+        _running.set()
+
+    def run():
+        try:
+            compute_centrality()
+        except Exception as exc:
+            logger.warning(f"Centrality computation failed: {exc}")
+        finally:
+            _running.clear()
+
+    threading.Thread(target=run, name="centrality", daemon=True).start()
+    return True
+
+
+def centrality_status() -> Dict[str, Any]:
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(STATUS_CYPHER, scope=GLOBAL_SCOPE).single()
+    run_version = record["run_graph_version"]
+    graph_version = record["graph_version"]
+    return {
+        "scope": GLOBAL_SCOPE,
+        "graph_version": graph_version,
+        "centrality_graph_version": run_version,
+        "versions_behind": graph_version - run_version if run_version is not None else None,
+        "computed_at": str(record["computed_at"]) if record["computed_at"] else None,
+        "nodes_scored": record["nodes"],
+        "computing": _running.is_set(),
+    }
+
+
+def maybe_schedule_centrality() -> bool:
+    """Schedule a rerun if scores are missing or the graph moved on by the version threshold."""
+    status = centrality_status()
+    behind = status["versions_behind"]
+    if behind is None or behind >= settings.centrality_version_threshold:
+        return schedule_centrality()
+    return False
+
+
+def start_centrality_scheduler() -> None:
+    """Check for stale centrality scores every ``centrality_check_seconds`` in a daemon thread."""
+    global _scheduler_started
+    with _scheduler_lock:
+        if _scheduler_started:
+            return
+        _scheduler_started = True
+
+    def loop():
+        while True:
+            try:
+                maybe_schedule_centrality()
+            except Exception as exc:
+                logger.warning(f"Centrality scheduler check failed: {exc}")
+            time.sleep(settings.centrality_check_seconds)
+
+    threading.Thread(target=loop, name="centrality-scheduler", daemon=True).start()
+
+
+def top_nodes(by: str = "pagerank", limit: int = 50) -> List[Dict[str, Any]]:
+    """Highest-scoring entities by one centrality score."""
+    if by not in SCORE_KEYS:
+        raise ValueError(f"Unknown centrality score: {by}")
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        return [dict(r["node"]) for r in session.run(TOP_CYPHER.format(key=by), limit=limit)]
@@ -0,0 +1,274 @@
+"""Columnar (Arrow IPC / Parquet / CSV) export of the knowledge graph.
+
+Nodes and relationships are read from Neo4j in bounded batches (see
+``graph_export``) and converted into typed Arrow record batches with
+dictionary-encoded string columns. Each batch is written to the output as soon
+as it is built, so the whole graph is never materialised at once.
+
+pyarrow is imported lazily so the rest of the API keeps working when it is not
+installed; callers get a ``RuntimeError`` instead.
+"""
+from __future__ import annotations
+
+import io
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .graph_export import iter_export_nodes, iter_export_relationships
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50000
+
+COLUMNAR_TABLES = ("nodes", "relationships")
+COLUMNAR_FORMATS = ("arrow", "parquet", "csv")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError as exc:
+        raise RuntimeError("Columnar export requires the 'pyarrow' package") from exc
+
+
+def node_schema():
+    """Arrow schema for exported Entity nodes."""
+    pa = _require_pyarrow()
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.string()),
+        ("name", pa.string()),
+        ("type", dict_string),
+        ("types", pa.list_(dict_string)),
+        ("significance", pa.int8()),
+        ("sources", pa.list_(dict_string)),
+    ])
+
+
+def relationship_schema():
+    """Arrow schema for exported relationships."""
+    pa = _require_pyarrow()
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.string()),
+        ("source", dict_string),
+        ("target", dict_string),
+        ("relation", dict_string),
+        ("status", dict_string),
+        ("polarity", dict_string),
+        ("confidence", pa.float64()),
+        ("significance", pa.int8()),
+        ("sources", pa.list_(dict_string)),
+        ("page_number", pa.int32()),
+    ])
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_str_list(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None]
+    return []
+
+
+def _dict_array(values: List[Optional[str]]):
+    pa = _require_pyarrow()
+    return pa.array(values, type=pa.string()).dictionary_encode()
+
+
+def _dict_list_array(values: List[List[str]]):
+    """Build a list<dictionary<string>> array from Python lists of strings."""
+    pa = _require_pyarrow()
+    offsets = [0]
+    flat: List[str] = []
+    for items in values:
+        flat.extend(items)
+        offsets.append(len(flat))
+    inner = pa.array(flat, type=pa.string()).dictionary_encode()
+    return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), inner)
+
+
+def _node_batch(rows: List[Dict[str, Any]]):
+    pa = _require_pyarrow()
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([str(r.get("id")) for r in rows], type=pa.string()),
+            pa.array([r.get("label") for r in rows], type=pa.string()),
+            _dict_array([r.get("type") for r in rows]),
+            _dict_list_array([_as_str_list(r.get("types")) for r in rows]),
+            pa.array([_as_int(r.get("significance")) for r in rows], type=pa.int8()),
+            _dict_list_array([_as_str_list(r.get("sources")) for r in rows]),
+        ],
+        schema=node_schema(),
+    )
+
+
+def _relationship_batch(rows: List[Dict[str, Any]]):
+    pa = _require_pyarrow()
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([str(r.get("id")) for r in rows], type=pa.string()),
+            _dict_array([r.get("source") for r in rows]),
+            _dict_array([r.get("target") for r in rows]),
+            _dict_array([r.get("relation") for r in rows]),
+            _dict_array([r.get("status") for r in rows]),
+            _dict_array([r.get("polarity") for r in rows]),
+            pa.array([_as_float(r.get("confidence")) for r in rows], type=pa.float64()),
+            pa.array([_as_int(r.get("significance")) for r in rows], type=pa.int8()),
+            _dict_list_array([_as_str_list(r.get("sources")) for r in rows]),
+            pa.array([_as_int(r.get("page_number")) for r in rows], type=pa.int32()),
+        ],
+        schema=relationship_schema(),
+    )
+
+
+def _batched(records: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_record_batches(
+    table: str,
+    workspace_id: Optional[str] = None,
+    verified_only: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
+    """Yield typed Arrow record batches for the ``nodes`` or ``relationships`` table."""
+    if table == "nodes":
+        for rows in _batched(iter_export_nodes(workspace_id), batch_size):
+            yield _node_batch(rows)
+    elif table == "relationships":
+        for rows in _batched(iter_export_relationships(workspace_id, verified_only), batch_size):
+            yield _relationship_batch(rows)
+    else:
+        raise ValueError(f"Unknown table: {table}")
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only sink that hands out written bytes while keeping a stable offset.
+
+    Arrow writers call ``tell()`` to record byte offsets (Parquet footers depend
+    on them), so the position must keep growing even after buffered bytes have
+    been drained and sent to the client.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _schema_for(table: str):
+    return node_schema() if table == "nodes" else relationship_schema()
+
+
+def _stream_csv(schema, batches) -> Iterator[bytes]:
+    import pyarrow.csv as pacsv
+
+    sink = _StreamSink()
+    include_header = True
+    for batch in batches:
+        pacsv.write_csv(
+            _flatten_for_csv(batch),
+            sink,
+            write_options=pacsv.WriteOptions(include_header=include_header),
+        )
+        include_header = False
+        yield sink.drain()
+    if include_header:
+        pacsv.write_csv(_flatten_for_csv(schema.empty_table()), sink)
+        yield sink.drain()
+
+
+def stream_columnar(
+    table: str,
+    format: str,
+    workspace_id: Optional[str] = None,
+    verified_only: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Yield the encoded table in ``arrow`` (IPC stream), ``parquet`` or ``csv`` format."""
+    pa = _require_pyarrow()
+    if table not in COLUMNAR_TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    if format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format: {format}")
+
+    schema = _schema_for(table)
+    batches = iter_record_batches(table, workspace_id, verified_only, batch_size)
+
+    if format == "csv":
+        # CSV has no list or dictionary types; columns are flattened per batch
+        yield from _stream_csv(schema, batches)
+        return
+
+    sink = _StreamSink()
+    if format == "arrow":
+        writer = pa.ipc.new_stream(sink, schema)
+    else:
+        import pyarrow.parquet as pq
+        # One row group per batch; dictionary columns map to Parquet dictionary pages
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _flatten_for_csv(data):
+    """Turn list columns into ';'-joined strings and decode dictionary columns."""
+    pa = _require_pyarrow()
+    import pyarrow.compute as pc
+
+    columns = []
+    for field, column in zip(data.schema, data.columns):
+        if pa.types.is_list(field.type):
+            values = column.to_pylist()
+            column = pa.array(["; ".join(v) if v else "" for v in values], type=pa.string())
+        elif pa.types.is_dictionary(field.type):
+            column = pc.cast(column, pa.string())
+        columns.append(column)
+    return pa.table(columns, names=data.schema.names)
@@ -0,0 +1,277 @@
+"""Hierarchical community summaries for overview graphs.
+
+An offline job runs multi-level label propagation (see ``label_propagation``)
+over a scope's entity graph and stores the result as ``(:Community)`` summary
+nodes (member count, label, top members, parent community) linked by weighted
+``COMMUNITY_LINK`` relationships. For the global scope the per-level ids are
+also written onto Entity nodes as ``community_id_0``, ``community_id_1``, ...
+
+Every run writes under a fresh ``run_id`` and only then repoints the scope's
+``(:CommunityRun)`` at it, so readers never see a half-written hierarchy.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from .graph_layout import layout_scope
+from .graph_version import GLOBAL_SCOPE, get_graph_version
+from .label_propagation import aggregate, multilevel_communities
+from .neo4j_client import neo4j_client
+from .scope_graph import load_scope_graph
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+COMMUNITY_LEVELS = 3
+TOP_MEMBERS = 5
+WRITE_BATCH_SIZE = 5000
+# The default overview level is the coarsest one with at least this many communities
+MIN_OVERVIEW_COMMUNITIES = 8
+
+_running: Set[str] = set()
+_running_lock = threading.Lock()
+
+
+def _top_members(labels: np.ndarray, score: np.ndarray, k: int) -> Dict[int, np.ndarray]:
+    """Indices of the ``k`` highest-scoring members of every community."""
+    order = np.lexsort((-score, labels))
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    return {int(sorted_labels[s]): order[s:min(e, s + k)] for s, e in zip(starts, ends)}
+
+
+def _batches(rows: List[Dict[str, Any]]):
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        yield rows[start:start + WRITE_BATCH_SIZE]
+
+
+def compute_communities(workspace_id: Optional[str] = None, levels: int = COMMUNITY_LEVELS) -> Dict[str, Any]:
+    """Detect communities for a scope and persist the summary hierarchy."""
+    scope = layout_scope(workspace_id)
+    started = time.monotonic()
+    graph_version = get_graph_version(workspace_id)
+    # Type hubs reached through IS_A would glue unrelated entities together
+    node_ids, significance, src, dst = load_scope_graph(workspace_id, exclude_rel_types=["IS_A"])
+    n = len(node_ids)
+    if n == 0:
+        return {"scope": scope, "nodes": 0, "levels": []}
+
+    per_level = multilevel_communities(n, src, dst, levels=levels)
+    degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+    score = significance + np.log1p(degree)
+    run_id = uuid.uuid4().hex
+
+    communities: List[Dict[str, Any]] = []
+    links: List[Dict[str, Any]] = []
+    for level, labels in enumerate(per_level):
+        parents = per_level[level + 1] if level + 1 < len(per_level) else None
+        sizes = np.bincount(labels)
+        top = _top_members(labels, score, TOP_MEMBERS)
+        members: Dict[int, List[str]] = {}
+        if level == 0:
+            # Most significant members first, so drill-downs can keep a prefix
+            for i in np.lexsort((-score, labels)):
+                members.setdefault(int(labels[i]), []).append(node_ids[i])
+        # Any member's parent label is the community's parent
+        first_member = np.full(len(sizes), -1, dtype=np.int64)
+        first_member[labels[::-1]] = np.arange(n)[::-1]
+        for community_id, size in enumerate(sizes):
+            if size == 0:
+                continue
+            top_names = [node_ids[i] for i in top[community_id]]
+            communities.append({
+                "level": level,
+                "community_id": community_id,
+                "size": int(size),
+                "label": top_names[0],
+                "top_members": top_names,
+                "parent_id": int(parents[first_member[community_id]]) if parents is not None else None,
+                "member_ids": members.get(community_id),
+            })
+        link_src, link_dst, link_w = aggregate(labels, src, dst)
+        links.extend(
+            {"level": level, "source": int(a), "target": int(b), "weight": float(w)}
+            for a, b, w in zip(link_src, link_dst, link_w)
+        )
+
+    counts = [int(labels.max()) + 1 for labels in per_level]
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        for batch in _batches(communities):
+            session.run(
+                "UNWIND $rows AS row "
+                "CREATE (:Community {scope: $scope, run_id: $run_id, level: row.level, "
+                "  community_id: row.community_id, size: row.size, label: row.label, "
+                "  top_members: row.top_members, parent_id: row.parent_id, member_ids: row.member_ids})",
+                rows=batch, scope=scope, run_id=run_id,
+            )
+        for batch in _batches(links):
+            session.run(
+                "UNWIND $rows AS row "
+                "MATCH (a:Community {run_id: $run_id, level: row.level, community_id: row.source}) "
+                "MATCH (b:Community {run_id: $run_id, level: row.level, community_id: row.target}) "
+                "CREATE (a)-[:COMMUNITY_LINK {weight: row.weight}]->(b)",
+                rows=batch, run_id=run_id,
+            )
+        if scope == GLOBAL_SCOPE:
+            rows = [
+                {"id": node_id, "levels": [int(labels[i]) for labels in per_level]}
+                for i, node_id in enumerate(node_ids)
+            ]
+            set_levels = ", ".join(f"n.community_id_{level} = row.levels[{level}]" for level in range(len(per_level)))
+            for batch in _batches(rows):
+                session.run(
+                    f"UNWIND $rows AS row MATCH (n:Entity {{name: row.id}}) SET {set_levels}",
+                    rows=batch,
+                )
+
+        previous = session.run(
+            "MERGE (r:CommunityRun {scope: $scope}) "
+            "WITH r, r.run_id AS previous "
+            "SET r.run_id = $run_id, r.graph_version = $graph_version, r.level_counts = $counts, "
+            "    r.computed_at = datetime() "
+            "RETURN previous",
+            scope=scope, run_id=run_id, graph_version=graph_version, counts=counts,
+        ).single()["previous"]
+        if previous:
+            while session.run(
+                "MATCH (c:Community {run_id: $run_id}) WITH c LIMIT $batch DETACH DELETE c RETURN count(*) AS deleted",
+                run_id=previous, batch=WRITE_BATCH_SIZE,
+            ).single()["deleted"]:
+                pass
+
+    elapsed = time.monotonic() - started
+    logger.info(f"Communities for {scope} computed: {n} nodes, levels {counts} in {elapsed:.1f}s")
+    return {"scope": scope, "nodes": n, "levels": counts, "graph_version": graph_version, "seconds": round(elapsed, 2)}
+
+
+def schedule_communities(workspace_id: Optional[str] = None) -> bool:
+    """Run community detection in a background thread; False if one is already running."""
+    scope = layout_scope(workspace_id)
+    with _running_lock:
+        if scope in _running:
+            return False
+        _running.add(scope)
+
+    def run():
+        try:
+            compute_communities(workspace_id)
+        except Exception as exc:
+            logger.warning(f"Community detection for {scope} failed: {exc}")
+        finally:
+            with _running_lock:
+                _running.discard(scope)
+
+    threading.Thread(target=run, name=f"communities-{scope}", daemon=True).start()
+    return True
+
+
+def _current_run(session, workspace_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    record = session.run(
+        "MATCH (r:CommunityRun {scope: $scope}) "
+        "OPTIONAL MATCH (v:GraphVersion {scope: $scope}) "
+        "RETURN r.run_id AS run_id, r.level_counts AS level_counts, r.graph_version AS run_graph_version, "
+        "       coalesce(v.version, 0) AS graph_version",
+        scope=layout_scope(workspace_id),
+    ).single()
+    if not record or not record["run_id"]:
+        return None
+    return dict(record)
+
+
+def _default_level(level_counts: List[int]) -> int:
+    for level in range(len(level_counts) - 1, -1, -1):
+        if level_counts[level] >= MIN_OVERVIEW_COMMUNITIES:
+            return level
+    return 0
+
+
+def _communities_with_links(session, run_id: str, level: int, parent_id: Optional[int], max_links: int) -> Dict[str, Any]:
+    parent_filter = "AND c.parent_id = $parent_id " if parent_id is not None else ""
+    communities = [
+        dict(r["community"])
+        for r in session.run(
+            "MATCH (c:Community {run_id: $run_id, level: $level}) "
+            f"WHERE true {parent_filter}"
+            "RETURN c {.community_id, .size, .label, .top_members, .parent_id, level: c.level} AS community "
+            "ORDER BY c.size DESC",
+            run_id=run_id, level=level, parent_id=parent_id,
+        )
+    ]
+    links = [
+        dict(r["link"])
+        for r in session.run(
+            "MATCH (a:Community {run_id: $run_id, level: $level})-[l:COMMUNITY_LINK]->(b:Community) "
+            f"WHERE true {parent_filter.replace('c.', 'a.')}{parent_filter.replace('c.', 'b.')}"
+            "RETURN {source: a.community_id, target: b.community_id, weight: l.weight} AS link "
+            "ORDER BY l.weight DESC LIMIT $max_links",
+            run_id=run_id, level=level, parent_id=parent_id, max_links=max_links,
+        )
+    ]
+    return {"communities": communities, "links": links}
+
+
+def get_overview(workspace_id: Optional[str] = None, level: Optional[int] = None, max_links: int = 1000) -> Optional[Dict[str, Any]]:
+    """Super-nodes and inter-community links for one level; None if communities were never computed."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        run = _current_run(session, workspace_id)
+        if run is None:
+            return None
+        level_counts = list(run["level_counts"] or [])
+        if level is None:
+            level = _default_level(level_counts)
+        level = max(0, min(level, len(level_counts) - 1))
+        payload = _communities_with_links(session, run["run_id"], level, None, max_links)
+    return {
+        "scope": layout_scope(workspace_id),
+        "level": level,
+        "level_counts": level_counts,
+        "stale": run["run_graph_version"] != run["graph_version"],
+        **payload,
+    }
+
+
+def expand_community(
+    workspace_id: Optional[str],
+    level: int,
+    community_id: int,
+    max_links: int = 1000,
+    max_nodes: int = 500,
+) -> Optional[Dict[str, Any]]:
+    """Drill into one community.
+
+    Above level 0 this returns its child communities and the links between
+    them; at level 0 it returns the ids of the ``max_nodes`` most significant
+    members, which callers resolve into entity nodes and relationships.
+    """
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        run = _current_run(session, workspace_id)
+        if run is None:
+            return None
+        community = session.run(
+            "MATCH (c:Community {run_id: $run_id, level: $level, community_id: $community_id}) "
+            "RETURN c {.community_id, .size, .label, .top_members, .parent_id, .member_ids, level: c.level} AS community",
+            run_id=run["run_id"], level=level, community_id=community_id,
+        ).single()
+        if community is None:
+            return None
+        community = dict(community["community"])
+        member_ids = community.pop("member_ids", None)
+        result: Dict[str, Any] = {"scope": layout_scope(workspace_id), "community": community}
+        if level > 0:
+            result.update(_communities_with_links(session, run["run_id"], level - 1, community_id, max_links))
+        else:
+            member_ids = member_ids or []
+            result.update(
+                member_ids=member_ids[:max_nodes],
+                member_count=len(member_ids),
+                truncated=len(member_ids) > max_nodes,
+            )
+    return result
@@ -0,0 +1,284 @@
+"""Near-linear fuzzy duplicate detection for entities.
+
+Comparing every pair of entity names is quadratic, so candidates come from two
+blocking passes that only compare names that already share a bucket:
+
+1. Normalization keys: case-folded, accent- and punctuation-free, singularized
+   tokens joined together, so "BRAF inhibitors" and "B-Raf inhibitor" share
+   the key ``brafinhibitor``.
+2. MinHash over character trigrams with LSH banding, for names that differ
+   by more than the normalization absorbs (typos, word variants). Pairs are
+   kept when their estimated Jaccard similarity reaches the threshold.
+
+Oversized buckets are skipped rather than expanded pairwise, which keeps the
+whole pass close to linear in the number of entities. Optionally, pairs where
+both entities have a stored ``embedding`` are verified by cosine similarity.
+The accepted pairs are ranked and grouped into merge suggestions whose
+``entity_ids`` can be passed straight to ``merge_specific_entities``.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+BANDS = 16
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_MIN_COSINE = 0.85
+# Buckets larger than this are too generic to expand into pairs
+MAX_BUCKET_SIZE = 50
+# Names (and candidate pairs) processed per vectorized chunk, bounding memory
+MINHASH_CHUNK = 20000
+
+ENTITIES_CYPHER = """
+MATCH (n:Entity)
+OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
+WITH n, collect(DISTINCT type.name) AS type_names
+RETURN elementId(n) AS id, n.name AS name,
+       CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS types
+"""
+
+EMBEDDINGS_CYPHER = """
+UNWIND $ids AS id
+MATCH (n:Entity) WHERE elementId(n) = id AND n.embedding IS NOT NULL
+RETURN id, n.embedding AS embedding
+"""
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _singular(token: str) -> str:
+    if len(token) <= 3 or token.endswith(("ss", "us", "is")):
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("ches", "shes", "xes", "ses", "zes")):
+        return token[:-2]
+    if token.endswith("s"):
+        return token[:-1]
+    return token
+
+
+def _tokens(name: str) -> List[str]:
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().casefold()
+    return [_singular(token) for token in _TOKEN.findall(folded)]
+
+
+def normalization_key(name: str) -> str:
+    """Blocking key: folded, singularized tokens with punctuation and spacing removed."""
+    return "".join(_tokens(name))
+
+
+def _shingle_hashes(tokens: List[str]) -> Set[int]:
+    text = f" {' '.join(tokens)} "
+    return {zlib.crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))}
+
+
+def minhash_signatures(token_lists: List[List[str]], num_permutations: int = NUM_PERMUTATIONS, seed: int = 0) -> np.ndarray:
+    """(len(token_lists), num_permutations) MinHash signatures over character trigrams of the joined tokens."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 63, size=num_permutations, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_permutations, dtype=np.uint64)
+    counts: List[int] = []
+    hashes: List[int] = []
+    for tokens in token_lists:
+        shingles = _shingle_hashes(tokens)
+        counts.append(len(shingles))
+        hashes.extend(shingles)
+    hashes_arr = np.asarray(hashes, dtype=np.uint64)
+    # Each name's shingles are contiguous, so its minimum is a reduceat over its run
+    offsets = np.r_[0, np.cumsum(counts)[:-1]].astype(np.int64)
+
+    signatures = np.empty((len(token_lists), num_permutations), dtype=np.uint64)
+    for start in range(0, len(token_lists), MINHASH_CHUNK):
+        stop = min(start + MINHASH_CHUNK, len(token_lists))
+        lo = offsets[start]
+        hi = offsets[stop] if stop < len(token_lists) else len(hashes_arr)
+        # Multiply-shift hashing: wrap-around multiplication is intended
+        with np.errstate(over="ignore"):
+            permuted = (a[:, None] * hashes_arr[None, lo:hi] + b[:, None]) >> np.uint64(32)
+        signatures[start:stop] = np.minimum.reduceat(permuted, offsets[start:stop] - lo, axis=1).T
+    return signatures
+
+
+def _bucket_pairs(keys: np.ndarray) -> Tuple[np.ndarray, int]:
+    """(m, 2) index pairs sharing a key (i < j) and the number of oversized buckets skipped."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    shared = (sizes > 1) & (sizes <= MAX_BUCKET_SIZE)
+    pairs = [np.empty((0, 2), dtype=np.int64)]
+    # Buckets of one size expand together: every (a, b) position pair within the bucket
+    for size in np.unique(sizes[shared]):
+        a, b = np.triu_indices(size, k=1)
+        members = order[starts[shared & (sizes == size)][:, None] + np.arange(size)]
+        pairs.append(np.stack([members[:, a].ravel(), members[:, b].ravel()], axis=1))
+    pairs = np.concatenate(pairs)
+    return np.sort(pairs, axis=1), int((sizes > MAX_BUCKET_SIZE).sum())
+
+
+def _unique_pairs(pairs: np.ndarray, n: int) -> np.ndarray:
+    return np.unique(pairs[:, 0] * n + pairs[:, 1])
+
+
+def candidate_pairs(names: List[str], threshold: float = DEFAULT_THRESHOLD) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Scored candidate pairs (indices into ``names``) plus blocking statistics."""
+    n = len(names)
+    if n < 2:
+        return [], {"key_pairs": 0, "lsh_pairs": 0, "skipped_buckets": 0}
+
+    token_lists = [_tokens(name) for name in names]
+    keys = ["".join(tokens) for tokens in token_lists]
+    _, key_ids = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    key_pairs, skipped = _bucket_pairs(key_ids.reshape(-1))
+    key_codes = _unique_pairs(key_pairs, n)
+
+    signatures = minhash_signatures(token_lists)
+    rows = NUM_PERMUTATIONS // BANDS
+    # Collapse each band to one 64-bit bucket hash; wrap-around multiplication is intended
+    mixers = np.random.default_rng(1).integers(1, 1 << 63, size=rows, dtype=np.uint64) | np.uint64(1)
+    band_pairs = []
+    with np.errstate(over="ignore"):
+        for band in range(BANDS):
+            bucket = (signatures[:, band * rows:(band + 1) * rows] * mixers).sum(axis=1, dtype=np.uint64)
+            pairs, band_skipped = _bucket_pairs(bucket)
+            band_pairs.append(pairs)
+            skipped += band_skipped
+    lsh_codes = _unique_pairs(np.concatenate(band_pairs), n)
+
+    codes = np.union1d(key_codes, lsh_codes)
+    left, right = codes // n, codes % n
+    jaccard = np.empty(len(codes))
+    for start in range(0, len(codes), MINHASH_CHUNK):
+        chunk = slice(start, start + MINHASH_CHUNK)
+        jaccard[chunk] = (signatures[left[chunk]] == signatures[right[chunk]]).mean(axis=1)
+    key_array = np.array(keys, dtype=object)
+    same_key = key_array[left] == key_array[right]
+    keep = np.flatnonzero(same_key | (jaccard >= threshold))
+
+    scored = [
+        {
+            "i": int(left[k]), "j": int(right[k]),
+            "jaccard": round(float(jaccard[k]), 3),
+            "reasons": ["normalized_name"] if same_key[k] else ["minhash"],
+        }
+        for k in keep
+    ]
+    stats = {"key_pairs": len(key_codes), "lsh_pairs": len(lsh_codes), "skipped_buckets": skipped}
+    return scored, stats
+
+
+def _embeddings(ids: List[str]) -> Dict[str, np.ndarray]:
+    if not ids:
+        return {}
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        return {
+            r["id"]: np.asarray(r["embedding"], dtype=np.float32)
+            for r in session.run(EMBEDDINGS_CYPHER, ids=ids)
+        }
+
+
+def _groups(pairs: List[Dict[str, Any]], n: int) -> List[List[int]]:
+    parent = list(range(n))
+
+    def root(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for pair in pairs:
+        parent[root(pair["i"])] = root(pair["j"])
+    members: Dict[int, List[int]] = {}
+    for index in {i for pair in pairs for i in (pair["i"], pair["j"])}:
+        members.setdefault(root(index), []).append(index)
+    return [sorted(group) for group in members.values()]
+
+
+def find_duplicate_candidates(
+    threshold: float = DEFAULT_THRESHOLD,
+    verify_embeddings: bool = False,
+    min_cosine: float = DEFAULT_MIN_COSINE,
+    limit: Optional[int] = 100,
+) -> Dict[str, Any]:
+    """
+    Ranked merge suggestions for entities with near-identical names.
+
+    Args:
+        threshold: Minimum estimated trigram Jaccard similarity for MinHash pairs
+        verify_embeddings: Drop pairs whose stored embeddings are less similar than min_cosine
+        min_cosine: Cosine similarity required when both entities have embeddings
+        limit: Maximum number of suggestions returned (None for all)
+
+    Returns:
+        Dict with merge suggestions (groups of entities plus their scored pairs)
+        and blocking statistics
+    """
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        entities = [dict(r) for r in session.run(ENTITIES_CYPHER) if r["name"]]
+    names = [entity["name"] for entity in entities]
+    pairs, stats = candidate_pairs(names, threshold)
+
+    if verify_embeddings:
+        vectors = _embeddings(sorted({entities[i]["id"] for pair in pairs for i in (pair["i"], pair["j"])}))
+        verified = []
+        for pair in pairs:
+            u = vectors.get(entities[pair["i"]]["id"])
+            v = vectors.get(entities[pair["j"]]["id"])
+            if u is not None and v is not None and len(u) == len(v):
+                cosine = float(u @ v / (np.linalg.norm(u) * np.linalg.norm(v) or 1.0))
+                if cosine < min_cosine:
+                    continue
+                pair["cosine"] = round(cosine, 3)
+                pair["reasons"].append("embedding")
+            verified.append(pair)
+        stats["rejected_by_embedding"] = len(pairs) - len(verified)
+        pairs = verified
+
+    for pair in pairs:
+        pair["score"] = round((pair["jaccard"] + pair["cosine"]) / 2 if "cosine" in pair else pair["jaccard"], 3)
+
+    suggestions = []
+    by_group: Dict[int, List[Dict[str, Any]]] = {}
+    groups = _groups(pairs, len(entities))
+    group_of = {index: g for g, group in enumerate(groups) for index in group}
+    for pair in pairs:
+        by_group.setdefault(group_of[pair["i"]], []).append(pair)
+    for g, group in enumerate(groups):
+        group_pairs = sorted(by_group[g], key=lambda p: -p["score"])
+        suggestions.append({
+            "entity_ids": [entities[i]["id"] for i in group],
+            "names": [entities[i]["name"] for i in group],
+            "types": [entities[i]["types"] for i in group],
+            "score": round(min(p["score"] for p in group_pairs), 3),
+            "pairs": [
+                {
+                    "entity_ids": [entities[p["i"]]["id"], entities[p["j"]]["id"]],
+                    "names": [entities[p["i"]]["name"], entities[p["j"]]["name"]],
+                    **{key: p[key] for key in ("score", "jaccard", "cosine", "reasons") if key in p},
+                }
+                for p in group_pairs
+            ],
+        })
+    suggestions.sort(key=lambda s: (-s["score"], -len(s["entity_ids"])))
+    logger.info(f"Duplicate detection: {len(entities)} entities, {len(pairs)} pairs, {len(suggestions)} suggestions")
+    return {
+        "entities_scanned": len(entities),
+        "pairs_found": len(pairs),
+        "suggestion_count": len(suggestions),
+        "suggestions": suggestions[:limit] if limit else suggestions,
+        "statistics": stats,
+    }
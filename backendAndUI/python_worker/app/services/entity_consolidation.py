@@ -1,36 +1,56 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional, Dict, Any
 
 from .neo4j_client import neo4j_client
+from .graph_version import bump_all_graph_versions
+from .review_queue import REVIEW_ITEM_SYNC_CYPHER, prune_review_items
+from .type_closure import refresh_type_closure
 from ..core.settings import settings
 
 
 logger = logging.getLogger(__name__)
 
 
-def consolidate_identical_entities() -> Dict[str, Any]:
-    """
-    Use APOC to consolidate identical entities in the knowledge graph.
-    
-    This function identifies entities with the same name and type, then merges them
-    using APOC's mergeNodes function, consolidating all their relationships.
-    
-    Returns:
-        Dict containing consolidation statistics
-    """
-    consolidation_cypher = """
-    // Find entities with identical names and identical type sets
-    MATCH (n:Entity)
-    OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
-    WITH n, collect(DISTINCT type.name) AS type_names
-    WITH n,
-         n.name AS entity_name,
-         apoc.coll.sort(CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END) AS entity_types
-    WITH entity_name, entity_types, collect(n) AS nodes
+CONSOLIDATION_SCOPE = "identical"
+
+DUPLICATE_GROUPS_CYPHER = """
+// Entities with identical names and identical type sets
+MATCH (n:Entity)
+OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
+WITH n, collect(DISTINCT type.name) AS type_names
+WITH n,
+     n.name AS entity_name,
+     apoc.coll.sort(CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END) AS entity_types
+WITH entity_name, entity_types, collect(elementId(n)) AS ids
+WHERE size(ids) > 1
+RETURN entity_name, entity_types, ids
+ORDER BY entity_name
+"""
+
+# Merging recreates the moved relationships under new ids, so their review
+# items are upserted again (``node`` in scope); the old ones are pruned later
+REVIEW_ITEMS_OF_NODE_CYPHER = """
+CALL {
+    WITH node
+    MATCH (node)-[r]-(:Entity)
+    WHERE r.review_priority IS NOT NULL
+    """ + REVIEW_ITEM_SYNC_CYPHER + """
+    RETURN count(*) AS review_items
+}
+"""
+
+MERGE_GROUPS_CYPHER = """
+UNWIND $groups AS group
+CALL {
+    WITH group
+    MATCH (n:Entity) WHERE elementId(n) IN group.ids
+    WITH collect(n) AS nodes
     WHERE size(nodes) > 1
-    
     CALL apoc.refactor.mergeNodes(nodes, {
         mergeRels: true,
         properties: {
@@ -45,42 +65,256 @@ def consolidate_identical_entities() -> Dict[str, Any]:
             significance: 'combine'
         }
     }) YIELD node
-    
-    RETURN count(node) AS merged_nodes, 
-           collect({name: entity_name, types: entity_types}) AS entity_groups
+    SET node.changed_at = datetime()
+    """ + REVIEW_ITEMS_OF_NODE_CYPHER + """
+    RETURN size(nodes) AS merged_nodes
+}
+RETURN group.name AS name, group.types AS types, merged_nodes
+"""
+
+# Each batch writes its own checkpoint node, so concurrent batches never
+# contend on the run or statistics nodes; the coordinating thread folds them in
+CHECKPOINT_CYPHER = """
+CREATE (:ConsolidationCheckpoint {
+    scope: $scope,
+    merged_groups: $merged_groups,
+    merged_nodes: $merged_nodes,
+    duplicate_groups: $duplicate_groups,
+    entities_in_duplicates: $entities_in_duplicates,
+    created_at: datetime()
+})
+"""
+
+FOLD_CHECKPOINTS_CYPHER = """
+MATCH (c:ConsolidationCheckpoint {scope: $scope})
+WITH collect(c) AS checkpoints
+WHERE size(checkpoints) > 0
+MATCH (r:ConsolidationRun {scope: $scope})
+SET r.batches_done = r.batches_done + size(checkpoints),
+    r.merged_groups = r.merged_groups + reduce(n = 0, c IN checkpoints | n + c.merged_groups),
+    r.merged_nodes = r.merged_nodes + reduce(n = 0, c IN checkpoints | n + c.merged_nodes),
+    r.updated_at = datetime()
+WITH checkpoints,
+     reduce(n = 0, c IN checkpoints | n + c.duplicate_groups) AS duplicate_groups,
+     reduce(n = 0, c IN checkpoints | n + c.entities_in_duplicates) AS entities_in_duplicates
+OPTIONAL MATCH (s:ConsolidationStats {scope: $scope})
+FOREACH (_ IN CASE WHEN s IS NULL THEN [] ELSE [1] END |
+    SET s.duplicate_groups = s.duplicate_groups + duplicate_groups,
+        s.entities_in_duplicates = s.entities_in_duplicates + entities_in_duplicates,
+        s.updated_at = datetime()
+)
+FOREACH (c IN checkpoints | DELETE c)
+"""
+
+START_RUN_CYPHER = """
+MERGE (r:ConsolidationRun {scope: $scope})
+WITH r, coalesce(r.status IN ['running', 'failed'], false) AS resumed
+SET r.status = 'running',
+    r.batch_size = $batch_size,
+    r.batches_done = CASE WHEN resumed THEN r.batches_done ELSE 0 END,
+    r.merged_groups = CASE WHEN resumed THEN r.merged_groups ELSE 0 END,
+    r.merged_nodes = CASE WHEN resumed THEN r.merged_nodes ELSE 0 END,
+    r.started_at = CASE WHEN resumed THEN r.started_at ELSE datetime() END,
+    r.updated_at = datetime(),
+    r.error = null
+RETURN resumed
+"""
+
+# Duplicate groups among the entities with the given names, before or after a merge
+AFFECTED_DUPLICATES_CYPHER = """
+UNWIND $names AS name
+MATCH (n:Entity {name: name})
+OPTIONAL MATCH (n)-[:IS_A]->(type:Concept)
+WITH name, n, collect(DISTINCT type.name) AS type_names
+WITH name,
+     apoc.coll.sort(CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END) AS entity_types,
+     count(n) AS group_size
+WHERE group_size > 1
+RETURN count(*) AS duplicate_groups, coalesce(sum(group_size), 0) AS entities_in_duplicates
+"""
+
+ALL_DUPLICATES_CYPHER = """
+MATCH (m:Entity)
+OPTIONAL MATCH (m)-[:IS_A]->(type:Concept)
+WITH m, collect(DISTINCT type.name) AS type_names
+WITH m.name AS entity_name,
+     apoc.coll.sort(CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END) AS entity_types,
+     count(m) AS group_size
+WHERE group_size > 1
+RETURN count(*) AS duplicate_groups, coalesce(sum(group_size), 0) AS entities_in_duplicates
+"""
+
+ADJUST_STATS_CYPHER = """
+MATCH (s:ConsolidationStats {scope: $scope})
+SET s.duplicate_groups = s.duplicate_groups + $duplicate_groups,
+    s.entities_in_duplicates = s.entities_in_duplicates + $entities_in_duplicates,
+    s.updated_at = datetime()
+"""
+
+_consolidation_running = threading.Event()
+_consolidation_lock = threading.Lock()
+_stats_scheduler_started = False
+
+
+def _affected_duplicates_tx(tx, names: List[str]) -> Dict[str, int]:
+    record = tx.run(AFFECTED_DUPLICATES_CYPHER, names=sorted(set(names))).single()
+    return {"duplicate_groups": record["duplicate_groups"], "entities_in_duplicates": record["entities_in_duplicates"]}
+
+
+def _adjust_stats_tx(tx, before: Dict[str, int], after: Dict[str, int]) -> None:
+    """Apply the change in duplicate counts among merged names to the maintained statistics."""
+    tx.run(
+        ADJUST_STATS_CYPHER,
+        scope=CONSOLIDATION_SCOPE,
+        duplicate_groups=after["duplicate_groups"] - before["duplicate_groups"],
+        entities_in_duplicates=after["entities_in_duplicates"] - before["entities_in_duplicates"],
+    )
+
+
+def _merge_batch(groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge one batch of duplicate groups and write its checkpoint in the same transaction.
+
+    Graph versions are bumped once per run by the caller, not per batch.
+    """
+    names = [group["name"] for group in groups]
+
+    def work(tx):
+        before = _affected_duplicates_tx(tx, names)
+        merged = [dict(r) for r in tx.run(MERGE_GROUPS_CYPHER, groups=groups)]
+        after = _affected_duplicates_tx(tx, names) if merged else before
+        tx.run(
+            CHECKPOINT_CYPHER,
+            scope=CONSOLIDATION_SCOPE,
+            merged_groups=len(merged),
+            merged_nodes=sum(r["merged_nodes"] for r in merged),
+            duplicate_groups=after["duplicate_groups"] - before["duplicate_groups"],
+            entities_in_duplicates=after["entities_in_duplicates"] - before["entities_in_duplicates"],
+        )
+        return merged
+
+    return neo4j_client.execute_write(work)
+
+
+def _fold_checkpoints() -> None:
+    neo4j_client.execute_write(lambda tx: tx.run(FOLD_CHECKPOINTS_CYPHER, scope=CONSOLIDATION_SCOPE).consume())
+
+
+def _prune_review_items() -> None:
+    try:
+        prune_review_items()
+    except Exception as exc:
+        logger.warning(f"Pruning review items after consolidation failed: {exc}")
+
+
+def consolidate_identical_entities(
+    batch_size: Optional[int] = None,
+    parallelism: Optional[int] = None,
+) -> Dict[str, Any]:
     """
+    Use APOC to consolidate identical entities in the knowledge graph.
     
+    This function identifies entities with the same name and type, then merges them
+    using APOC's mergeNodes function, consolidating all their relationships.
+
+    Groups are merged in batches of ``batch_size``, each in its own short
+    transaction, so the server never holds one huge transaction and
+    concurrent ingestion is only blocked briefly. Every batch writes its own
+    ``(:ConsolidationCheckpoint)`` in the same transaction, which this thread
+    folds into the ``(:ConsolidationRun)`` and statistics as batches finish;
+    after a crash the next run folds the leftovers and resumes its counters,
+    and groups that were already merged are no longer duplicates, so only the
+    remainder is processed. Graph versions are bumped (with a reset) once at
+    the end of the run, or at the start of a resumed one.
+
+    Args:
+        batch_size: Duplicate groups per transaction (default: settings.consolidation_batch_size)
+        parallelism: Batches merged concurrently (default: settings.consolidation_parallelism)
+    
+    Returns:
+        Dict containing consolidation statistics
+    """
+    batch_size = max(1, batch_size or settings.consolidation_batch_size)
+    parallelism = max(1, parallelism or settings.consolidation_parallelism)
+
     try:
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(consolidation_cypher)
-            record = result.single()
-            
-            if record:
-                merged_count = record["merged_nodes"] or 0
-                entity_groups = record["entity_groups"] or []
-                
-                logger.info(f"APOC consolidation completed: {merged_count} entity groups merged")
-                logger.info(f"Merged entity groups: {entity_groups}")
-                
-                return {
-                    "success": True,
-                    "merged_entity_groups": merged_count,
-                    "merged_entity_names": [group.get("name") for group in entity_groups],
-                    "merged_entity_details": entity_groups,
-                    "message": f"Successfully consolidated {merged_count} groups of identical entities"
-                }
-            else:
-                logger.info("No duplicate entities found for consolidation")
-                return {
-                    "success": True,
-                    "merged_entity_groups": 0,
-                    "merged_entity_names": [],
-                    "merged_entity_details": [],
-                    "message": "No duplicate entities found"
-                }
+            resumed = session.run(START_RUN_CYPHER, scope=CONSOLIDATION_SCOPE, batch_size=batch_size).single()["resumed"]
+            groups = [
+                {"name": r["entity_name"], "types": r["entity_types"], "ids": r["ids"]}
+                for r in session.run(DUPLICATE_GROUPS_CYPHER)
+            ]
+        if resumed:
+            # The interrupted run may have merged batches without bumping versions
+            _fold_checkpoints()
+            bump_all_graph_versions(reset=True)
+        batches = [groups[i:i + batch_size] for i in range(0, len(groups), batch_size)]
+        logger.info(
+            f"Consolidating {len(groups)} duplicate groups in {len(batches)} batches"
+            f"{' (resuming previous run)' if resumed else ''}"
+        )
+
+        entity_groups: List[Dict[str, Any]] = []
+        merged_nodes = 0
+        completed = False
+        try:
+            with ThreadPoolExecutor(max_workers=parallelism) as pool:
+                futures = [pool.submit(_merge_batch, batch) for batch in batches]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    merged = future.result()
+                    entity_groups.extend({"name": r["name"], "types": r["types"]} for r in merged)
+                    merged_nodes += sum(r["merged_nodes"] for r in merged)
+                    _fold_checkpoints()
+                    logger.info(f"Consolidation batch {done}/{len(batches)}: {len(entity_groups)} groups merged so far")
+            completed = True
+        finally:
+            # After a failure, batches still running when it was raised may have merged too
+            if merged_nodes or not completed:
+                bump_all_graph_versions(reset=True)
+
+        merged_count = len(entity_groups)
+        neo4j_client.execute_write(lambda tx: tx.run(
+            "MATCH (r:ConsolidationRun {scope: $scope}) "
+            "SET r.status = 'completed', r.finished_at = datetime(), r.updated_at = datetime()",
+            scope=CONSOLIDATION_SCOPE,
+        ))
+        logger.info(f"APOC consolidation completed: {merged_count} entity groups merged")
+        if merged_nodes:
+            _prune_review_items()
+
+        if merged_count:
+            return {
+                "success": True,
+                "merged_entity_groups": merged_count,
+                "merged_entity_nodes": merged_nodes,
+                "merged_entity_names": [group.get("name") for group in entity_groups],
+                "merged_entity_details": entity_groups,
+                "batches": len(batches),
+                "resumed": resumed,
+                "message": f"Successfully consolidated {merged_count} groups of identical entities"
+            }
+        else:
+            logger.info("No duplicate entities found for consolidation")
+            return {
+                "success": True,
+                "merged_entity_groups": 0,
+                "merged_entity_nodes": 0,
+                "merged_entity_names": [],
+                "merged_entity_details": [],
+                "batches": len(batches),
+                "resumed": resumed,
+                "message": "No duplicate entities found"
+            }
                 
     except Exception as exc:
         logger.error(f"APOC consolidation failed: {exc}")
+        try:
+            neo4j_client.execute_write(lambda tx: tx.run(
+                "MATCH (r:ConsolidationRun {scope: $scope}) WHERE r.status = 'running' "
+                "SET r.status = 'failed', r.error = $error, r.updated_at = datetime()",
+                scope=CONSOLIDATION_SCOPE, error=str(exc),
+            ))
+        except Exception:
+            pass
         return {
             "success": False,
             "error": str(exc),
@@ -88,6 +322,35 @@ def consolidate_identical_entities() -> Dict[str, Any]:
         }
 
 
+def schedule_consolidation(batch_size: Optional[int] = None, parallelism: Optional[int] = None) -> bool:
+    """Run the consolidation in a background thread; False if one is already running."""
+    with _consolidation_lock:
+        if _consolidation_running.is_set():
+            return False
+        _consolidation_running.set()
+
+    def run():
+        try:
+            consolidate_identical_entities(batch_size, parallelism)
+        finally:
+            _consolidation_running.clear()
+
+    threading.Thread(target=run, name="entity-consolidation", daemon=True).start()
+    return True
+
+
+def consolidation_status() -> Dict[str, Any]:
+    """Progress of the current or last consolidation run, from its checkpoint."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(
+            "MATCH (r:ConsolidationRun {scope: $scope}) RETURN properties(r) AS run",
+            scope=CONSOLIDATION_SCOPE,
+        ).single()
+    run = {key: str(value) if key.endswith("_at") else value for key, value in (record["run"] if record else {}).items()}
+    run["in_progress"] = _consolidation_running.is_set()
+    return run
+
+
 def find_duplicate_entities() -> List[Dict[str, Any]]:
     """
     Find entities that have identical names and types (potential duplicates).
@@ -174,38 +437,51 @@ def merge_specific_entities(entity_ids: List[str]) -> Dict[str, Any]:
             significance: 'combine'
         }
     }) YIELD node
+    """ + REVIEW_ITEMS_OF_NODE_CYPHER + """
     OPTIONAL MATCH (node)-[:IS_A]->(type:Concept)
     WITH node, collect(DISTINCT type.name) AS type_names
     RETURN node, elementId(node) AS merged_id, CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS merged_types
     """
     
     try:
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(merge_specific_cypher, entity_ids=entity_ids)
-            record = result.single()
-            
+        def work(tx):
+            names = tx.run(
+                "MATCH (n:Entity) WHERE elementId(n) IN $entity_ids RETURN collect(DISTINCT n.name) AS names",
+                entity_ids=entity_ids,
+            ).single()["names"]
+            before = _affected_duplicates_tx(tx, names)
+            record = tx.run(merge_specific_cypher, entity_ids=entity_ids).single()
             if record:
-                merged_node = record["node"]
-                merged_id = record["merged_id"]
-                merged_types = record["merged_types"] or ["Concept"]
-                
-                logger.info(f"Successfully merged entities into: {merged_node['name']} ({merged_id}) with types {merged_types}")
-                
-                return {
-                    "success": True,
-                    "merged_entity_id": merged_id,
-                    "merged_entity_name": merged_node["name"],
-                    "merged_entity_type": merged_types[0],
-                    "merged_entity_types": merged_types,
-                    "message": f"Successfully merged {len(entity_ids)} entities into {merged_node['name']}"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "No entities found with provided IDs",
-                    "message": "Could not find entities to merge"
-                }
-                
+                _adjust_stats_tx(tx, before, _affected_duplicates_tx(tx, names))
+            return record
+
+        record = neo4j_client.execute_write(work)
+
+        if record:
+            merged_node = record["node"]
+            merged_id = record["merged_id"]
+            merged_types = record["merged_types"] or ["Concept"]
+            
+            logger.info(f"Successfully merged entities into: {merged_node['name']} ({merged_id}) with types {merged_types}")
+            # The merged node may have gained types, and descendants may list a discarded name
+            refresh_type_closure([merged_node["name"]], include_descendants=True)
+            bump_all_graph_versions(reset=True)
+            
+            return {
+                "success": True,
+                "merged_entity_id": merged_id,
+                "merged_entity_name": merged_node["name"],
+                "merged_entity_type": merged_types[0],
+                "merged_entity_types": merged_types,
+                "message": f"Successfully merged {len(entity_ids)} entities into {merged_node['name']}"
+            }
+        else:
+            return {
+                "success": False,
+                "error": "No entities found with provided IDs",
+                "message": "Could not find entities to merge"
+            }
+            
     except Exception as exc:
         logger.error(f"Failed to merge specific entities: {exc}")
         return {
@@ -215,60 +491,88 @@ def merge_specific_entities(entity_ids: List[str]) -> Dict[str, Any]:
         }
 
 
+def reconcile_consolidation_stats() -> Dict[str, int]:
+    """Recount duplicate groups over the whole graph and store them on the stats node."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        counts = dict(session.run(ALL_DUPLICATES_CYPHER).single())
+        session.run(
+            "MERGE (s:ConsolidationStats {scope: $scope}) "
+            "SET s.duplicate_groups = $duplicate_groups, s.entities_in_duplicates = $entities_in_duplicates, "
+            "    s.updated_at = datetime(), s.reconciled_at = datetime()",
+            scope=CONSOLIDATION_SCOPE, **counts,
+        )
+    logger.info(f"Consolidation statistics reconciled: {counts}")
+    return counts
+
+
+def start_consolidation_stats_scheduler() -> None:
+    """Reconcile the duplicate statistics every ``consolidation_stats_reconcile_seconds`` in a daemon thread."""
+    global _stats_scheduler_started
+    with _consolidation_lock:
+        if _stats_scheduler_started:
+            return
+        _stats_scheduler_started = True
+
+    def loop():
+        while True:
+            try:
+                reconcile_consolidation_stats()
+            except Exception as exc:
+                logger.warning(f"Consolidation statistics reconciliation failed: {exc}")
+            time.sleep(settings.consolidation_stats_reconcile_seconds)
+
+    threading.Thread(target=loop, name="consolidation-stats", daemon=True).start()
+
+
+def check_apoc() -> Dict[str, Any]:
+    """Run a trivial APOC call; returns an error dict when APOC is unavailable."""
+    try:
+        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+            session.run("RETURN apoc.coll.sort([2, 1]) AS sorted").single()
+        return {"apoc_available": True}
+    except Exception as exc:
+        logger.error(f"APOC check failed: {exc}")
+        return {"error": str(exc), "message": "APOC is not available"}
+
+
 def get_consolidation_stats() -> Dict[str, Any]:
     """
     Get statistics about the current state of entity consolidation.
+
+    Entity and relationship totals come from Neo4j's count store. Duplicate
+    counts are read from the ``(:ConsolidationStats)`` node, which merges keep
+    current and a periodic job reconciles; it is only computed here when it
+    does not exist yet.
     
     Returns:
         Dict containing consolidation statistics
     """
-    stats_cypher = """
-    // Total entities
-    MATCH (n:Entity)
-    WITH count(n) AS total_entities
-    
-    CALL {
-        MATCH (m:Entity)
-        OPTIONAL MATCH (m)-[:IS_A]->(type:Concept)
-        WITH m.name AS entity_name,
-             apoc.coll.sort(CASE WHEN count(type) = 0 THEN ['Concept'] ELSE collect(DISTINCT type.name) END) AS entity_types,
-             collect(m) AS nodes
-        WHERE size(nodes) > 1
-        RETURN count(*) AS duplicate_groups, sum(size(nodes)) AS entities_in_duplicates
-        UNION
-        RETURN 0 AS duplicate_groups, 0 AS entities_in_duplicates
-        ORDER BY duplicate_groups DESC, entities_in_duplicates DESC
-        LIMIT 1
-    }
-    
-    MATCH ()-[r]->()
-    WITH total_entities, duplicate_groups, entities_in_duplicates, count(r) AS total_relationships
-    
-    RETURN total_entities, duplicate_groups, entities_in_duplicates, total_relationships,
-           CASE WHEN duplicate_groups > 0 THEN entities_in_duplicates - duplicate_groups ELSE 0 END AS potential_merges
-    """
-    
     try:
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(stats_cypher)
-            record = result.single()
-            
-            if record:
-                return {
-                    "total_entities": record["total_entities"],
-                    "duplicate_groups": record["duplicate_groups"],
-                    "entities_in_duplicates": record["entities_in_duplicates"],
-                    "total_relationships": record["total_relationships"],
-                    "potential_merges": record["potential_merges"]
-                }
-            else:
-                return {
-                    "total_entities": 0,
-                    "duplicate_groups": 0,
-                    "entities_in_duplicates": 0,
-                    "total_relationships": 0,
-                    "potential_merges": 0
-                }
+            total_entities = session.run("MATCH (n:Entity) RETURN count(n) AS total").single()["total"]
+            total_relationships = session.run("MATCH ()-[r]->() RETURN count(r) AS total").single()["total"]
+            record = session.run(
+                "MATCH (s:ConsolidationStats {scope: $scope}) "
+                "RETURN s.duplicate_groups AS duplicate_groups, s.entities_in_duplicates AS entities_in_duplicates, "
+                "       s.updated_at AS updated_at, s.reconciled_at AS reconciled_at",
+                scope=CONSOLIDATION_SCOPE,
+            ).single()
+
+        if record is None:
+            reconcile_consolidation_stats()
+            return get_consolidation_stats()
+
+        duplicate_groups = max(record["duplicate_groups"], 0)
+        entities_in_duplicates = max(record["entities_in_duplicates"], 0)
+        return {
+            "total_entities": total_entities,
+            "duplicate_groups": duplicate_groups,
+            "entities_in_duplicates": entities_in_duplicates,
+            "total_relationships": total_relationships,
+            "potential_merges": entities_in_duplicates - duplicate_groups if duplicate_groups > 0 else 0,
+            "updated_at": str(record["updated_at"]) if record["updated_at"] else None,
+            "reconciled_at": str(record["reconciled_at"]) if record["reconciled_at"] else None
+        }
                 
     except Exception as exc:
         logger.error(f"Failed to get consolidation stats: {exc}")
@@ -276,5 +580,3 @@ def get_consolidation_stats() -> Dict[str, Any]:
             "error": str(exc),
             "message": "Failed to retrieve consolidation statistics"
         }
-
-
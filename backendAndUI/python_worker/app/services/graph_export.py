@@ -0,0 +1,108 @@
+"""Server-side graph export that streams records straight from Neo4j.
+
+The browser-driven export in ``routes/export.py`` posts the whole graph back to
+the server. The helpers here instead pull nodes and relationships over Bolt with
+a workspace filter and yield them one record at a time, so callers can stream
+the output without ever holding the full graph in memory.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterator, Optional
+
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Records pulled from the server per Bolt round-trip while streaming.
+EXPORT_FETCH_SIZE = 2000
+
+# Structural relationships that are not part of the knowledge graph itself.
+STRUCTURAL_REL_TYPES = ["EXTRACTED_FROM", "BELONGS_TO", "IN_WORKSPACE", "MEMBER_OF"]
+
+
+def _scope_filter(alias: str, workspace_id: Optional[str]) -> str:
+    """Return a Cypher predicate restricting ``alias`` to the export scope."""
+    if workspace_id:
+        return (
+            f"EXISTS {{ MATCH ({alias})-[:EXTRACTED_FROM]->(:Document)"
+            f"-[:BELONGS_TO]->(:Workspace {{workspace_id: $workspace_id}}) }}"
+        )
+    # Global export: exclude anything extracted from private workspaces
+    return (
+        f"NOT EXISTS {{ MATCH ({alias})-[:EXTRACTED_FROM]->(:Document)"
+        f"-[:BELONGS_TO]->(:Workspace {{privacy: 'private'}}) }}"
+    )
+
+
+def _nodes_cypher(workspace_id: Optional[str]) -> str:
+    return (
+        "MATCH (n:Entity) "
+        f"WHERE {_scope_filter('n', workspace_id)} "
+        "CALL { "
+        "  WITH n "
+        "  OPTIONAL MATCH (n)-[:IS_A]->(type:Concept) "
+        "  RETURN collect(DISTINCT type.name) AS type_names "
+        "} "
+        "CALL { "
+        "  WITH n "
+        "  OPTIONAL MATCH (n)-[:EXTRACTED_FROM]->(doc:Document) "
+        "  RETURN collect(DISTINCT doc.document_id) AS source_ids "
+        "} "
+        "WITH n, source_ids, CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END AS types "
+        "RETURN {"
+        "  id: coalesce(n.id, n.name, elementId(n)), "
+        "  label: coalesce(n.label, n.name, n.id), "
+        "  types: types, "
+        "  type: head(types), "
+        "  significance: n.significance, "
+        "  sources: source_ids"
+        "} AS node"
+    )
+
+
+def _relationships_cypher(workspace_id: Optional[str], verified_only: bool) -> str:
+    status_filter = "AND r.status = 'verified' " if verified_only else ""
+    return (
+        "MATCH (s:Entity)-[r]->(t:Entity) "
+        "WHERE NOT type(r) IN $structural_types "
+        f"{status_filter}"
+        f"AND {_scope_filter('s', workspace_id)} "
+        f"AND {_scope_filter('t', workspace_id)} "
+        "RETURN {"
+        "  id: elementId(r), "
+        "  source: coalesce(s.id, s.name, elementId(s)), "
+        "  target: coalesce(t.id, t.name, elementId(t)), "
+        "  relation: coalesce(r.relation, type(r)), "
+        "  status: coalesce(r.status, 'unverified'), "
+        "  polarity: coalesce(r.polarity, 'positive'), "
+        "  confidence: r.confidence, "
+        "  significance: r.significance, "
+        "  sources: coalesce(r.sources, []), "
+        "  page_number: r.page_number"
+        "} AS relationship"
+    )
+
+
+def iter_export_nodes(workspace_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield node records for the export scope, fetched lazily over Bolt."""
+    params: Dict[str, Any] = {}
+    if workspace_id:
+        params["workspace_id"] = workspace_id
+    with neo4j_client._driver.session(database=settings.neo4j_database, fetch_size=EXPORT_FETCH_SIZE) as session:
+        result = session.run(_nodes_cypher(workspace_id), **params)
+        for record in result:
+            yield record["node"]
+
+
+def iter_export_relationships(workspace_id: Optional[str] = None, verified_only: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield relationship records whose endpoints are both in the export scope."""
+    params: Dict[str, Any] = {"structural_types": STRUCTURAL_REL_TYPES}
+    if workspace_id:
+        params["workspace_id"] = workspace_id
+    with neo4j_client._driver.session(database=settings.neo4j_database, fetch_size=EXPORT_FETCH_SIZE) as session:
+        result = session.run(_relationships_cypher(workspace_id, verified_only), **params)
+        for record in result:
+            yield record["relationship"]
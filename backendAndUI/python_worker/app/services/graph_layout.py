@@ -0,0 +1,164 @@
+"""Persisted graph layouts.
+
+A layout is stored per scope (a workspace id, or ``__global__`` for the shared
+graph) on a single ``(:GraphLayout {scope})`` node as parallel ``node_ids`` /
+``xs`` / ``ys`` lists. Every save increments the node's ``version`` so
+in-memory consumers such as the viewport spatial index can cheaply tell when
+they need to reload. Layouts computed by the layout service also record the
+``graph_version`` they were computed from.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .graph_version import GLOBAL_SCOPE
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def layout_scope(workspace_id: Optional[str]) -> str:
+    return workspace_id or GLOBAL_SCOPE
+
+
+def get_layout_version(scope: str) -> Optional[int]:
+    """Return the stored layout version for ``scope``, or None if there is no layout."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(
+            "MATCH (l:GraphLayout {scope: $scope}) RETURN l.version AS version",
+            scope=scope,
+        ).single()
+    return record["version"] if record else None
+
+
+def load_layout(scope: str) -> Optional[Dict[str, Any]]:
+    """Load the stored layout for ``scope`` as parallel lists."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(
+            "MATCH (l:GraphLayout {scope: $scope}) "
+            "RETURN l.node_ids AS node_ids, l.xs AS xs, l.ys AS ys, l.version AS version, "
+            "       l.graph_version AS graph_version",
+            scope=scope,
+        ).single()
+    if not record or not record["node_ids"]:
+        return None
+    return {
+        "node_ids": list(record["node_ids"]),
+        "xs": list(record["xs"]),
+        "ys": list(record["ys"]),
+        "version": record["version"],
+        "graph_version": record["graph_version"],
+    }
+
+
+def load_property_positions(workspace_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Fallback layout built from ``x`` / ``y`` properties already set on entities."""
+    if workspace_id:
+        cypher = (
+            "MATCH (n:Entity)-[:EXTRACTED_FROM]->(:Document)-[:BELONGS_TO]->(:Workspace {workspace_id: $workspace_id}) "
+            "WHERE n.x IS NOT NULL AND n.y IS NOT NULL "
+            "RETURN DISTINCT coalesce(n.id, n.name, elementId(n)) AS id, n.x AS x, n.y AS y"
+        )
+    else:
+        cypher = (
+            "MATCH (n:Entity) WHERE n.x IS NOT NULL AND n.y IS NOT NULL "
+            "RETURN coalesce(n.id, n.name, elementId(n)) AS id, n.x AS x, n.y AS y"
+        )
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        rows = list(session.run(cypher, workspace_id=workspace_id))
+    if not rows:
+        return None
+    return {
+        "node_ids": [r["id"] for r in rows],
+        "xs": [float(r["x"]) for r in rows],
+        "ys": [float(r["y"]) for r in rows],
+        "version": 0,
+        "graph_version": None,
+    }
+
+
+def _write_layout(
+    tx,
+    scope: str,
+    node_ids: List[str],
+    xs: List[float],
+    ys: List[float],
+    graph_version: Optional[int] = None,
+) -> int:
+    record = tx.run(
+        "MERGE (l:GraphLayout {scope: $scope}) "
+        "SET l.node_ids = $node_ids, l.xs = $xs, l.ys = $ys, "
+        "    l.graph_version = coalesce($graph_version, l.graph_version), "
+        "    l.version = coalesce(l.version, 0) + 1, l.updated_at = datetime() "
+        "RETURN l.version AS version",
+        scope=scope, node_ids=node_ids, xs=xs, ys=ys, graph_version=graph_version,
+    ).single()
+    return record["version"]
+
+
+def save_layout(
+    scope: str,
+    node_ids: List[str],
+    xs: Iterable[float],
+    ys: Iterable[float],
+    graph_version: Optional[int] = None,
+) -> int:
+    """Replace the stored layout for ``scope`` and return its new version."""
+    xs = [float(x) for x in xs]
+    ys = [float(y) for y in ys]
+    if not (len(node_ids) == len(xs) == len(ys)):
+        raise ValueError("node_ids, xs and ys must have the same length")
+    return neo4j_client.execute_write(
+        lambda tx: _write_layout(tx, scope, list(node_ids), xs, ys, graph_version)
+    )
+
+
+def set_layout_graph_version(scope: str, graph_version: int) -> None:
+    """Record that the stored layout for ``scope`` still matches ``graph_version``.
+
+    Positions and the layout version are left untouched, so cached viewport
+    indexes stay valid.
+    """
+    neo4j_client.execute_write(
+        lambda tx: tx.run(
+            "MATCH (l:GraphLayout {scope: $scope}) SET l.graph_version = $graph_version",
+            scope=scope, graph_version=graph_version,
+        ).consume()
+    )
+
+
+def merge_positions(scope: str, positions: Iterable[Dict[str, Any]]) -> int:
+    """Update or append node positions in the stored layout for ``scope``.
+
+    Each position is a dict with ``id``, ``x`` and ``y``. The read-modify-write
+    runs in one transaction, so concurrent saves cannot drop each other's nodes.
+    """
+    updates = {str(p["id"]): (float(p["x"]), float(p["y"])) for p in positions}
+
+    def work(tx) -> int:
+        # Take the write lock on the layout node before reading it
+        record = tx.run(
+            "MERGE (l:GraphLayout {scope: $scope}) "
+            "SET l._lock = true REMOVE l._lock "
+            "RETURN l.node_ids AS node_ids, l.xs AS xs, l.ys AS ys",
+            scope=scope,
+        ).single()
+        node_ids = list(record["node_ids"] or [])
+        xs = list(record["xs"] or [])
+        ys = list(record["ys"] or [])
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        for node_id, (x, y) in updates.items():
+            i = index.get(node_id)
+            if i is None:
+                node_ids.append(node_id)
+                xs.append(x)
+                ys.append(y)
+            else:
+                xs[i] = x
+                ys[i] = y
+        return _write_layout(tx, scope, node_ids, xs, ys)
+
+    return neo4j_client.execute_write(work)
@@ -0,0 +1,523 @@
+"""In-memory CSR projection of the entity graph for path algorithms.
+
+Every Entity-to-Entity relationship (structural links to documents and
+workspaces excluded) is loaded into NumPy arrays: ``int32`` endpoint indices,
+``float32`` confidence and significance, ``uint16`` supporting-document
+counts, and a ``uint8`` status bitmask so a verified-only search is a single
+AND per edge. Outgoing and incoming
+adjacency are kept in CSR form, so pathway queries run in-process instead of
+enumerating variable-length patterns in Neo4j.
+
+The projection follows the global graph version counter. When it moves,
+relationships created, updated or reviewed since the last sync are applied as
+a change feed, found through the ``changed_at`` index on their source
+entities; changes the feed cannot see (entity merges, which mark a
+``reset_version``), a failed refresh and a periodic timer trigger a full
+rebuild instead.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .graph_export import STRUCTURAL_REL_TYPES
+from .graph_version import GLOBAL_SCOPE
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+STATUS_VERIFIED = 1
+STATUS_UNVERIFIED = 2
+STATUS_INCORRECT = 4
+# Relationships without a review status, e.g. IS_A
+STATUS_NONE = 8
+ALL_STATUSES = STATUS_VERIFIED | STATUS_UNVERIFIED | STATUS_INCORRECT | STATUS_NONE
+
+_STATUS_BITS = {"verified": STATUS_VERIFIED, "unverified": STATUS_UNVERIFIED, "incorrect": STATUS_INCORRECT}
+
+# Writes that commit shortly after the sync timestamp carry earlier datetime() values
+CHANGE_FEED_OVERLAP_SECONDS = 60
+FETCH_SIZE = 5000
+
+VERSION_CYPHER = """
+OPTIONAL MATCH (v:GraphVersion {scope: $scope})
+RETURN coalesce(v.version, 0) AS version, coalesce(v.reset_version, 0) AS reset_version,
+       toString(datetime() - duration({seconds: $overlap})) AS synced_at
+"""
+
+NODES_CYPHER = """
+MATCH (n:Entity)
+RETURN coalesce(n.id, n.name, elementId(n)) AS id, n.significance AS significance
+"""
+
+_EDGE_RETURN = """
+RETURN elementId(r) AS id,
+       coalesce(s.id, s.name, elementId(s)) AS source,
+       coalesce(t.id, t.name, elementId(t)) AS target,
+       s.significance AS source_significance,
+       t.significance AS target_significance,
+       type(r) AS type,
+       r.confidence AS confidence,
+       r.significance AS significance,
+       r.status AS status,
+       size(coalesce(r.sources, [])) AS source_count,
+       coalesce(r.polarity, 'positive') AS polarity
+"""
+
+EDGES_CYPHER = """
+MATCH (s:Entity)-[r]->(t:Entity)
+WHERE NOT type(r) IN $structural_types
+""" + _EDGE_RETURN
+
+# Untimestamped relationships (IS_A) of a changed entity are always included
+CHANGES_CYPHER = """
+MATCH (s:Entity)
+WHERE s.changed_at >= datetime($since)
+MATCH (s)-[r]->(t:Entity)
+WHERE NOT type(r) IN $structural_types
+  AND (r.created_at IS NULL
+       OR any(ts IN [r.created_at, r.updated_at, r.reviewed_at] WHERE ts >= datetime($since)))
+""" + _EDGE_RETURN
+
+
+def status_bit(status: Optional[str]) -> int:
+    if status is None:
+        return STATUS_NONE
+    return _STATUS_BITS.get(status, STATUS_UNVERIFIED)
+
+
+def status_mask(verified_only: bool) -> int:
+    """Bitmask of the statuses a search may traverse."""
+    return STATUS_VERIFIED if verified_only else ALL_STATUSES
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _count(value: Any) -> int:
+    return min(int(value or 0), np.iinfo(np.uint16).max)
+
+
+def _csr(n: int, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(indptr, neighbour indices, edge indices) grouping edges by ``rows``."""
+    order = np.argsort(rows, kind="stable").astype(np.int32)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order], order
+
+
+@dataclass
+class GraphProjection:
+    """Entity adjacency in CSR form plus per-edge attributes."""
+
+    node_ids: List[str]
+    index_of: Dict[str, int]
+    node_significance: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    edge_ids: List[str]
+    edge_index: Dict[str, int]
+    edge_types: List[str]
+    polarity: List[str]
+    confidence: np.ndarray
+    significance: np.ndarray
+    source_count: np.ndarray
+    status: np.ndarray
+    version: int = 0
+    out_indptr: np.ndarray = field(init=False)
+    out_indices: np.ndarray = field(init=False)
+    out_edges: np.ndarray = field(init=False)
+    in_indptr: np.ndarray = field(init=False)
+    in_indices: np.ndarray = field(init=False)
+    in_edges: np.ndarray = field(init=False)
+    _both: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        n = len(self.node_ids)
+        self.out_indptr, self.out_indices, self.out_edges = _csr(n, self.src, self.dst)
+        self.in_indptr, self.in_indices, self.in_edges = _csr(n, self.dst, self.src)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.src)
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    def adjacency(self, direction: str = "out") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(indptr, indices, edges) for ``out``, ``in`` or ``both`` directions."""
+        if direction == "out":
+            return self.out_indptr, self.out_indices, self.out_edges
+        if direction == "in":
+            return self.in_indptr, self.in_indices, self.in_edges
+        if direction == "both":
+            if self._both is None:
+                rows = np.r_[self.src, self.dst]
+                cols = np.r_[self.dst, self.src]
+                indptr, indices, order = _csr(self.node_count, rows, cols)
+                edges = np.tile(np.arange(self.edge_count, dtype=np.int32), 2)[order]
+                self._both = (indptr, indices, edges)
+            return self._both
+        raise ValueError(f"Unknown direction: {direction}")
+
+    def expand(
+        self,
+        frontier: np.ndarray,
+        direction: str = "out",
+        mask: int = ALL_STATUSES,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All traversable edges leaving ``frontier``: (from node, to node, edge index)."""
+        indptr, indices, edges = self.adjacency(direction)
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty, empty
+        # Concatenated CSR slices without a Python loop
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        origin = np.repeat(frontier, counts).astype(np.int32)
+        neighbours = indices[offsets]
+        edge = edges[offsets]
+        if mask != ALL_STATUSES:
+            keep = (self.status[edge] & mask) != 0
+            origin, neighbours, edge = origin[keep], neighbours[keep], edge[keep]
+        return origin, neighbours, edge
+
+    def bfs(
+        self,
+        sources: Iterable[int],
+        max_hops: int,
+        direction: str = "out",
+        mask: int = ALL_STATUSES,
+        stop_at: Optional[np.ndarray] = None,
+        stop_at_all: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Multi-source breadth-first search.
+
+        Returns ``(distance, parent_edge)``: hop counts (-1 if unreached) and
+        the edge each node was first reached through (-1 for sources). Stops
+        early once any node flagged in ``stop_at`` has been reached, or once
+        all of them have with ``stop_at_all``.
+        """
+        n = self.node_count
+        distance = np.full(n, -1, dtype=np.int32)
+        parent_edge = np.full(n, -1, dtype=np.int32)
+        frontier = np.unique(np.asarray(list(sources), dtype=np.int32))
+        distance[frontier] = 0
+        if stop_at is not None:
+            unreached = int(stop_at.sum()) - int(stop_at[frontier].sum())
+        for hop in range(1, max_hops + 1):
+            if len(frontier) == 0:
+                break
+            _, neighbours, edge = self.expand(frontier, direction, mask)
+            new = distance[neighbours] < 0
+            neighbours, edge = neighbours[new], edge[new]
+            neighbours, first = np.unique(neighbours, return_index=True)
+            distance[neighbours] = hop
+            parent_edge[neighbours] = edge[first]
+            frontier = neighbours
+            if stop_at is not None:
+                reached = int(stop_at[neighbours].sum())
+                unreached -= reached
+                if reached and (unreached <= 0 or not stop_at_all):
+                    break
+        return distance, parent_edge
+
+    def other_end(self, edge: int, node: int) -> int:
+        return int(self.dst[edge]) if int(self.src[edge]) == node else int(self.src[edge])
+
+    def trace(self, node: int, parent_edge: np.ndarray) -> Tuple[List[int], List[int]]:
+        """Walk parent edges back to a source: (nodes, edges) from the source to ``node``."""
+        nodes = [node]
+        edges: List[int] = []
+        while parent_edge[nodes[-1]] >= 0:
+            edge = int(parent_edge[nodes[-1]])
+            edges.append(edge)
+            nodes.append(self.other_end(edge, nodes[-1]))
+        return nodes[::-1], edges[::-1]
+
+    def types(self, node: int) -> List[str]:
+        """Names of the node's IS_A targets, or ``['Concept']``."""
+        start, end = self.out_indptr[node], self.out_indptr[node + 1]
+        types = [
+            self.node_ids[int(target)]
+            for target, edge in zip(self.out_indices[start:end], self.out_edges[start:end])
+            if self.edge_types[edge] == "IS_A"
+        ]
+        return types or ["Concept"]
+
+    def node(self, node: int) -> Dict[str, Any]:
+        """Node payload in the shape the pathway endpoints return."""
+        types = self.types(node)
+        return {
+            "id": self.node_ids[node],
+            "name": self.node_ids[node],
+            "types": types,
+            "type": types[0],
+            "significance": float(self.node_significance[node]),
+        }
+
+    def relationship(self, edge: int) -> Dict[str, Any]:
+        """Relationship payload in the shape the pathway endpoints return."""
+        confidence = float(self.confidence[edge])
+        significance = float(self.significance[edge])
+        status = int(self.status[edge])
+        return {
+            "id": self.edge_ids[edge],
+            "source": self.node_ids[int(self.src[edge])],
+            "target": self.node_ids[int(self.dst[edge])],
+            "relation": self.edge_types[edge],
+            "confidence": None if np.isnan(confidence) else confidence,
+            "significance": None if np.isnan(significance) else significance,
+            "status": next((name for name, bit in _STATUS_BITS.items() if bit == status), None),
+            "polarity": self.polarity[edge],
+            "source_count": int(self.source_count[edge]),
+        }
+
+
+class _Builder:
+    """Accumulates node and edge rows before freezing them into a projection."""
+
+    def __init__(self) -> None:
+        self.node_ids: List[str] = []
+        self.index_of: Dict[str, int] = {}
+        self.node_significance: List[float] = []
+        self.src: List[int] = []
+        self.dst: List[int] = []
+        self.edge_ids: List[str] = []
+        self.edge_index: Dict[str, int] = {}
+        self.edge_types: List[str] = []
+        self.polarity: List[str] = []
+        self.confidence: List[float] = []
+        self.significance: List[float] = []
+        self.source_count: List[int] = []
+        self.status: List[int] = []
+
+    def node(self, node_id: str, significance: Any = None) -> int:
+        i = self.index_of.get(node_id)
+        if i is None:
+            i = self.index_of[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.node_significance.append(0.0)
+        if significance is not None:
+            self.node_significance[i] = _float(significance)
+        return i
+
+    def edge(self, row: Any) -> None:
+        if row["id"] in self.edge_index:
+            return
+        self.edge_index[row["id"]] = len(self.edge_ids)
+        self.edge_ids.append(row["id"])
+        self.src.append(self.node(row["source"], row["source_significance"]))
+        self.dst.append(self.node(row["target"], row["target_significance"]))
+        self.edge_types.append(row["type"])
+        self.polarity.append(row["polarity"])
+        self.confidence.append(_float(row["confidence"]))
+        self.significance.append(_float(row["significance"]))
+        self.source_count.append(_count(row["source_count"]))
+        self.status.append(status_bit(row["status"]))
+
+    def freeze(self, version: int) -> GraphProjection:
+        return GraphProjection(
+            node_ids=self.node_ids,
+            index_of=self.index_of,
+            node_significance=np.nan_to_num(np.array(self.node_significance, dtype=np.float32)),
+            src=np.array(self.src, dtype=np.int32),
+            dst=np.array(self.dst, dtype=np.int32),
+            edge_ids=self.edge_ids,
+            edge_index=self.edge_index,
+            edge_types=self.edge_types,
+            polarity=self.polarity,
+            confidence=np.array(self.confidence, dtype=np.float32),
+            significance=np.array(self.significance, dtype=np.float32),
+            source_count=np.array(self.source_count, dtype=np.uint16),
+            status=np.array(self.status, dtype=np.uint8),
+            version=version,
+        )
+
+
+def apply_changes(base: GraphProjection, rows: List[Any], version: int) -> GraphProjection:
+    """New projection with changed relationships upserted into ``base``.
+
+    ``base`` is left untouched, so it keeps serving queries (and stays
+    consistent) if applying the changes fails part way.
+    """
+    node_ids, index_of = list(base.node_ids), dict(base.index_of)
+    edge_ids, edge_index = list(base.edge_ids), dict(base.edge_index)
+    confidence = base.confidence.copy()
+    significance = base.significance.copy()
+    source_count = base.source_count.copy()
+    status = base.status.copy()
+    node_significance: Dict[int, float] = {}
+    new = _Builder()
+
+    def node(node_id: str, value: Any) -> int:
+        i = index_of.get(node_id)
+        if i is None:
+            i = index_of[node_id] = len(node_ids)
+            node_ids.append(node_id)
+        if value is not None:
+            node_significance[i] = _float(value)
+        return i
+
+    for row in rows:
+        s = node(row["source"], row["source_significance"])
+        t = node(row["target"], row["target_significance"])
+        i = edge_index.get(row["id"])
+        if i is not None and i < base.edge_count:
+            confidence[i] = _float(row["confidence"])
+            significance[i] = _float(row["significance"])
+            source_count[i] = _count(row["source_count"])
+            status[i] = status_bit(row["status"])
+            continue
+        if i is None:
+            edge_index[row["id"]] = len(edge_ids)
+            edge_ids.append(row["id"])
+        new.src.append(s)
+        new.dst.append(t)
+        new.edge_types.append(row["type"])
+        new.polarity.append(row["polarity"])
+        new.confidence.append(_float(row["confidence"]))
+        new.significance.append(_float(row["significance"]))
+        new.source_count.append(_count(row["source_count"]))
+        new.status.append(status_bit(row["status"]))
+
+    node_sig = np.zeros(len(node_ids), dtype=np.float32)
+    node_sig[:base.node_count] = base.node_significance
+    for i, value in node_significance.items():
+        node_sig[i] = 0.0 if np.isnan(value) else value
+    return GraphProjection(
+        node_ids=node_ids,
+        index_of=index_of,
+        node_significance=node_sig,
+        src=np.r_[base.src, np.array(new.src, dtype=np.int32)],
+        dst=np.r_[base.dst, np.array(new.dst, dtype=np.int32)],
+        edge_ids=edge_ids,
+        edge_index=edge_index,
+        edge_types=base.edge_types + new.edge_types,
+        polarity=base.polarity + new.polarity,
+        confidence=np.r_[confidence, np.array(new.confidence, dtype=np.float32)],
+        significance=np.r_[significance, np.array(new.significance, dtype=np.float32)],
+        source_count=np.r_[source_count, np.array(new.source_count, dtype=np.uint16)],
+        status=np.r_[status, np.array(new.status, dtype=np.uint8)],
+        version=version,
+    )
+
+
+class ProjectionCache:
+    """The current global projection, kept in step with the graph version."""
+
+    def __init__(self) -> None:
+        self._projection: Optional[GraphProjection] = None
+        self._reset_version = 0
+        self._synced_at: Optional[str] = None
+        self._built_monotonic = 0.0
+        self._checked_monotonic = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+
+    def get(self) -> GraphProjection:
+        """Return an up-to-date projection, loading it on first use.
+
+        Change-feed refreshes run inline (they are small). A full rebuild of an
+        existing projection, or one after a failed refresh, runs in the
+        background while the previous one keeps serving queries.
+        """
+        now = time.monotonic()
+        projection = self._projection
+        if projection is not None and now - self._checked_monotonic < settings.graph_projection_check_seconds:
+            return projection
+
+        with self._lock:
+            projection = self._projection
+            with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+                state = session.run(VERSION_CYPHER, scope=GLOBAL_SCOPE, overlap=CHANGE_FEED_OVERLAP_SECONDS).single()
+            self._checked_monotonic = time.monotonic()
+            if projection is None:
+                return self._install(self._load(state), state, rebuilt=True)
+            if state["version"] == projection.version:
+                return projection
+            rebuild_due = (
+                state["reset_version"] != self._reset_version
+                or state["version"] < projection.version
+                or now - self._built_monotonic >= settings.graph_projection_rebuild_seconds
+            )
+            if not rebuild_due:
+                try:
+                    return self._refresh(state)
+                except Exception as exc:
+                    logger.warning(f"Graph projection refresh failed, rebuilding: {exc}")
+
+        self._rebuild_in_background()
+        return projection
+
+    def invalidate(self) -> None:
+        """Force a version check on the next access."""
+        self._checked_monotonic = 0.0
+
+    def _load(self, state: Any) -> GraphProjection:
+        started = time.monotonic()
+        builder = _Builder()
+        with neo4j_client._driver.session(database=settings.neo4j_database, fetch_size=FETCH_SIZE) as session:
+            for row in session.run(NODES_CYPHER):
+                builder.node(row["id"], row["significance"])
+            for row in session.run(EDGES_CYPHER, structural_types=STRUCTURAL_REL_TYPES):
+                builder.edge(row)
+        projection = builder.freeze(state["version"])
+        logger.info(
+            f"Graph projection built: {projection.node_count} nodes, {projection.edge_count} edges "
+            f"in {time.monotonic() - started:.1f}s (graph version {projection.version})"
+        )
+        return projection
+
+    def _install(self, projection: GraphProjection, state: Any, rebuilt: bool) -> GraphProjection:
+        self._projection = projection
+        self._synced_at = state["synced_at"]
+        if rebuilt:
+            self._reset_version = state["reset_version"]
+            self._built_monotonic = time.monotonic()
+        return projection
+
+    def _refresh(self, state: Any) -> GraphProjection:
+        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+            rows = list(session.run(CHANGES_CYPHER, structural_types=STRUCTURAL_REL_TYPES, since=self._synced_at))
+        projection = apply_changes(self._projection, rows, state["version"])
+        logger.info(f"Graph projection refreshed: {len(rows)} changed relationships (graph version {projection.version})")
+        return self._install(projection, state, rebuilt=False)
+
+    def _rebuild_in_background(self) -> None:
+        if not self._rebuilding.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+                    state = session.run(VERSION_CYPHER, scope=GLOBAL_SCOPE, overlap=CHANGE_FEED_OVERLAP_SECONDS).single()
+                projection = self._load(state)
+                with self._lock:
+                    self._install(projection, state, rebuilt=True)
+            except Exception as exc:
+                logger.warning(f"Graph projection rebuild failed: {exc}")
+            finally:
+                self._rebuilding.release()
+
+        threading.Thread(target=run, name="graph-projection-rebuild", daemon=True).start()
+
+
+graph_projection = ProjectionCache()
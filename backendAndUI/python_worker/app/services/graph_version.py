@@ -0,0 +1,96 @@
+"""Monotonic graph version counters.
+
+Each scope (a workspace id, or ``__global__`` for the whole graph) has a
+``(:GraphVersion {scope})`` node whose ``version`` is incremented by every
+write that changes the graph's structure or a relationship's review status.
+``structure_version`` only follows writes that add, remove or rewire nodes and
+relationships, so derived data that ignores review status (layouts) is not
+recomputed after every confirm or flag. Derived data can record the version it
+was computed from and cheaply detect staleness.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "__global__"
+
+# Relationship writers mark the source entity as changed (``r`` in scope), so
+# incremental consumers can find changed relationships through the indexed
+# ``Entity.changed_at`` instead of scanning every relationship
+MARK_SOURCE_CHANGED_CYPHER = "FOREACH (changed IN [startNode(r)] | SET changed.changed_at = datetime())"
+
+BUMP_CYPHER = """
+UNWIND $scopes AS scope
+MERGE (v:GraphVersion {scope: scope})
+SET v.version = coalesce(v.version, 0) + 1, v.updated_at = datetime()
+SET v.structure_version = CASE WHEN $structural THEN v.version ELSE coalesce(v.structure_version, v.version - 1) END
+"""
+
+BUMP_ALL_CYPHER = """
+MERGE (g:GraphVersion {scope: $global_scope})
+WITH g
+MATCH (v:GraphVersion)
+SET v.version = coalesce(v.version, 0) + 1, v.updated_at = datetime()
+SET v.structure_version = v.version
+WITH g, count(v) AS bumped
+FOREACH (_ IN CASE WHEN $reset THEN [1] ELSE [] END | SET g.reset_version = g.version)
+"""
+
+
+def bump_graph_version_tx(
+    tx,
+    workspace_ids: Iterable[Optional[str]] = (),
+    structural: bool = True,
+) -> None:
+    """Increment the global version and those of ``workspace_ids`` inside ``tx``.
+
+    Pass ``structural=False`` for writes that only change review status, which
+    leaves ``structure_version`` alone.
+    """
+    scopes = [GLOBAL_SCOPE] + sorted({w for w in workspace_ids if w})
+    tx.run(BUMP_CYPHER, scopes=scopes, structural=structural)
+
+
+def bump_all_graph_versions_tx(tx, reset: bool = False) -> None:
+    """Increment every scope's version, for changes whose workspaces are unknown (e.g. merges).
+
+    ``reset`` records that nodes or relationships were removed or replaced, which
+    incremental consumers cannot follow from timestamps and must reload for.
+    """
+    tx.run(BUMP_ALL_CYPHER, global_scope=GLOBAL_SCOPE, reset=reset)
+
+
+def bump_graph_version(workspace_id: Optional[str] = None, structural: bool = True) -> None:
+    neo4j_client.execute_write(lambda tx: bump_graph_version_tx(tx, [workspace_id], structural=structural))
+
+
+def bump_all_graph_versions(reset: bool = False) -> None:
+    neo4j_client.execute_write(lambda tx: bump_all_graph_versions_tx(tx, reset=reset))
+
+
+def get_graph_version(workspace_id: Optional[str] = None) -> int:
+    """Current version for a scope; 0 when nothing has been written yet."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(
+            "MATCH (v:GraphVersion {scope: $scope}) RETURN v.version AS version",
+            scope=workspace_id or GLOBAL_SCOPE,
+        ).single()
+    return int(record["version"]) if record and record["version"] is not None else 0
+
+
+def get_structure_version(workspace_id: Optional[str] = None) -> int:
+    """Version of the last structural change for a scope; 0 when nothing has been written yet."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(
+            "MATCH (v:GraphVersion {scope: $scope}) "
+            "RETURN coalesce(v.structure_version, v.version) AS version",
+            scope=workspace_id or GLOBAL_SCOPE,
+        ).single()
+    return int(record["version"]) if record and record["version"] is not None else 0
@@ -6,6 +6,16 @@ import hashlib
 
 from .neo4j_client import neo4j_client
 from .entity_consolidation import consolidate_identical_entities
+from .autocomplete_index import autocomplete_index
+from .graph_version import bump_graph_version, bump_graph_version_tx
+from .review_queue import NON_REVIEW_REL_TYPES, REVIEW_ITEM_SYNC_CYPHER, REVIEW_PRIORITY, ensure_review_schema
+from .stats_counters import (
+    adjust_global_review_counts_tx,
+    apply_local_workspace_delta_tx,
+    local_workspace_counts_tx,
+    lock_workspace_tx,
+)
+from .type_closure import refresh_type_closure, refresh_type_closure_tx
 from ..models.triplet import Triplet
 from ..core.settings import settings
 
@@ -16,7 +26,8 @@ DEFAULT_OWNER_PERMISSIONS = ["view", "add_documents", "edit_relationships", "inv
 
 MERGE_TRIPLET_CYPHER = """
 MERGE (s:Entity:Concept {name: $s_name})
-ON CREATE SET s.created_by = $user_id,
+ON CREATE SET s.name_lower = toLower(trim($s_name)),
+              s.created_by = $user_id,
               s.created_by_first_name = $user_first_name,
               s.created_by_last_name = $user_last_name,
               s.created_at = datetime(),
@@ -27,14 +38,19 @@ ON MATCH SET s.updated_at = datetime(),
                 THEN $s_significance 
                 ELSE coalesce(s.significance, $s_significance) 
              END
+SET s.changed_at = datetime()
 WITH s
 FOREACH (stype IN $s_types |
     MERGE (st:Entity:Concept {name: stype})
+    ON CREATE SET st.name_lower = toLower(trim(stype)),
+                  st.created_at = datetime(),
+                  st.changed_at = datetime()
     MERGE (s)-[:IS_A]->(st)
 )
 
 MERGE (o:Entity:Concept {name: $o_name})
-ON CREATE SET o.created_by = $user_id,
+ON CREATE SET o.name_lower = toLower(trim($o_name)),
+              o.created_by = $user_id,
               o.created_by_first_name = $user_first_name,
               o.created_by_last_name = $user_last_name,
               o.created_at = datetime(),
@@ -45,9 +61,13 @@ ON MATCH SET o.updated_at = datetime(),
                 THEN $o_significance 
                 ELSE coalesce(o.significance, $o_significance) 
              END
+SET o.changed_at = datetime()
 WITH s, o
 FOREACH (otype IN $o_types |
     MERGE (ot:Entity:Concept {name: otype})
+    ON CREATE SET ot.name_lower = toLower(trim(otype)),
+                  ot.created_at = datetime(),
+                  ot.changed_at = datetime()
     MERGE (o)-[:IS_A]->(ot)
 )
 MERGE (d:Document {document_id: $document_id})
@@ -91,7 +111,10 @@ ON MATCH SET r.sources = CASE
               END,
               r.page_number = coalesce(r.page_number, $page_number),
               r.updated_at = datetime()
-RETURN elementId(s) AS s_id, elementId(o) AS o_id, type(r) AS rel_type, r.status AS status
+SET r.review_priority = %s
+%s
+RETURN elementId(s) AS s_id, elementId(o) AS o_id, type(r) AS rel_type, r.status AS status,
+       r.updated_at IS NULL AS created
 """
 
 
@@ -105,7 +128,8 @@ def _write_single(tx, triplet: Triplet, document_id: str, document_title: Option
     
     # User info will now be set directly in the main Cypher query
     
-    cypher = MERGE_TRIPLET_CYPHER % predicate
+    review_item = "" if predicate in NON_REVIEW_REL_TYPES else REVIEW_ITEM_SYNC_CYPHER
+    cypher = MERGE_TRIPLET_CYPHER % (predicate, REVIEW_PRIORITY, review_item)
     params = {
         "s_name": triplet.subject,
         "s_types": triplet.subject_types,
@@ -137,10 +161,30 @@ def _write_single(tx, triplet: Triplet, document_id: str, document_title: Option
         "object_id": record["o_id"],
         "relationship": record["rel_type"],
         "status": record["status"],
+        "created": record["created"],
         "page_number": triplet.page_number,  # Include in response for verification
     }
 
 
+def _ensure_review_schema() -> None:
+    try:
+        ensure_review_schema()
+    except Exception as exc:
+        logger.warning(f"Review queue schema creation failed: {exc}")
+
+
+def _entities_from_triplets(triplets: List[Triplet]) -> List[dict]:
+    """Subject, object and type entities touched by a batch of triplets."""
+    entities = []
+    for t in triplets:
+        entities.append({"name": t.subject, "types": t.subject_types, "significance": t.subject_significance})
+        entities.append({"name": t.object, "types": t.object_types, "significance": t.object_significance})
+        for type_name in list(t.subject_types or []) + list(t.object_types or []):
+            # Type nodes are not extracted from the document, so they are not in the workspace scope
+            entities.append({"name": type_name, "workspace_scoped": False})
+    return entities
+
+
 def write_triplets(triplets: Iterable[Triplet], document_id: str, document_title: Optional[str] = None, user_id: Optional[str] = None, user_first_name: Optional[str] = None, user_last_name: Optional[str] = None, workspace_id: Optional[str] = None, workspace_metadata: Optional[Dict[str, object]] = None, consolidate_entities: bool = True) -> list[dict]:
     """
     Write triplets to the graph and optionally consolidate identical entities.
@@ -160,6 +204,12 @@ def write_triplets(triplets: Iterable[Triplet], document_id: str, document_title
         List of write results plus consolidation results if applicable
     """
     def work(tx):
+        # Counters: recount the touched entities' neighbourhood before and after the write
+        entity_names = [name for t in triplets for name in (t.subject, t.object)]
+        if workspace_id:
+            lock_workspace_tx(tx, workspace_id)
+            counts_before = local_workspace_counts_tx(tx, workspace_id, document_id, entity_names)
+
         outputs = []
         for t in triplets:
             outputs.append(_write_single(tx, t, document_id, document_title, user_id, user_first_name, user_last_name))
@@ -268,12 +318,30 @@ def write_triplets(triplets: Iterable[Triplet], document_id: str, document_title
             )
 
             logger.info(f"Associated document {document_id} and its entities with workspace {workspace_id}")
-        
+            apply_local_workspace_delta_tx(
+                tx, workspace_id, counts_before,
+                local_workspace_counts_tx(tx, workspace_id, document_id, entity_names),
+            )
+
+        created = [o for o in outputs if o["created"] and o["relationship"] not in NON_REVIEW_REL_TYPES]
+        adjust_global_review_counts_tx(tx, {"unverified": len(created)})
+        refresh_type_closure_tx(tx, [entity["name"] for entity in _entities_from_triplets(triplets)])
+        bump_graph_version_tx(tx, [workspace_id])
         return outputs
 
+    # Materialize so the triplets can be read again after the transaction
+    triplets = list(triplets)
+    
     # Write triplets first
+    _ensure_review_schema()
     write_results = neo4j_client.execute_write(work)
     
+    # Keep this process's autocomplete index current without waiting for the change feed
+    try:
+        autocomplete_index.add_entities(_entities_from_triplets(triplets), workspace_id)
+    except Exception as exc:
+        logger.warning(f"Autocomplete index update failed: {exc}")
+    
     # Run APOC consolidation if requested and APOC is available
     consolidation_results = None
     if consolidate_entities:
@@ -365,18 +433,22 @@ def write_triplet_with_embedding(
     cypher = f"""
     // Create or merge entities (existing logic)
     MERGE (s:Entity:Concept {{name: $subject}})
-    ON CREATE SET s.created_at = datetime()
+    ON CREATE SET s.created_at = datetime(), s.name_lower = toLower(trim($subject))
+    SET s.changed_at = datetime()
     WITH s
     FOREACH (stype IN $subject_types |
         MERGE (st:Entity:Concept {{name: stype}})
+        ON CREATE SET st.name_lower = toLower(trim(stype)), st.created_at = datetime(), st.changed_at = datetime()
         MERGE (s)-[:IS_A]->(st)
     )
     
     MERGE (o:Entity:Concept {{name: $object}})
-    ON CREATE SET o.created_at = datetime()
+    ON CREATE SET o.created_at = datetime(), o.name_lower = toLower(trim($object))
+    SET o.changed_at = datetime()
     WITH s, o
     FOREACH (otype IN $object_types |
         MERGE (ot:Entity:Concept {{name: otype}})
+        ON CREATE SET ot.name_lower = toLower(trim(otype)), ot.created_at = datetime(), ot.changed_at = datetime()
         MERGE (o)-[:IS_A]->(ot)
     )
     
@@ -387,14 +459,17 @@ def write_triplet_with_embedding(
         r.sources = $sources,
         r.page_number = $page_number,
         r.confidence = $confidence,
-        r.status = $status,
+        r.status = coalesce($status, 'unverified'),
         r.created_at = datetime(),
         r.created_by = $user_id
     ON MATCH SET
         r.sources = CASE
             WHEN r.sources IS NULL THEN $sources
             ELSE r.sources + [x IN $sources WHERE NOT x IN r.sources]
-        END
+        END,
+        r.status = coalesce(r.status, 'unverified')
+    SET r.review_priority = {REVIEW_PRIORITY}
+    {"" if rel_type in NON_REVIEW_REL_TYPES else REVIEW_ITEM_SYNC_CYPHER}
     
     // Create Triplet node with embedding
     MERGE (t:Triplet {{id: $triplet_id}})
@@ -426,6 +501,7 @@ def write_triplet_with_embedding(
     RETURN t.id as triplet_id
     """
     
+    _ensure_review_schema()
     with neo4j_client._driver.session(database=settings.neo4j_database) as session:
         result = session.run(
             cypher,
@@ -445,5 +521,7 @@ def write_triplet_with_embedding(
             embedding_model=settings.openai_embedding_model
         )
         record = result.single()
-        logger.info(f"Created triplet node: {triplet_id} ({subject} {predicate} {object})")
-        return record["triplet_id"] if record else triplet_id
+    refresh_type_closure([subject, object] + subject_types + object_types)
+    bump_graph_version()
+    logger.info(f"Created triplet node: {triplet_id} ({subject} {predicate} {object})")
+    return record["triplet_id"] if record else triplet_id
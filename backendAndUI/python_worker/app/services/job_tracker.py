@@ -1,8 +1,19 @@
-"""Job tracking service using Redis for fast status updates."""
+"""Job tracking service using Redis for fast status updates.
+
+Jobs are hashes under ``job:{job_id}`` (one JSON-encoded value per field)
+that expire ``JOB_TTL_SECONDS`` after creation. Updates write only the
+changed fields through ``UPDATE_JOB_SCRIPT``, so a status transition, its
+timestamp and any result fields land atomically in one round trip. Listing
+is served by sorted sets of job ids scored by ``created_at``: ``jobs:index``
+for all jobs and ``jobs:user:{user_id}`` per user. Entries older than the TTL are trimmed from an index whenever it is
+written or read, so the indexes track the live jobs.
+"""
 import json
+import logging
 import redis
-from typing import Optional
-from datetime import datetime
+import time
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
 import os
 from ..models.job import IngestJob, JobStatus
 
@@ -30,6 +41,93 @@ else:
         ssl=True if os.getenv("RAILWAY_ENVIRONMENT") else False
     )
 
+logger = logging.getLogger(__name__)
+
+JOB_TTL_SECONDS = 86400  # 24 hours
+GLOBAL_JOB_INDEX = "jobs:index"
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _user_job_index(user_id: str) -> str:
+    return f"jobs:user:{user_id}"
+
+
+def _created_score(created_at: str) -> float:
+    """Epoch seconds of a job's ``created_at`` (naive ISO timestamps are UTC)."""
+    try:
+        created = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return time.time()
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created.timestamp()
+
+
+# Terminal statuses are final: a late or repeated update cannot reopen a job.
+# KEYS[1]: job hash. ARGV[1]: new status (JSON) or '' to keep it; ARGV[2]: now
+# (JSON); ARGV[3..]: field/value pairs, an empty value deletes the field. Returns 0 if the job is gone, -1 if
+# the transition was refused, 1 otherwise. A missing job is never recreated.
+UPDATE_JOB_SCRIPT = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local status = ARGV[1]
+if status ~= '' then
+    local current = redis.call('HGET', KEYS[1], 'status')
+    if (current == '"completed"' or current == '"failed"') and current ~= status then
+        return -1
+    end
+    redis.call('HSET', KEYS[1], 'status', status)
+    if status == '"processing"' then
+        redis.call('HSETNX', KEYS[1], 'started_at', ARGV[2])
+    elseif status == '"completed"' or status == '"failed"' then
+        redis.call('HSET', KEYS[1], 'completed_at', ARGV[2])
+    end
+end
+for i = 3, #ARGV, 2 do
+    if ARGV[i + 1] == '' then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    else
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+return 1
+""")
+
+
+def _encode_fields(fields: dict) -> Dict[str, str]:
+    """Job fields as hash values; None fields are left out."""
+    return {key: json.dumps(value, default=str) for key, value in fields.items() if value is not None}
+
+
+def _decode_job(data: Dict[str, str]) -> Optional[IngestJob]:
+    if not data:
+        return None
+    return IngestJob(**{key: json.loads(value) for key, value in data.items()})
+
+
+def _is_wrong_type(exc: Exception) -> bool:
+    return isinstance(exc, redis.ResponseError) and "WRONGTYPE" in str(exc)
+
+
+def _migrate_legacy_job(job_id: str) -> None:
+    """Rewrite a job stored as one JSON string (before hashes) as a hash, keeping its TTL."""
+    key = _job_key(job_id)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(key)
+    pipe.pttl(key)
+    data, ttl = pipe.execute()
+    if not data:
+        return
+    pipe = redis_client.pipeline()
+    pipe.delete(key)
+    pipe.hset(key, mapping=_encode_fields(json.loads(data)))
+    pipe.pexpire(key, ttl if ttl and ttl > 0 else JOB_TTL_SECONDS * 1000)
+    pipe.execute()
+
 
 class JobTracker:
     """Track ingestion job status using Redis."""
@@ -39,19 +137,44 @@ class JobTracker:
         """Create a new job in Redis."""
         # Store job data (excluding large binary data)
         job_data = job.dict(exclude={"pdf_bytes"})
-        redis_client.setex(
-            f"job:{job.job_id}",
-            86400,  # 24 hours TTL
-            json.dumps(job_data, default=str)
-        )
+        key = _job_key(job.job_id)
+        score = _created_score(job.created_at)
+        expired_before = time.time() - JOB_TTL_SECONDS
+
+        pipe = redis_client.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=_encode_fields(job_data))
+        pipe.expire(key, JOB_TTL_SECONDS)
+        indexes = [GLOBAL_JOB_INDEX] + ([_user_job_index(job.user_id)] if job.user_id else [])
+        for index in indexes:
+            pipe.zadd(index, {job.job_id: score})
+            pipe.zremrangebyscore(index, "-inf", expired_before)
+            pipe.expire(index, JOB_TTL_SECONDS)
+        pipe.execute()
     
     @staticmethod
     def get_job(job_id: str) -> Optional[IngestJob]:
         """Retrieve job by ID."""
-        data = redis_client.get(f"job:{job_id}")
-        if not data:
-            return None
-        return IngestJob(**json.loads(data))
+        return JobTracker._get_jobs([job_id])[0]
+
+    @staticmethod
+    def _get_jobs(job_ids: List[str]) -> List[Optional[IngestJob]]:
+        """Jobs by id in one pipeline (None for missing ones)."""
+        pipe = redis_client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(_job_key(job_id))
+        results = pipe.execute(raise_on_error=False)
+
+        jobs = []
+        for job_id, data in zip(job_ids, results):
+            if _is_wrong_type(data):
+                legacy = redis_client.get(_job_key(job_id))
+                jobs.append(IngestJob(**json.loads(legacy)) if legacy else None)
+            elif isinstance(data, Exception):
+                raise data
+            else:
+                jobs.append(_decode_job(data))
+        return jobs
     
     @staticmethod
     def update_status(
@@ -59,49 +182,57 @@ class JobTracker:
         status: JobStatus,
         **kwargs
     ) -> None:
-        """Update job status and other fields."""
-        job = JobTracker.get_job(job_id)
-        if not job:
-            return
-        
-        # Update status
-        job.status = status
-        
-        # Update timestamp based on status
-        if status == JobStatus.PROCESSING and not job.started_at:
-            job.started_at = datetime.utcnow().isoformat()
-        elif status in [JobStatus.COMPLETED, JobStatus.FAILED]:
-            job.completed_at = datetime.utcnow().isoformat()
-        
-        # Update any additional fields
-        for key, value in kwargs.items():
-            if hasattr(job, key):
-                setattr(job, key, value)
-        
-        # Save back to Redis
-        job_data = job.dict(exclude={"pdf_bytes"})
-        redis_client.setex(
-            f"job:{job_id}",
-            86400,
-            json.dumps(job_data, default=str)
-        )
+        """Update job status, its timestamp and other fields atomically."""
+        JobTracker._update(job_id, status, kwargs)
+
+    @staticmethod
+    def update_fields(job_id: str, **kwargs) -> None:
+        """Update fields (e.g. progress counters) without touching the status."""
+        JobTracker._update(job_id, None, kwargs)
+
+    @staticmethod
+    def _update(job_id: str, status: Optional[JobStatus], fields: dict) -> None:
+        known = {key: value for key, value in fields.items() if key in IngestJob.model_fields and key != "pdf_bytes"}
+        args = [json.dumps(status) if status is not None else "", json.dumps(datetime.utcnow().isoformat())]
+        for key, value in known.items():
+            args += [key, "" if value is None else json.dumps(value, default=str)]
+
+        try:
+            result = UPDATE_JOB_SCRIPT(keys=[_job_key(job_id)], args=args)
+        except redis.ResponseError as exc:
+            if not _is_wrong_type(exc):
+                raise
+            _migrate_legacy_job(job_id)
+            result = UPDATE_JOB_SCRIPT(keys=[_job_key(job_id)], args=args)
+
+        if result == -1:
+            logger.warning(f"Ignored {status.value} update for job {job_id}: it already finished")
     
     @staticmethod
-    def list_jobs(user_id: Optional[str] = None, limit: int = 50) -> list[IngestJob]:
-        """List recent jobs, optionally filtered by user."""
-        # This is a simple implementation; for production, you'd want to maintain
-        # a sorted set by timestamp for efficient querying
-        jobs = []
-        for key in redis_client.scan_iter("job:*", count=100):
-            data = redis_client.get(key)
-            if data:
-                job = IngestJob(**json.loads(data))
-                if user_id is None or job.user_id == user_id:
-                    jobs.append(job)
-                if len(jobs) >= limit:
-                    break
-        
-        # Sort by created_at descending
-        jobs.sort(key=lambda j: j.created_at, reverse=True)
-        return jobs[:limit]
+    def list_jobs(user_id: Optional[str] = None, limit: int = 50) -> List[IngestJob]:
+        """List the most recent jobs, newest first, optionally filtered by user."""
+        if limit <= 0:
+            return []
+        index = _user_job_index(user_id) if user_id else GLOBAL_JOB_INDEX
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zremrangebyscore(index, "-inf", time.time() - JOB_TTL_SECONDS)
+        pipe.zrevrange(index, 0, limit - 1)
+        job_ids = pipe.execute()[1]
 
+        jobs: List[IngestJob] = []
+        start = 0
+        while job_ids:
+            start += len(job_ids)
+            missing = []
+            for job_id, job in zip(job_ids, JobTracker._get_jobs(job_ids)):
+                if job:
+                    jobs.append(job)
+                else:
+                    missing.append(job_id)
+            if not missing:
+                break
+            # Expired or deleted ahead of the trim; drop them and fill the gap
+            redis_client.zrem(index, *missing)
+            start -= len(missing)
+            job_ids = redis_client.zrevrange(index, start, start + limit - len(jobs) - 1)
+        return jobs
@@ -0,0 +1,206 @@
+"""Server-side graph layout computation.
+
+Computes force-directed layouts (see ``force_layout``) per workspace and
+persists them together with the structure version they reflect (see
+``graph_layout`` and ``graph_version``), so review status changes alone never
+trigger a recompute. When the graph has moved on since the stored layout, only
+new nodes are placed: each starts at the centroid of its already placed
+neighbours and a short refinement pass moves the new nodes while existing
+positions stay fixed, so the picture users already know does not reshuffle.
+
+Layouts are computed in a background thread per scope; query endpoints
+attach stored positions to the nodes they return and schedule a recompute
+when the layout is stale, so the browser only has to render.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from .force_layout import IDEAL_EDGE_LENGTH, force_layout
+from .graph_layout import layout_scope, load_layout, save_layout, set_layout_graph_version
+from .graph_version import GLOBAL_SCOPE, get_structure_version
+from .neo4j_client import neo4j_client
+from .scope_graph import load_scope_graph
+from .spatial_index import viewport_index
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Fall back to a full layout when more than this share of the nodes is new
+FULL_RELAYOUT_FRACTION = 0.3
+INCREMENTAL_ITERATIONS = 40
+
+STATUS_CYPHER = """
+OPTIONAL MATCH (v:GraphVersion {scope: $scope})
+OPTIONAL MATCH (l:GraphLayout {scope: $scope})
+RETURN coalesce(v.version, 0) AS graph_version,
+       coalesce(v.structure_version, v.version, 0) AS structure_version,
+       l.graph_version AS layout_graph_version
+"""
+
+_running: Set[str] = set()
+_running_lock = threading.Lock()
+
+
+def _seed_new_nodes(
+    pos: np.ndarray,
+    known: np.ndarray,
+    src: np.ndarray,
+    dst: np.ndarray,
+    seed: int = 0,
+) -> np.ndarray:
+    """Place unknown nodes at the centroid of their placed neighbours (plus jitter)."""
+    n = len(pos)
+    rng = np.random.default_rng(seed)
+    placed = known.copy()
+    # Two passes so nodes whose only neighbours are also new still land nearby
+    for _ in range(2):
+        sums = np.zeros((n, 2))
+        counts = np.zeros(n)
+        for a, b in ((src, dst), (dst, src)):
+            mask = placed[b] & ~placed[a]
+            np.add.at(sums, a[mask], pos[b[mask]])
+            counts += np.bincount(a[mask], minlength=n)
+        newly = (counts > 0) & ~placed
+        pos[newly] = sums[newly] / counts[newly, None]
+        pos[newly] += rng.normal(0, IDEAL_EDGE_LENGTH / 2, size=(int(newly.sum()), 2))
+        placed |= newly
+
+    orphans = ~placed
+    if orphans.any():
+        center = pos[known].mean(axis=0) if known.any() else np.zeros(2)
+        spread = pos[known].std(axis=0).max() if known.sum() > 1 else IDEAL_EDGE_LENGTH * np.sqrt(n)
+        pos[orphans] = center + rng.normal(0, spread, size=(int(orphans.sum()), 2))
+    return pos
+
+
+def compute_layout(workspace_id: Optional[str] = None, full: bool = False) -> Dict[str, Any]:
+    """Compute and persist the layout for a scope if it is stale (or ``full`` is set)."""
+    scope = layout_scope(workspace_id)
+    graph_version = get_structure_version(workspace_id)
+    stored = load_layout(scope)
+    if stored and not full and stored.get("graph_version") == graph_version:
+        return {"scope": scope, "mode": "current", "nodes": len(stored["node_ids"]), "graph_version": graph_version}
+
+    started = time.monotonic()
+    node_ids, _, src, dst = load_scope_graph(workspace_id)
+    n = len(node_ids)
+    if n == 0:
+        return {"scope": scope, "mode": "empty", "nodes": 0, "graph_version": graph_version}
+
+    mode = "full"
+    pos = None
+    known = None
+    if stored and not full:
+        previous = {node_id: (x, y) for node_id, x, y in zip(stored["node_ids"], stored["xs"], stored["ys"])}
+        known = np.array([node_id in previous for node_id in node_ids])
+        if known.any() and (~known).sum() <= FULL_RELAYOUT_FRACTION * n:
+            mode = "incremental"
+            pos = np.zeros((n, 2))
+            for i, node_id in enumerate(node_ids):
+                if node_id in previous:
+                    pos[i] = previous[node_id]
+            pos = _seed_new_nodes(pos, known, src, dst)
+
+    if mode == "incremental" and known.all():
+        # Nothing new to place: keep the positions (and the viewport indexes
+        # built from them) and only record the version they now reflect
+        set_layout_graph_version(scope, graph_version)
+        return {
+            "scope": scope,
+            "mode": "unchanged",
+            "nodes": n,
+            "edges": int(len(src)),
+            "version": stored.get("version"),
+            "graph_version": graph_version,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+
+    if mode == "incremental":
+        xs, ys = force_layout(
+            n, src, dst, positions=pos, fixed=known,
+            iterations=INCREMENTAL_ITERATIONS, initial_temperature=IDEAL_EDGE_LENGTH,
+        )
+    else:
+        xs, ys = force_layout(n, src, dst)
+
+    version = save_layout(scope, node_ids, xs, ys, graph_version=graph_version)
+    viewport_index.invalidate(workspace_id)
+    elapsed = time.monotonic() - started
+    logger.info(f"Layout for {scope} computed ({mode}): {n} nodes, {len(src)} edges in {elapsed:.1f}s")
+    return {
+        "scope": scope,
+        "mode": mode,
+        "nodes": n,
+        "edges": int(len(src)),
+        "version": version,
+        "graph_version": graph_version,
+        "seconds": round(elapsed, 2),
+    }
+
+
+def schedule_layout(workspace_id: Optional[str] = None, full: bool = False) -> bool:
+    """Compute the layout in a background thread; False if one is already running."""
+    scope = layout_scope(workspace_id)
+    with _running_lock:
+        if scope in _running:
+            return False
+        _running.add(scope)
+
+    def run():
+        try:
+            compute_layout(workspace_id, full=full)
+        except Exception as exc:
+            logger.warning(f"Layout computation for {scope} failed: {exc}")
+        finally:
+            with _running_lock:
+                _running.discard(scope)
+
+    threading.Thread(target=run, name=f"layout-{scope}", daemon=True).start()
+    return True
+
+
+def layout_status(workspace_id: Optional[str] = None) -> Dict[str, Any]:
+    scope = layout_scope(workspace_id)
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(STATUS_CYPHER, scope=scope).single()
+    layout_graph_version = record["layout_graph_version"]
+    return {
+        "scope": scope,
+        "graph_version": record["graph_version"],
+        "structure_version": record["structure_version"],
+        "layout_graph_version": layout_graph_version,
+        "stale": layout_graph_version != record["structure_version"],
+        "computing": scope in _running,
+    }
+
+
+def attach_layout(nodes: List[Dict[str, Any]], workspace_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Set ``x`` / ``y`` on nodes from the stored layout and refresh it in the background when stale.
+
+    Returns layout metadata for the response, or None if no layout is available.
+    Failures are logged and never break the calling query.
+    """
+    try:
+        status = layout_status(workspace_id)
+        if status["stale"]:
+            schedule_layout(workspace_id)
+        index = viewport_index.get(workspace_id)
+        if index is None:
+            return {"positioned": 0, **status}
+        positioned = 0
+        for node in nodes:
+            i = index.index_of.get(node.get("id"))
+            if i is not None:
+                node["x"], node["y"] = index.position(i)
+                positioned += 1
+        return {"positioned": positioned, "version": index.version, **status}
+    except Exception as exc:
+        logger.warning(f"Could not attach layout positions for {workspace_id or GLOBAL_SCOPE}: {exc}")
+        return None
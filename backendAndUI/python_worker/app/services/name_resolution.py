@@ -0,0 +1,124 @@
+"""Resolve user-typed concept names to entity names.
+
+Resolution is index-backed so it costs the same however large the graph is:
+
+1. exact lookup on ``name_lower`` (the trimmed, lowercased name, covered by the
+   ``entity_name_lower`` index), then
+2. for names without an exact match, the ``entity_search`` fulltext index,
+   keeping only the best few candidates.
+
+Both steps run as one batched query for all names, so resolving the source and
+target of a pathway request (or a whole batch of names) takes two round-trips
+at most. ``name_lower`` is set by the write path; ``backfill_normalized_names``
+fills it in for entities written before it existed.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Iterable, List
+
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+MAX_CANDIDATES = 5
+BACKFILL_BATCH_SIZE = 5000
+
+EXACT_CYPHER = """
+UNWIND $names AS name
+MATCH (e:Entity {name_lower: name})
+WITH name, e ORDER BY coalesce(e.significance, 0) DESC
+RETURN name, collect(e.name)[..$limit] AS candidates
+"""
+
+FULLTEXT_CYPHER = """
+UNWIND $queries AS query
+CALL {
+  WITH query
+  CALL db.index.fulltext.queryNodes('entity_search', query.text) YIELD node, score
+  WHERE node:Entity
+  RETURN node.name AS candidate
+  ORDER BY score DESC, size(node.name) ASC
+  LIMIT $limit
+}
+RETURN query.name AS name, collect(candidate) AS candidates
+"""
+
+NAME_LOWER_INDEX_CYPHER = "CREATE INDEX entity_name_lower IF NOT EXISTS FOR (e:Entity) ON (e.name_lower)"
+
+BACKFILL_CYPHER = """
+MATCH (e:Entity) WHERE e.name_lower IS NULL AND e.name IS NOT NULL
+WITH e LIMIT $batch
+SET e.name_lower = toLower(trim(e.name))
+RETURN count(e) AS updated
+"""
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_name(name: str) -> str:
+    """The ``name_lower`` form of a name (matches ``toLower(trim(name))``)."""
+    return name.strip().lower()
+
+
+def fulltext_query(name: str) -> str:
+    """Lucene query requiring every word of ``name`` as a token prefix; empty if it has no words."""
+    return " AND ".join(f"{word}*" for word in _WORD.findall(name.lower()))
+
+
+def resolve_names(names: Iterable[str], limit: int = MAX_CANDIDATES) -> Dict[str, List[str]]:
+    """Candidate entity names for every input name, best first.
+
+    Names with an exact (case-insensitive) match resolve to those entities
+    only; the rest get up to ``limit`` fulltext candidates. Names that match
+    nothing map to an empty list.
+    """
+    names = list(dict.fromkeys(names))
+    resolved: Dict[str, List[str]] = {name: [] for name in names}
+    if not names:
+        return resolved
+
+    by_normalized: Dict[str, List[str]] = {}
+    for name in names:
+        by_normalized.setdefault(normalize_name(name), []).append(name)
+
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        for record in session.run(EXACT_CYPHER, names=list(by_normalized), limit=limit):
+            for name in by_normalized[record["name"]]:
+                resolved[name] = record["candidates"]
+
+        queries = [
+            {"name": name, "text": fulltext_query(name)}
+            for name in names
+            if not resolved[name]
+        ]
+        queries = [query for query in queries if query["text"]]
+        if queries:
+            try:
+                for record in session.run(FULLTEXT_CYPHER, queries=queries, limit=limit):
+                    resolved[record["name"]] = record["candidates"]
+            except Exception as exc:
+                logger.warning(f"Fulltext name resolution unavailable: {exc}")
+    return resolved
+
+
+def resolve_name(name: str, limit: int = MAX_CANDIDATES) -> List[str]:
+    """Candidate entity names for a single input name, best first."""
+    return resolve_names([name], limit)[name]
+
+
+def backfill_normalized_names(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Create the ``name_lower`` index and set the property where it is missing; returns the count."""
+    total = 0
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        session.run(NAME_LOWER_INDEX_CYPHER)
+        while True:
+            updated = session.run(BACKFILL_CYPHER, batch=batch_size).single()["updated"]
+            total += updated
+            if updated < batch_size:
+                break
+    logger.info(f"Backfilled name_lower on {total} entities")
+    return total
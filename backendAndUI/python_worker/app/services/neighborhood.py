@@ -0,0 +1,143 @@
+"""Bounded breadth-first neighborhood expansion.
+
+The neighborhood of a node grows one hop at a time with one batched query per
+hop: every frontier node contributes its ``fan_out`` best-ranked
+relationships to unvisited neighbours (more when the frontier is too small to
+fill the hop), and the hop admits new nodes in rank order until its share of
+the node limit is reached. Nodes and relationships are
+deduplicated as they are admitted, so the work per request is bounded by the
+limit and the fan-out cap instead of by the number of paths through hubs.
+A final query adds the relationships among the admitted nodes that no hop
+returned (between nodes of the same hop, or back to earlier ones).
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from .graph_export import STRUCTURAL_REL_TYPES
+
+
+DEFAULT_FAN_OUT = 25
+
+# Neighbour ranking, most important key first
+RANK_KEYS = {
+    "significance": ("coalesce(m.significance, 0)", "coalesce(r.confidence, 0)"),
+    "confidence": ("coalesce(r.confidence, 0)", "coalesce(m.significance, 0)"),
+    "pagerank": ("coalesce(m.pagerank, 0)", "coalesce(r.confidence, 0)"),
+}
+
+
+# Relationship payload for ``r`` between ``s`` and ``t``
+REL_PROJECTION = (
+    "{id: elementId(r), source: coalesce(s.id, s.name, elementId(s)), target: coalesce(t.id, t.name, elementId(t)), "
+    " relation: coalesce(r.relation, type(r)), polarity: coalesce(r.polarity, 'positive'), "
+    " confidence: coalesce(r.confidence, 0), significance: coalesce(r.significance, null), status: r.status, "
+    " page_number: coalesce(r.page_number, null), original_text: coalesce(r.original_text, null)}"
+)
+
+
+def one_hop_cypher(verified_only: bool, rank_by: str) -> str:
+    """Best ``$fan_out`` relationships from each ``$frontier`` node to nodes outside ``$visited``."""
+    status_filter = "AND r.status = 'verified'" if verified_only else ""
+    primary, secondary = RANK_KEYS[rank_by]
+    return (
+        f"UNWIND $frontier AS node_id "
+        f"MATCH (n:Entity {{name: node_id}}) "
+        f"CALL {{ "
+        f"  WITH n "
+        f"  MATCH (n)-[r]-(m:Entity) "
+        f"  WHERE NOT type(r) IN $structural_types AND NOT m.name IN $visited {status_filter} "
+        f"  RETURN r, m, [{primary}, {secondary}] AS rank "
+        f"  ORDER BY rank[0] DESC, rank[1] DESC "
+        f"  LIMIT $fan_out "
+        f"}} "
+        f"WITH r, m, rank, startNode(r) AS s, endNode(r) AS t "
+        f"RETURN m.name AS neighbor_id, rank, {REL_PROJECTION} AS relationship"
+    )
+
+
+def closing_cypher(verified_only: bool) -> str:
+    """Relationships among ``$node_ids`` other than the ``$known`` ones, capped at ``$limit``."""
+    status_filter = "AND r.status = 'verified'" if verified_only else ""
+    return (
+        f"UNWIND $node_ids AS node_id "
+        f"MATCH (s:Entity {{name: node_id}})-[r]->(t:Entity) "
+        f"WHERE t.name IN $node_ids AND NOT type(r) IN $structural_types "
+        f"  AND NOT elementId(r) IN $known {status_filter} "
+        f"RETURN {REL_PROJECTION} AS relationship "
+        f"LIMIT $limit"
+    )
+
+
+def expand_neighborhood(
+    session,
+    node_id: str,
+    max_hops: int,
+    limit: int,
+    verified_only: bool = False,
+    rank_by: str = "significance",
+    fan_out: int = DEFAULT_FAN_OUT,
+    rel_limit: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """Expand up to ``limit`` nodes around ``node_id``; None if the node does not exist.
+
+    Returns the admitted node ids in BFS order (center first), the hop at
+    which each was reached, and the relationships among them: those that
+    reached each node first, then the remaining ones.
+    """
+    if session.run("MATCH (n:Entity {name: $node_id}) RETURN count(n) AS found", node_id=node_id).single()["found"] == 0:
+        return None
+
+    cypher = one_hop_cypher(verified_only, rank_by)
+    node_ids: List[str] = [node_id]
+    hops: Dict[str, int] = {node_id: 0}
+    relationships: Dict[str, Dict[str, Any]] = {}
+    frontier = [node_id]
+
+    for hop in range(1, max_hops + 1):
+        remaining = limit - len(node_ids)
+        if remaining <= 0 or not frontier:
+            break
+        # Spread what is left over the remaining hops; a small frontier may
+        # exceed the per-node fan-out so the center alone can fill its share
+        budget = math.ceil(remaining / (max_hops - hop + 1))
+        per_node = min(budget, max(fan_out, math.ceil(budget / len(frontier))))
+        best: Dict[str, Tuple[float, float]] = {}
+        reached_by: Dict[str, List[Dict[str, Any]]] = {}
+        for record in session.run(
+            cypher,
+            frontier=frontier,
+            visited=node_ids,
+            structural_types=STRUCTURAL_REL_TYPES,
+            fan_out=per_node,
+        ):
+            neighbor = record["neighbor_id"]
+            rank = tuple(record["rank"])
+            if neighbor not in best or rank > best[neighbor]:
+                best[neighbor] = rank
+            reached_by.setdefault(neighbor, []).append(record["relationship"])
+
+        frontier = sorted(best, key=best.__getitem__, reverse=True)[:budget]
+        for neighbor in frontier:
+            hops[neighbor] = hop
+            node_ids.append(neighbor)
+            for rel in reached_by[neighbor]:
+                relationships.setdefault(rel["id"], rel)
+
+    rels = list(relationships.values())
+    if rel_limit is not None:
+        rels = rels[:rel_limit]
+    closing_limit = len(node_ids) * len(node_ids) if rel_limit is None else rel_limit - len(rels)
+    if len(node_ids) > 1 and closing_limit > 0:
+        rels.extend(
+            record["relationship"]
+            for record in session.run(
+                closing_cypher(verified_only),
+                node_ids=node_ids,
+                known=list(relationships),
+                structural_types=STRUCTURAL_REL_TYPES,
+                limit=closing_limit,
+            )
+        )
+    return {"node_ids": node_ids, "hops": hops, "relationships": rels}
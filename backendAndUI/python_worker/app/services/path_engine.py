@@ -0,0 +1,393 @@
+"""Path search over the in-memory graph projection.
+
+* ``bidirectional_bfs`` grows breadth-first frontiers from the sources (along
+  outgoing edges) and from the targets (along incoming edges), always
+  expanding the smaller one, and stops at the first level where they meet.
+* ``cheapest_path`` is a hop-limited Bellman-Ford for non-negative edge costs:
+  round ``k`` only relaxes edges leaving nodes improved in round ``k - 1``, so
+  the search is exact under the hop limit and stops as soon as nothing
+  improves or every candidate is costlier than the best target reached.
+* ``k_shortest_paths`` is Yen's algorithm for loopless paths on top of either
+  search, returning alternatives in order of increasing length (or cost).
+* ``most_credible_path`` is bidirectional Dijkstra over evidence-based edge
+  costs (see ``CostModel``) for the path best supported by evidence,
+  regardless of length.
+
+Sources and targets are sets of node indices; searches return a ``Path`` with
+node and edge indices into the projection, or None.
+"""
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .graph_projection import (
+    ALL_STATUSES,
+    STATUS_INCORRECT,
+    STATUS_NONE,
+    STATUS_UNVERIFIED,
+    GraphProjection,
+)
+
+
+WEIGHTS = ("hops", "confidence", "credibility")
+# Confidence used for relationships that have none
+DEFAULT_CONFIDENCE = 0.5
+MIN_CONFIDENCE = 0.01
+# Added to every weighted edge so that equally credible paths prefer fewer hops
+HOP_COST = 0.01
+
+
+@dataclass
+class Path:
+    nodes: List[int]
+    edges: List[int]
+    cost: float
+
+    @property
+    def length(self) -> int:
+        return len(self.edges)
+
+
+@dataclass
+class CostModel:
+    """How relationship evidence translates into path cost (lower is more credible).
+
+    An edge costs ``hop_cost + confidence_weight * -log(confidence)`` plus a
+    penalty for its review status and ``significance_weight`` times its
+    shortfall from the highest significance, all divided by
+    ``1 + sources_weight * log(source_count)`` so corroborated edges are cheaper.
+    """
+
+    confidence_weight: float = 1.0
+    default_confidence: float = DEFAULT_CONFIDENCE
+    unverified_penalty: float = 0.5
+    # Relationships without a review status, such as IS_A links to type nodes
+    untyped_penalty: float = 1.0
+    exclude_incorrect: bool = True
+    incorrect_penalty: float = 5.0
+    significance_weight: float = 0.0
+    sources_weight: float = 0.5
+    hop_cost: float = HOP_COST
+
+    @classmethod
+    def from_options(cls, **options) -> "CostModel":
+        """Build a model from request options, ignoring unset (None) values."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in options.items() if k in names and v is not None})
+
+    def mask(self, mask: int) -> int:
+        """Narrow a status mask to the statuses this model may traverse."""
+        return mask & ~STATUS_INCORRECT if self.exclude_incorrect else mask
+
+    def costs(self, projection: GraphProjection) -> np.ndarray:
+        confidence = np.nan_to_num(projection.confidence, nan=self.default_confidence)
+        cost = self.hop_cost - self.confidence_weight * np.log(np.clip(confidence, MIN_CONFIDENCE, 1.0)).astype(np.float64)
+        status = projection.status
+        cost += np.where(status == STATUS_UNVERIFIED, self.unverified_penalty, 0.0)
+        cost += np.where(status == STATUS_NONE, self.untyped_penalty, 0.0)
+        cost += np.where(status == STATUS_INCORRECT, self.incorrect_penalty, 0.0)
+        if self.significance_weight:
+            significance = np.nan_to_num(projection.significance, nan=0.0)
+            top = float(significance.max()) if len(significance) else 0.0
+            if top > 0:
+                cost += self.significance_weight * (1.0 - np.clip(significance, 0.0, top) / top)
+        if self.sources_weight:
+            cost /= 1.0 + self.sources_weight * np.log(np.maximum(projection.source_count, 1))
+        return np.maximum(cost, 0.0)
+
+
+def edge_costs(projection: GraphProjection, weight: str, model: Optional[CostModel] = None) -> Optional[np.ndarray]:
+    """Per-edge costs for ``weight``; None for plain hop counts."""
+    if weight == "hops":
+        return None
+    if weight == "confidence":
+        confidence = np.nan_to_num(projection.confidence, nan=DEFAULT_CONFIDENCE)
+        return -np.log(np.clip(confidence, MIN_CONFIDENCE, 1.0)).astype(np.float64) + HOP_COST
+    if weight == "credibility":
+        return (model or CostModel()).costs(projection)
+    raise ValueError(f"Unknown weight: {weight}")
+
+
+def _as_nodes(indices: Iterable[int], banned_nodes: Optional[np.ndarray]) -> np.ndarray:
+    nodes = np.unique(np.asarray(list(indices), dtype=np.int32))
+    if banned_nodes is not None and len(nodes):
+        nodes = nodes[~banned_nodes[nodes]]
+    return nodes
+
+
+def _expand(
+    projection: GraphProjection,
+    frontier: np.ndarray,
+    direction: str,
+    mask: int,
+    banned_nodes: Optional[np.ndarray],
+    banned_edges: Optional[np.ndarray],
+):
+    origin, neighbours, edge = projection.expand(frontier, direction, mask)
+    if banned_nodes is not None or banned_edges is not None:
+        keep = np.ones(len(edge), dtype=bool)
+        if banned_nodes is not None:
+            keep &= ~banned_nodes[neighbours]
+        if banned_edges is not None:
+            keep &= ~banned_edges[edge]
+        origin, neighbours, edge = origin[keep], neighbours[keep], edge[keep]
+    return origin, neighbours, edge
+
+
+def bidirectional_bfs(
+    projection: GraphProjection,
+    sources: Iterable[int],
+    targets: Iterable[int],
+    max_hops: int,
+    mask: int = ALL_STATUSES,
+    banned_nodes: Optional[np.ndarray] = None,
+    banned_edges: Optional[np.ndarray] = None,
+) -> Optional[Path]:
+    """Fewest-hop directed path from any source to any target, at most ``max_hops`` long."""
+    n = projection.node_count
+    front_f = _as_nodes(sources, banned_nodes)
+    front_b = _as_nodes(targets, banned_nodes)
+    front_b = front_b[~np.isin(front_b, front_f)]
+    if len(front_f) == 0 or len(front_b) == 0:
+        return None
+
+    dist_f = np.full(n, -1, dtype=np.int32)
+    dist_b = np.full(n, -1, dtype=np.int32)
+    parent_f = np.full(n, -1, dtype=np.int32)
+    parent_b = np.full(n, -1, dtype=np.int32)
+    dist_f[front_f] = 0
+    dist_b[front_b] = 0
+    depth_f = depth_b = 0
+
+    while len(front_f) and len(front_b) and depth_f + depth_b < max_hops:
+        forward = len(front_f) <= len(front_b)
+        if forward:
+            frontier, dist, parent, other, direction = front_f, dist_f, parent_f, dist_b, "out"
+            depth_f += 1
+            depth = depth_f
+        else:
+            frontier, dist, parent, other, direction = front_b, dist_b, parent_b, dist_f, "in"
+            depth_b += 1
+            depth = depth_b
+        _, neighbours, edge = _expand(projection, frontier, direction, mask, banned_nodes, banned_edges)
+        new = dist[neighbours] < 0
+        neighbours, first = np.unique(neighbours[new], return_index=True)
+        dist[neighbours] = depth
+        parent[neighbours] = edge[new][first]
+        if forward:
+            front_f = neighbours
+        else:
+            front_b = neighbours
+
+        meets = neighbours[other[neighbours] >= 0]
+        if len(meets):
+            meet = int(meets[np.argmin(dist_f[meets] + dist_b[meets])])
+            nodes, edges = projection.trace(meet, parent_f)
+            current = meet
+            while parent_b[current] >= 0:
+                edge_index = int(parent_b[current])
+                current = projection.other_end(edge_index, current)
+                edges.append(edge_index)
+                nodes.append(current)
+            return Path(nodes, edges, float(len(edges)))
+    return None
+
+
+def cheapest_path(
+    projection: GraphProjection,
+    sources: Iterable[int],
+    targets: Iterable[int],
+    costs: np.ndarray,
+    max_hops: int,
+    mask: int = ALL_STATUSES,
+    banned_nodes: Optional[np.ndarray] = None,
+    banned_edges: Optional[np.ndarray] = None,
+) -> Optional[Path]:
+    """Lowest-cost directed path with at most ``max_hops`` edges (costs must be non-negative)."""
+    n = projection.node_count
+    sources = _as_nodes(sources, banned_nodes)
+    targets = _as_nodes(targets, banned_nodes)
+    targets = targets[~np.isin(targets, sources)]
+    if len(sources) == 0 or len(targets) == 0:
+        return None
+    is_target = np.zeros(n, dtype=bool)
+    is_target[targets] = True
+
+    dist = np.full(n, np.inf)
+    dist[sources] = 0.0
+    # Per round: the nodes it improved and the edge that improved them
+    rounds: List[Dict[int, int]] = [{int(s): -1 for s in sources}]
+    active = sources
+    best = np.inf
+    for _ in range(max_hops):
+        origin, neighbours, edge = _expand(projection, active, "out", mask, banned_nodes, banned_edges)
+        candidate = dist[origin] + costs[edge]
+        keep = (candidate < dist[neighbours]) & (candidate < best)
+        neighbours, edge, candidate = neighbours[keep], edge[keep], candidate[keep]
+        if len(neighbours) == 0:
+            break
+        order = np.lexsort((candidate, neighbours))
+        neighbours, edge, candidate = neighbours[order], edge[order], candidate[order]
+        first = np.r_[True, neighbours[1:] != neighbours[:-1]]
+        neighbours, edge, candidate = neighbours[first], edge[first], candidate[first]
+        dist[neighbours] = candidate
+        rounds.append(dict(zip(neighbours.tolist(), edge.tolist())))
+        reached = is_target[neighbours]
+        if reached.any():
+            best = min(best, float(candidate[reached].min()))
+        # Targets end paths; only keep expanding the rest
+        active = neighbours[~reached]
+
+    if not np.isfinite(best):
+        return None
+    target = int(targets[np.argmin(dist[targets])])
+    nodes = [target]
+    edges: List[int] = []
+    level = len(rounds) - 1
+    while True:
+        while nodes[-1] not in rounds[level]:
+            level -= 1
+        edge_index = rounds[level][nodes[-1]]
+        if edge_index < 0:
+            break
+        edges.append(edge_index)
+        nodes.append(projection.other_end(edge_index, nodes[-1]))
+        level -= 1
+    return Path(nodes[::-1], edges[::-1], float(dist[target]))
+
+
+def _search(projection, sources, targets, costs, max_hops, mask, banned_nodes=None, banned_edges=None) -> Optional[Path]:
+    if costs is None:
+        return bidirectional_bfs(projection, sources, targets, max_hops, mask, banned_nodes, banned_edges)
+    return cheapest_path(projection, sources, targets, costs, max_hops, mask, banned_nodes, banned_edges)
+
+
+def k_shortest_paths(
+    projection: GraphProjection,
+    source: int,
+    targets: Sequence[int],
+    k: int,
+    max_hops: int,
+    mask: int = ALL_STATUSES,
+    costs: Optional[np.ndarray] = None,
+) -> List[Path]:
+    """Yen's algorithm: up to ``k`` loopless paths from ``source`` to any target, shortest first.
+
+    With ``costs`` the paths are ordered by total cost, otherwise by hop count.
+    """
+    first = _search(projection, [source], targets, costs, max_hops, mask)
+    if first is None:
+        return []
+
+    def path_cost(edges: List[int]) -> float:
+        if costs is None:
+            return float(len(edges))
+        return float(costs[edges].sum())
+
+    accepted: List[Path] = [first]
+    seen = {tuple(first.edges)}
+    candidates: List = []
+    counter = 0
+    banned_nodes = np.zeros(projection.node_count, dtype=bool)
+    banned_edges = np.zeros(projection.edge_count, dtype=bool)
+
+    while len(accepted) < k:
+        previous = accepted[-1]
+        for i in range(previous.length):
+            spur = previous.nodes[i]
+            root_nodes = previous.nodes[:i + 1]
+            root_edges = previous.edges[:i]
+            # Edges leaving the root in already accepted paths, and the root itself, are off limits
+            removed_edges = [p.edges[i] for p in accepted if p.length > i and p.edges[:i] == root_edges]
+            banned_edges[removed_edges] = True
+            banned_nodes[root_nodes[:-1]] = True
+            try:
+                spur_path = _search(projection, [spur], targets, costs, max_hops - i, mask, banned_nodes, banned_edges)
+            finally:
+                banned_edges[removed_edges] = False
+                banned_nodes[root_nodes[:-1]] = False
+            if spur_path is None:
+                continue
+            edges = root_edges + spur_path.edges
+            key = tuple(edges)
+            if key in seen:
+                continue
+            seen.add(key)
+            counter += 1
+            nodes = root_nodes[:-1] + spur_path.nodes
+            cost = path_cost(edges)
+            heapq.heappush(candidates, (cost, len(edges), counter, Path(nodes, edges, cost)))
+        if not candidates:
+            break
+        accepted.append(heapq.heappop(candidates)[-1])
+    return accepted
+
+
+def most_credible_path(
+    projection: GraphProjection,
+    sources: Iterable[int],
+    targets: Iterable[int],
+    costs: np.ndarray,
+    mask: int = ALL_STATUSES,
+) -> Optional[Path]:
+    """Lowest-cost directed path by bidirectional Dijkstra, with no hop limit.
+
+    One search runs forwards from the sources and one backwards from the
+    targets, always advancing the side with the closer frontier; they stop
+    once the two frontiers together cannot beat the best meeting found.
+    """
+    n = projection.node_count
+    sources = _as_nodes(sources, None)
+    targets = _as_nodes(targets, None)
+    targets = targets[~np.isin(targets, sources)]
+    if len(sources) == 0 or len(targets) == 0:
+        return None
+
+    adjacency = (projection.adjacency("out"), projection.adjacency("in"))
+    dist = (np.full(n, np.inf), np.full(n, np.inf))
+    parent = (np.full(n, -1, dtype=np.int32), np.full(n, -1, dtype=np.int32))
+    settled = (np.zeros(n, dtype=bool), np.zeros(n, dtype=bool))
+    heaps: List[List] = [[], []]
+    for side, starts in enumerate((sources, targets)):
+        dist[side][starts] = 0.0
+        heaps[side] = [(0.0, int(node)) for node in starts]
+
+    best = np.inf
+    meet = -1
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, u = heapq.heappop(heaps[side])
+        if settled[side][u]:
+            continue
+        settled[side][u] = True
+        indptr, indices, edges = adjacency[side]
+        start, end = indptr[u], indptr[u + 1]
+        neighbours, via = indices[start:end], edges[start:end]
+        candidate = d + costs[via]
+        better = candidate < dist[side][neighbours]
+        if mask != ALL_STATUSES:
+            better &= (projection.status[via] & mask) != 0
+        other = dist[1 - side]
+        for v, e, c in zip(neighbours[better].tolist(), via[better].tolist(), candidate[better].tolist()):
+            if c < dist[side][v]:
+                dist[side][v] = c
+                parent[side][v] = e
+                heapq.heappush(heaps[side], (c, v))
+                if c + other[v] < best:
+                    best = c + other[v]
+                    meet = v
+
+    if meet < 0:
+        return None
+    nodes, path_edges = projection.trace(meet, parent[0])
+    current = meet
+    while parent[1][current] >= 0:
+        edge = int(parent[1][current])
+        current = projection.other_end(edge, current)
+        path_edges.append(edge)
+        nodes.append(current)
+    return Path(nodes, path_edges, float(best))
@@ -4,29 +4,124 @@ Pathway Discovery Service
 
 This module provides advanced graph discovery capabilities including:
 - Shortest path finding between concepts
+- Batch shortest paths for panels of source/target pairs
 - All paths discovery
 - Multi-hop relationship exploration
 - Pattern-based queries
 
-Uses Neo4j Graph Data Science library for efficient path algorithms.
+Path searches run in-process on the CSR graph projection (see
+``graph_projection``). Concept names are resolved through indexes (see
+``name_resolution``); otherwise Neo4j is only queried for pattern matches and
+for document sources of the few nodes a response returns.
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+from dataclasses import asdict
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import logging
+import time
 
+import numpy as np
+
+from .graph_projection import GraphProjection, graph_projection, status_mask
+from .path_engine import (
+    CostModel,
+    Path,
+    bidirectional_bfs,
+    cheapest_path,
+    edge_costs,
+    k_shortest_paths,
+    most_credible_path,
+)
+from .name_resolution import resolve_names
 from .neo4j_client import neo4j_client
 from ..core.settings import settings
 
 
 logger = logging.getLogger(__name__)
 
+MAX_CONNECTORS = 20
+
+NODE_SOURCES_CYPHER = """
+UNWIND $node_ids AS node_id
+MATCH (n:Entity {name: node_id})
+OPTIONAL MATCH (n)-[:EXTRACTED_FROM]->(doc:Document)
+WITH node_id, collect({id: doc.document_id, title: coalesce(doc.title, doc.document_id)}) AS sources
+RETURN node_id, [s IN sources WHERE s.id IS NOT NULL] AS sources
+"""
+
+
+def _resolve(projection: GraphProjection, *names: str) -> List[List[int]]:
+    """Projection indices of the candidate entities for each name."""
+    resolved = resolve_names(names)
+    return [
+        [projection.index_of[candidate] for candidate in resolved[name] if candidate in projection.index_of]
+        for name in names
+    ]
+
+
+def _node_sources(node_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Source documents for a handful of nodes."""
+    if not node_ids:
+        return {}
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        return {
+            record["node_id"]: record["sources"]
+            for record in session.run(NODE_SOURCES_CYPHER, node_ids=node_ids)
+        }
+
+
+def _path_payload(projection: GraphProjection, path: Path, weight: str = "hops") -> Dict[str, Any]:
+    payload = {
+        "source": projection.node_ids[path.nodes[0]],
+        "target": projection.node_ids[path.nodes[-1]],
+        "path_length": path.length,
+        "nodes": [projection.node(i) for i in path.nodes],
+        "relationships": [projection.relationship(e) for e in path.edges],
+    }
+    if weight != "hops":
+        payload["cost"] = round(path.cost, 6)
+    return payload
+
+
+def _flags(projection: GraphProjection, indices: List[int]) -> np.ndarray:
+    flags = np.zeros(projection.node_count, dtype=bool)
+    flags[indices] = True
+    return flags
+
+
+def _shortest_paths_to(
+    projection: GraphProjection,
+    node: int,
+    distance: np.ndarray,
+    mask: int,
+    limit: int,
+) -> List[Tuple[List[int], List[int]]]:
+    """Every shortest path from a BFS source to ``node`` (up to ``limit``) as (nodes, edges)."""
+    paths: List[Tuple[List[int], List[int]]] = []
+
+    def walk(current: int, nodes: List[int], edges: List[int]) -> None:
+        if len(paths) >= limit:
+            return
+        if distance[current] == 0:
+            paths.append((nodes[::-1], edges[::-1]))
+            return
+        _, predecessors, via = projection.expand(np.array([current], dtype=np.int32), "in", mask)
+        for predecessor, edge in zip(predecessors, via):
+            if distance[predecessor] == distance[current] - 1:
+                walk(int(predecessor), nodes + [int(predecessor)], edges + [int(edge)])
+
+    walk(node, [node], [])
+    return paths
+
 
 def find_shortest_path(
     source_name: str, 
     target_name: str, 
     max_hops: int = 5,
-    verified_only: bool = False
+    verified_only: bool = False,
+    algorithm: str = "bidirectional",
+    weight: str = "hops"
 ) -> Dict[str, Any]:
     """
     Find the shortest path between two concepts in the knowledge graph.
@@ -36,86 +131,44 @@ def find_shortest_path(
         target_name: Name of the target concept
         max_hops: Maximum number of relationship hops to explore
         verified_only: Only consider verified relationships
+        algorithm: "bidirectional" BFS or one-sided "bfs" (ignored for weighted searches)
+        weight: "hops", or "confidence" for the most confident path within max_hops
         
     Returns:
         Dict containing path information, nodes, and relationships
     """
-    status_filter = "AND r.status = 'verified'" if verified_only else ""
-    
-    cypher = f"""
-    MATCH (source:Entity), (target:Entity)
-    WHERE toLower(source.name) CONTAINS toLower($source_name)
-      AND toLower(target.name) CONTAINS toLower($target_name)
-    
-    MATCH path = shortestPath((source)-[*1..{max_hops}]->(target))
-    WHERE all(r IN relationships(path) WHERE $verified_only = false OR r.status = 'verified')
-    
-    WITH path, source, target, length(path) AS path_length,
-         [r IN relationships(path) | {{
-            id: elementId(r),
-            source: coalesce(startNode(r).id, startNode(r).name, elementId(startNode(r))),
-            target: coalesce(endNode(r).id, endNode(r).name, elementId(endNode(r))),
-            relation: type(r),
-            confidence: r.confidence,
-            significance: r.significance,
-            status: r.status,
-            polarity: coalesce(r.polarity, 'positive')
-         }}] AS path_rels,
-         CASE WHEN size(nodes(path)) = 0 THEN [] ELSE range(0, size(nodes(path)) - 1) END AS idxs
-    
-    UNWIND idxs AS idx
-    WITH path, source, target, path_length, path_rels, idx, nodes(path)[idx] AS node
-    OPTIONAL MATCH (node)-[:IS_A]->(type:Concept)
-    WITH source, target, path_length, path_rels, idx, node, collect(DISTINCT type.name) AS type_names
-    WITH source, target, path_length, path_rels,
-         collect({{
-            idx: idx,
-            id: coalesce(node.id, node.name, elementId(node)),
-            name: node.name,
-            types: CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END,
-            type: CASE WHEN size(type_names) = 0 THEN 'Concept' ELSE head(type_names) END,
-            significance: node.significance
-         }}) AS nodes_with_idx
-    WITH source, target, path_length, path_rels,
-         [n IN nodes_with_idx ORDER BY n.idx | n{{.id, .name, .types, .type, .significance}}] AS path_nodes
-    
-    RETURN
-      source.name AS source,
-      target.name AS target,
-      path_length,
-      path_nodes,
-      path_rels
-    ORDER BY path_length ASC
-    LIMIT 1
-    """
-    
     try:
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(
-                cypher, 
-                source_name=source_name, 
-                target_name=target_name,
-                verified_only=verified_only
-            )
-            record = result.single()
-            
-            if not record:
-                return {
-                    "success": False,
-                    "message": f"No path found between '{source_name}' and '{target_name}'",
-                    "path_found": False
-                }
-            
+        projection = graph_projection.get()
+        mask = status_mask(verified_only)
+        sources, targets = _resolve(projection, source_name, target_name)
+        costs = edge_costs(projection, weight)
+        if costs is not None:
+            algorithm = "weighted"
+            path = cheapest_path(projection, sources, targets, costs, max_hops, mask)
+        elif algorithm == "bidirectional":
+            path = bidirectional_bfs(projection, sources, targets, max_hops, mask)
+        else:
+            path = None
+            distance, parent_edge = projection.bfs(sources, max_hops, "out", mask, stop_at=_flags(projection, targets))
+            reached = [t for t in targets if distance[t] > 0]
+            if reached:
+                nodes, edges = projection.trace(min(reached, key=lambda t: distance[t]), parent_edge)
+                path = Path(nodes, edges, float(len(edges)))
+
+        if path is None:
             return {
-                "success": True,
-                "path_found": True,
-                "source": record["source"],
-                "target": record["target"],
-                "path_length": record["path_length"],
-                "nodes": record["path_nodes"],
-                "relationships": record["path_rels"],
-                "message": f"Found path of length {record['path_length']}"
+                "success": False,
+                "message": f"No path found between '{source_name}' and '{target_name}'",
+                "path_found": False
             }
+
+        return {
+            "success": True,
+            "path_found": True,
+            **_path_payload(projection, path, weight),
+            "algorithm": algorithm,
+            "message": f"Found path of length {path.length}"
+        }
             
     except Exception as exc:
         logger.error(f"Shortest path query failed: {exc}")
@@ -126,12 +179,74 @@ def find_shortest_path(
         }
 
 
+def iter_batch_shortest_paths(
+    pairs: List[Tuple[str, str]],
+    max_hops: int = 5,
+    verified_only: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Shortest paths for many source/target pairs, yielded as they are found.
+    
+    All names are resolved in one batch, and pairs sharing a source share a
+    single BFS that runs until every one of their targets has been reached
+    (or max_hops), so a panel costs one search per distinct source rather
+    than one request per pair.
+    
+    Args:
+        pairs: (source name, target name) pairs
+        max_hops: Maximum number of relationship hops to explore
+        verified_only: Only consider verified relationships
+        
+    Yields:
+        A "resolution" record listing unresolved names, one "path" record per
+        pair (grouped by source), then a "summary" record
+    """
+    started = time.monotonic()
+    projection = graph_projection.get()
+    mask = status_mask(verified_only)
+    names = list(dict.fromkeys(name for pair in pairs for name in pair))
+    candidates = dict(zip(names, _resolve(projection, *names)))
+    yield {"record": "resolution", "unresolved": [name for name in names if not candidates[name]]}
+
+    targets_by_source: Dict[str, List[str]] = {}
+    for source_name, target_name in pairs:
+        targets_by_source.setdefault(source_name, []).append(target_name)
+
+    paths_found = 0
+    for source_name, target_names in targets_by_source.items():
+        sources = candidates[source_name]
+        targets = [t for name in target_names for t in candidates[name]]
+        distance = parent_edge = None
+        if sources and targets:
+            distance, parent_edge = projection.bfs(
+                sources, max_hops, "out", mask, stop_at=_flags(projection, targets), stop_at_all=True
+            )
+        for target_name in target_names:
+            record = {"record": "path", "source_name": source_name, "target_name": target_name, "path_found": False}
+            reached = [t for t in candidates[target_name] if distance[t] > 0] if distance is not None else []
+            if reached:
+                nodes, edges = projection.trace(min(reached, key=lambda t: distance[t]), parent_edge)
+                record["path_found"] = True
+                record.update(_path_payload(projection, Path(nodes, edges, float(len(edges)))))
+                paths_found += 1
+            yield record
+
+    yield {
+        "record": "summary",
+        "pairs": len(pairs),
+        "paths_found": paths_found,
+        "seconds": round(time.monotonic() - started, 3)
+    }
+
+
 def find_all_paths(
     source_name: str,
     target_name: str,
     max_hops: int = 5,
     max_paths: int = 10,
-    verified_only: bool = False
+    verified_only: bool = False,
+    algorithm: str = "yen",
+    weight: str = "hops"
 ) -> Dict[str, Any]:
     """
     Find all paths between two concepts (up to max_paths).
@@ -142,91 +257,53 @@ def find_all_paths(
         max_hops: Maximum number of relationship hops to explore
         max_paths: Maximum number of paths to return
         verified_only: Only consider verified relationships
+        algorithm: "yen" for loopless paths of increasing length, or
+            "all_shortest" for only the paths of minimal length
+        weight: "hops", or "confidence" to rank Yen's paths by credibility
         
     Returns:
         Dict containing all paths found
     """
-    cypher = f"""
-    MATCH (source:Entity), (target:Entity)
-    WHERE toLower(source.name) CONTAINS toLower($source_name)
-      AND toLower(target.name) CONTAINS toLower($target_name)
-    
-    MATCH path = allShortestPaths((source)-[*1..{max_hops}]->(target))
-    WHERE all(r IN relationships(path) WHERE $verified_only = false OR r.status = 'verified')
-    
-    WITH path, source, target, length(path) AS path_length,
-         [r IN relationships(path) | {{
-            id: elementId(r),
-            source: coalesce(startNode(r).id, startNode(r).name, elementId(startNode(r))),
-            target: coalesce(endNode(r).id, endNode(r).name, elementId(endNode(r))),
-            relation: type(r),
-            confidence: r.confidence,
-            significance: r.significance,
-            status: r.status,
-            polarity: coalesce(r.polarity, 'positive')
-         }}] AS path_rels,
-         CASE WHEN size(nodes(path)) = 0 THEN [] ELSE range(0, size(nodes(path)) - 1) END AS idxs
-    
-    UNWIND idxs AS idx
-    WITH path, source, target, path_length, path_rels, idx, nodes(path)[idx] AS node
-    OPTIONAL MATCH (node)-[:IS_A]->(type:Concept)
-    WITH source, target, path_length, path_rels, idx, node, collect(DISTINCT type.name) AS type_names
-    WITH source, target, path_length, path_rels,
-         collect({{
-            idx: idx,
-            id: coalesce(node.id, node.name, elementId(node)),
-            name: node.name,
-            types: CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END,
-            type: CASE WHEN size(type_names) = 0 THEN 'Concept' ELSE head(type_names) END,
-            significance: node.significance
-         }}) AS nodes_with_idx
-    WITH source, target, path_length, path_rels,
-         [n IN nodes_with_idx ORDER BY n.idx | n{{.id, .name, .types, .type, .significance}}] AS path_nodes
-    
-    RETURN 
-      source.name AS source,
-      target.name AS target,
-      path_length,
-      path_nodes,
-      path_rels
-    ORDER BY path_length ASC
-    LIMIT $max_paths
-    """
-    
     try:
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(
-                cypher,
-                source_name=source_name,
-                target_name=target_name,
-                verified_only=verified_only,
-                max_paths=max_paths
+        projection = graph_projection.get()
+        mask = status_mask(verified_only)
+        sources, targets = _resolve(projection, source_name, target_name)
+
+        paths = []
+        if algorithm == "yen":
+            costs = edge_costs(projection, weight)
+            # Alternatives branch off the best-connected source candidate
+            best = (
+                cheapest_path(projection, sources, targets, costs, max_hops, mask) if costs is not None
+                else bidirectional_bfs(projection, sources, targets, max_hops, mask)
             )
+            if best is not None:
+                found = k_shortest_paths(projection, best.nodes[0], targets, max_paths, max_hops, mask, costs)
+                paths = [_path_payload(projection, path, weight) for path in found]
+        else:
+            distance, _ = projection.bfs(sources, max_hops, "out", mask)
+            reached = sorted((t for t in targets if distance[t] > 0), key=lambda t: distance[t])
+            for target in reached:
+                for nodes, edges in _shortest_paths_to(projection, target, distance, mask, max_paths - len(paths)):
+                    paths.append(_path_payload(projection, Path(nodes, edges, float(len(edges))), weight))
+                if len(paths) >= max_paths:
+                    break
             
-            paths = []
-            for record in result:
-                paths.append({
-                    "source": record["source"],
-                    "target": record["target"],
-                    "path_length": record["path_length"],
-                    "nodes": record["path_nodes"],
-                    "relationships": record["path_rels"]
-                })
-            
-            if not paths:
-                return {
-                    "success": False,
-                    "message": f"No paths found between '{source_name}' and '{target_name}'",
-                    "paths_found": 0,
-                    "paths": []
-                }
-            
+        if not paths:
             return {
-                "success": True,
-                "paths_found": len(paths),
-                "paths": paths,
-                "message": f"Found {len(paths)} path(s)"
+                "success": False,
+                "message": f"No paths found between '{source_name}' and '{target_name}'",
+                "paths_found": 0,
+                "paths": []
             }
+        
+        return {
+            "success": True,
+            "paths_found": len(paths),
+            "paths": paths,
+            "algorithm": algorithm,
+            "message": f"Found {len(paths)} path(s)"
+        }
             
     except Exception as exc:
         logger.error(f"All paths query failed: {exc}")
@@ -237,6 +314,68 @@ def find_all_paths(
         }
 
 
+def find_most_credible_path(
+    source_name: str,
+    target_name: str,
+    max_hops: Optional[int] = None,
+    verified_only: bool = False,
+    cost_model: Optional[CostModel] = None
+) -> Dict[str, Any]:
+    """
+    Find the path between two concepts that is best supported by evidence.
+    
+    Edge costs come from confidence, review status, significance and the
+    number of supporting documents (see ``CostModel``); the path with the
+    lowest total cost wins regardless of how many hops it takes.
+    
+    Args:
+        source_name: Name of the source concept
+        target_name: Name of the target concept
+        max_hops: Optional limit on path length
+        verified_only: Only consider verified relationships
+        cost_model: How evidence maps to edge cost (defaults apply if omitted)
+        
+    Returns:
+        Dict containing the path, its total cost and per-relationship costs
+    """
+    try:
+        projection = graph_projection.get()
+        model = cost_model or CostModel()
+        mask = model.mask(status_mask(verified_only))
+        sources, targets = _resolve(projection, source_name, target_name)
+        costs = model.costs(projection)
+        if max_hops is None:
+            path = most_credible_path(projection, sources, targets, costs, mask)
+        else:
+            path = cheapest_path(projection, sources, targets, costs, max_hops, mask)
+
+        if path is None:
+            return {
+                "success": False,
+                "message": f"No path found between '{source_name}' and '{target_name}'",
+                "path_found": False
+            }
+
+        payload = _path_payload(projection, path, "credibility")
+        for relationship, edge in zip(payload["relationships"], path.edges):
+            relationship["cost"] = round(float(costs[edge]), 6)
+        return {
+            "success": True,
+            "path_found": True,
+            **payload,
+            "cost_model": asdict(model),
+            "message": f"Found path of length {path.length} with cost {path.cost:.3f}"
+        }
+
+    except Exception as exc:
+        logger.error(f"Most credible path query failed: {exc}")
+        return {
+            "success": False,
+            "error": str(exc),
+            "message": "Failed to find most credible path"
+        }
+
+
 def find_connecting_concepts(
     source_name: str,
     target_name: str,
@@ -256,53 +395,31 @@ def find_connecting_concepts(
     Returns:
         Dict containing connecting concepts and their relationships
     """
-    cypher = f"""
-    MATCH (source:Entity), (target:Entity)
-    WHERE toLower(source.name) CONTAINS toLower($source_name)
-      AND toLower(target.name) CONTAINS toLower($target_name)
-    
-    // Find concepts that connect both
-    MATCH path1 = (source)-[*1..{max_hops}]->(connector:Entity)
-    MATCH path2 = (connector)-[*1..{max_hops}]->(target)
-    WHERE connector <> source AND connector <> target
-    
-    WITH connector, length(path1) + length(path2) AS total_hops
-    ORDER BY total_hops ASC
-    LIMIT 20
-    
-    OPTIONAL MATCH (connector)-[:EXTRACTED_FROM]->(doc:Document)
-    WITH connector, total_hops, collect({id: doc.document_id, title: coalesce(doc.title, doc.document_id)}) AS sources
-    OPTIONAL MATCH (connector)-[:IS_A]->(type:Concept)
-    WITH connector, total_hops, sources, collect(DISTINCT type.name) AS type_names
-    
-    RETURN {{
-      id: coalesce(connector.id, connector.name, elementId(connector)),
-      name: connector.name,
-      types: CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END,
-      type: CASE WHEN size(type_names) = 0 THEN 'Concept' ELSE head(type_names) END,
-      significance: connector.significance,
-      sources: sources,
-      hops: total_hops
-    }} AS connector
-    ORDER BY total_hops ASC
-    """
-    
     try:
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(
-                cypher,
-                source_name=source_name,
-                target_name=target_name
-            )
-            
-            connectors = [record["connector"] for record in result]
+        projection = graph_projection.get()
+        sources, targets = _resolve(projection, source_name, target_name)
+        # Hops from the sources forwards and from the targets backwards
+        from_source, _ = projection.bfs(sources, max_hops, "out")
+        to_target, _ = projection.bfs(targets, max_hops, "in")
+        candidates = np.flatnonzero((from_source > 0) & (to_target > 0))
+        total_hops = from_source[candidates] + to_target[candidates]
+        order = np.lexsort((-projection.node_significance[candidates], total_hops))[:MAX_CONNECTORS]
+        connector_nodes = candidates[order]
+
+        sources_by_id = _node_sources([projection.node_ids[i] for i in connector_nodes])
+        connectors = []
+        for i, hops in zip(connector_nodes, total_hops[order]):
+            connector = projection.node(int(i))
+            connector["sources"] = sources_by_id.get(connector["id"], [])
+            connector["hops"] = int(hops)
+            connectors.append(connector)
             
-            return {
-                "success": True,
-                "connectors_found": len(connectors),
-                "connectors": connectors,
-                "message": f"Found {len(connectors)} connecting concept(s)"
-            }
+        return {
+            "success": True,
+            "connectors_found": len(connectors),
+            "connectors": connectors,
+            "message": f"Found {len(connectors)} connecting concept(s)"
+        }
             
     except Exception as exc:
         logger.error(f"Connecting concepts query failed: {exc}")
@@ -331,73 +448,47 @@ def explore_multi_hop(
     Returns:
         Dict containing multi-hop exploration results
     """
-    status_filter = "AND r.status = 'verified'" if verified_only else ""
-    
-    cypher = f"""
-    MATCH (center:Entity)
-    WHERE toLower(center.name) CONTAINS toLower($concept_name)
-    
-    // Variable-length path
-    MATCH path = (center)-[*1..{hops}]-(related:Entity)
-    WHERE all(r IN relationships(path) WHERE $verified_only = false OR r.status = 'verified')
-    
-    WITH DISTINCT related, length(path) AS hop_distance, center
-    ORDER BY hop_distance ASC, related.significance DESC
-    
-    WITH center, hop_distance, collect(DISTINCT related)[0..{limit_per_hop}] AS entities_at_hop
-    
-    UNWIND entities_at_hop AS entity
-    
-    OPTIONAL MATCH (entity)-[:EXTRACTED_FROM]->(doc:Document)
-    
-    WITH center, hop_distance, entity, collect({{id: doc.document_id, title: coalesce(doc.title, doc.document_id)}}) AS sources
-    OPTIONAL MATCH (entity)-[:IS_A]->(type:Concept)
-    WITH center, hop_distance, entity, sources, collect(DISTINCT type.name) AS type_names
-    
-    RETURN 
-      center.name AS center_concept,
-      hop_distance,
-      collect({{
-        id: coalesce(entity.id, entity.name, elementId(entity)),
-        name: entity.name,
-        types: CASE WHEN size(type_names) = 0 THEN ['Concept'] ELSE type_names END,
-        type: CASE WHEN size(type_names) = 0 THEN 'Concept' ELSE head(type_names) END,
-        significance: entity.significance,
-        sources: sources
-      }}) AS entities
-    ORDER BY hop_distance ASC
-    """
-    
     try:
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(
-                cypher,
-                concept_name=concept_name,
-                verified_only=verified_only
-            )
-            
-            exploration_data = []
-            for record in result:
-                exploration_data.append({
-                    "hop_distance": record["hop_distance"],
-                    "entities": record["entities"],
-                    "entity_count": len(record["entities"])
-                })
-            
-            if not exploration_data:
-                return {
-                    "success": False,
-                    "message": f"No entities found connected to '{concept_name}'",
-                    "exploration_data": []
-                }
+        projection = graph_projection.get()
+        centers = _resolve(projection, concept_name)[0]
+        distance, _ = projection.bfs(centers, hops, "both", status_mask(verified_only))
+
+        levels: List[Tuple[int, np.ndarray]] = []
+        for hop in range(1, hops + 1):
+            at_hop = np.flatnonzero(distance == hop)
+            if len(at_hop) == 0:
+                continue
+            top = np.argsort(-projection.node_significance[at_hop], kind="stable")[:limit_per_hop]
+            levels.append((hop, at_hop[top]))
+
+        sources_by_id = _node_sources([projection.node_ids[i] for _, nodes in levels for i in nodes])
+        exploration_data = []
+        for hop, nodes in levels:
+            entities = []
+            for i in nodes:
+                entity = projection.node(int(i))
+                entity["sources"] = sources_by_id.get(entity["id"], [])
+                entities.append(entity)
+            exploration_data.append({
+                "hop_distance": hop,
+                "entities": entities,
+                "entity_count": len(entities)
+            })
             
+        if not exploration_data:
             return {
-                "success": True,
-                "center_concept": exploration_data[0]["hop_distance"] if exploration_data else concept_name,
-                "exploration_data": exploration_data,
-                "total_hops": len(exploration_data),
-                "message": f"Explored {len(exploration_data)} hop level(s)"
+                "success": False,
+                "message": f"No entities found connected to '{concept_name}'",
+                "exploration_data": []
             }
+        
+        return {
+            "success": True,
+            "center_concept": projection.node_ids[centers[0]],
+            "exploration_data": exploration_data,
+            "total_hops": len(exploration_data),
+            "message": f"Explored {len(exploration_data)} hop level(s)"
+        }
             
     except Exception as exc:
         logger.error(f"Multi-hop exploration failed: {exc}")
@@ -452,13 +543,14 @@ def pattern_query(
         if high_confidence:
             where_clauses.append("r.confidence >= 0.8")
         
+        resolved = resolve_names([name for name in (node1_name, node2_name) if name])
         if node1_name:
-            where_clauses.append("toLower(n1.name) CONTAINS toLower($node1_name)")
-            params["node1_name"] = node1_name
+            where_clauses.append("n1.name IN $node1_names")
+            params["node1_names"] = resolved[node1_name]
         
         if node2_name:
-            where_clauses.append("toLower(n2.name) CONTAINS toLower($node2_name)")
-            params["node2_name"] = node2_name
+            where_clauses.append("n2.name IN $node2_names")
+            params["node2_names"] = resolved[node2_name]
         
         # Build node patterns
         n1_pattern = "n1:Entity"
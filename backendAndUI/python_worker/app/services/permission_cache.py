@@ -0,0 +1,137 @@
+"""Cache of workspace access checks.
+
+Every protected workspace request resolves the caller's membership (role and
+permissions) and the workspace's privacy; ingestion also needs the
+workspace's metadata. Both are cached:
+
+* per process, for ``permission_cache_local_ttl_seconds``, which absorbs the
+  bursts of identical checks a single page load makes;
+* in Redis, for ``permission_cache_ttl_seconds``, shared by all API replicas.
+  Each workspace is one hash (field per user, plus the metadata), so
+  invalidating a workspace is a single ``DEL``.
+
+Membership and workspace changes call ``invalidate``; entries written by other
+replicas expire within the TTLs regardless. Redis errors fall back to the
+database and pause Redis use for ``REDIS_RETRY_SECONDS``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "workspace_access:"
+METADATA_FIELD = "__metadata__"
+REDIS_RETRY_SECONDS = 30
+LOCAL_MAX_ENTRIES = 10000
+
+
+class PermissionCache:
+    """Two-level (process, Redis) cache of workspace access entries."""
+
+    def __init__(self) -> None:
+        self._local: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._redis_paused_until = 0.0
+
+    def _redis(self):
+        if not settings.permission_cache_redis or time.monotonic() < self._redis_paused_until:
+            return None
+        try:
+            from .job_tracker import redis_client
+            return redis_client
+        except Exception as exc:
+            self._pause_redis(exc)
+            return None
+
+    def _pause_redis(self, exc: Exception) -> None:
+        logger.warning(f"Permission cache Redis unavailable, using the database for {REDIS_RETRY_SECONDS}s: {exc}")
+        self._redis_paused_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def _get(self, workspace_id: str, field: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._local.get((workspace_id, field))
+        if entry and now - entry[0] < settings.permission_cache_local_ttl_seconds:
+            return entry[1]
+
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            raw = client.hget(KEY_PREFIX + workspace_id, field)
+        except Exception as exc:
+            self._pause_redis(exc)
+            return None
+        if not raw:
+            return None
+        cached_at, value = json.loads(raw)
+        if now - cached_at >= settings.permission_cache_ttl_seconds:
+            return None
+        with self._lock:
+            self._local[(workspace_id, field)] = (now, value)
+        return value
+
+    def _set(self, workspace_id: str, field: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._local) >= LOCAL_MAX_ENTRIES:
+                ttl = settings.permission_cache_local_ttl_seconds
+                self._local = {k: v for k, v in self._local.items() if now - v[0] < ttl}
+            self._local[(workspace_id, field)] = (now, value)
+
+        client = self._redis()
+        if client is None:
+            return
+        key = KEY_PREFIX + workspace_id
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(key, field, json.dumps([now, value]))
+            pipe.expire(key, settings.permission_cache_ttl_seconds)
+            pipe.execute()
+        except Exception as exc:
+            self._pause_redis(exc)
+
+    def get_access(self, workspace_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Cached ``{exists, privacy, role, permissions}`` of a user in a workspace, or None on a miss."""
+        return self._get(workspace_id, f"user:{user_id}")
+
+    def set_access(self, workspace_id: str, user_id: str, access: Dict[str, Any]) -> None:
+        self._set(workspace_id, f"user:{user_id}", access)
+
+    def get_metadata(self, workspace_id: str) -> Optional[Dict[str, Any]]:
+        return self._get(workspace_id, METADATA_FIELD)
+
+    def set_metadata(self, workspace_id: str, metadata: Dict[str, Any]) -> None:
+        self._set(workspace_id, METADATA_FIELD, metadata)
+
+    def invalidate(self, workspace_id: str, user_id: Optional[str] = None) -> None:
+        """Drop one user's entry (and the metadata), or every entry of the workspace."""
+        with self._lock:
+            if user_id is None:
+                for key in [k for k in self._local if k[0] == workspace_id]:
+                    del self._local[key]
+            else:
+                self._local.pop((workspace_id, f"user:{user_id}"), None)
+                self._local.pop((workspace_id, METADATA_FIELD), None)
+
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            if user_id is None:
+                client.delete(KEY_PREFIX + workspace_id)
+            else:
+                client.hdel(KEY_PREFIX + workspace_id, f"user:{user_id}", METADATA_FIELD)
+        except Exception as exc:
+            self._pause_redis(exc)
+
+
+permission_cache = PermissionCache()
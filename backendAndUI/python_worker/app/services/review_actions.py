@@ -0,0 +1,209 @@
+"""Bulk review actions.
+
+Curators confirm or flag many relationships at once. Explicit items are applied
+with one ``UNWIND`` query per batch of ``BULK_BATCH_SIZE`` items, each batch in
+its own transaction, and every item reports its outcome. Filter-based actions
+("confirm every unverified INHIBITS relation above 0.9 confidence") run
+server-side as one query over the review queue index, committing every
+``BULK_BATCH_SIZE`` rows, so no ids travel to the client and back.
+Either way the graph version is bumped once per request, and the review
+counters move with each status change in the same transaction.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from .graph_version import MARK_SOURCE_CHANGED_CYPHER, bump_graph_version
+from .neo4j_client import neo4j_client
+from .review_queue import REVIEW_ITEM_SYNC_CYPHER, REVIEW_PRIORITY, WORKSPACE_FILTER, ensure_review_schema
+from .stats_counters import STATUS_COUNTER_PARAMS, STATUS_COUNTERS_CYPHER
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+ACTION_STATUS = {"confirm": "verified", "edit": "verified", "flag": "incorrect"}
+
+REVIEW_SET = """
+SET r.status = CASE item.action WHEN 'flag' THEN 'incorrect' ELSE 'verified' END,
+    r.reviewed_at = datetime(),
+    r.reviewed_by = $reviewer_id,
+    r.reviewed_by_first_name = $reviewer_first_name,
+    r.reviewed_by_last_name = $reviewer_last_name,
+    r.flag_reason = CASE WHEN item.action = 'flag' THEN coalesce(item.reason, '') ELSE r.flag_reason END,
+    r.confidence = coalesce(item.confidence, r.confidence),
+    r.original_text = coalesce(item.original_text, r.original_text)
+""" + MARK_SOURCE_CHANGED_CYPHER + "\n"
+
+APPLY_ITEMS_CYPHER = f"""
+UNWIND $items AS item
+MATCH ()-[r]->()
+WHERE elementId(r) = item.relationship_id
+WITH item, r, coalesce(r.status, 'unverified') AS old_status
+{REVIEW_SET}
+SET r.review_priority = {REVIEW_PRIORITY}
+{REVIEW_ITEM_SYNC_CYPHER}
+{STATUS_COUNTERS_CYPHER}
+RETURN item.relationship_id AS relationship_id, r.status AS status
+"""
+
+MATCHING_CYPHER = """
+MATCH (review:ReviewItem)
+WHERE review.status = $from_status
+  AND review.review_priority >= $min_priority
+  {type_filter}
+MATCH (s)-[r]->(o)
+WHERE elementId(r) = review.relationship_id
+  AND r.status = $from_status
+  AND coalesce(r.confidence, 0.0) >= $min_confidence
+  AND coalesce(r.confidence, 0.0) <= $max_confidence
+  AND s:Entity AND o:Entity
+  {workspace_filter}
+{limit}
+CALL {{
+    WITH r
+    WITH r, $item AS item, r.status AS old_status
+    {review_set}
+    {review_item}
+    {status_counters}
+}} IN TRANSACTIONS OF $batch ROWS
+RETURN type(r) AS rel_type, count(*) AS updated
+"""
+
+
+def _reviewer_params(reviewer: Dict[str, Optional[str]]) -> Dict[str, str]:
+    return {
+        "reviewer_id": reviewer.get("reviewer_id") or "system",
+        "reviewer_first_name": reviewer.get("reviewer_first_name") or "",
+        "reviewer_last_name": reviewer.get("reviewer_last_name") or "",
+    }
+
+
+def apply_review_actions(
+    items: List[Dict[str, Any]],
+    reviewer: Dict[str, Optional[str]],
+    batch_size: int = BULK_BATCH_SIZE,
+    bump_version: bool = True,
+) -> Dict[str, Any]:
+    """
+    Apply confirm/edit/flag actions to explicit relationships.
+
+    Args:
+        items: Dicts with relationship_id, action and optional reason, confidence, original_text
+        reviewer: reviewer_id, reviewer_first_name and reviewer_last_name
+        batch_size: Items per transaction
+        bump_version: Bump the graph version if anything changed (off when the caller bumps)
+
+    Returns:
+        Dict with one outcome per item (in input order) and summary counts
+    """
+    params = _reviewer_params(reviewer)
+    applied: Dict[str, str] = {}
+    failed: Dict[str, str] = {}
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            try:
+                records = session.execute_write(
+                    lambda tx: [dict(r) for r in tx.run(APPLY_ITEMS_CYPHER, items=batch, **params, **STATUS_COUNTER_PARAMS)]
+                )
+                applied.update({r["relationship_id"]: r["status"] for r in records})
+            except Exception as exc:
+                logger.warning(f"Bulk review batch at {start} failed: {exc}")
+                failed.update({item["relationship_id"]: str(exc) for item in batch})
+
+    if applied and bump_version:
+        bump_graph_version(structural=False)
+
+    outcomes = []
+    for item in items:
+        relationship_id = item["relationship_id"]
+        if relationship_id in applied:
+            outcomes.append({"relationship_id": relationship_id, "action": item["action"], "outcome": "applied", "new_status": applied[relationship_id]})
+        elif relationship_id in failed:
+            outcomes.append({"relationship_id": relationship_id, "action": item["action"], "outcome": "failed", "error": failed[relationship_id]})
+        else:
+            outcomes.append({"relationship_id": relationship_id, "action": item["action"], "outcome": "not_found"})
+    return {
+        "results": outcomes,
+        "applied": sum(1 for o in outcomes if o["outcome"] == "applied"),
+        "not_found": sum(1 for o in outcomes if o["outcome"] == "not_found"),
+        "failed": sum(1 for o in outcomes if o["outcome"] == "failed"),
+    }
+
+
+def apply_review_to_matching(
+    action: str,
+    reviewer: Dict[str, Optional[str]],
+    from_status: str = "unverified",
+    predicates: Optional[List[str]] = None,
+    min_confidence: float = 0.0,
+    max_confidence: float = 1.0,
+    min_priority: float = 0.0,
+    workspace_id: Optional[str] = None,
+    reason: Optional[str] = None,
+    limit: Optional[int] = None,
+    batch_size: int = BULK_BATCH_SIZE,
+    bump_version: bool = True,
+) -> Dict[str, Any]:
+    """
+    Confirm or flag every relationship matching a filter, without listing ids.
+
+    Args:
+        action: confirm or flag
+        reviewer: reviewer_id, reviewer_first_name and reviewer_last_name
+        from_status: Only relationships currently in this status
+        predicates: Only these relationship types (default: every reviewable type)
+        min_confidence: Lowest extraction confidence included
+        max_confidence: Highest extraction confidence included
+        min_priority: Lowest review_priority included
+        workspace_id: Only relationships with a source in this workspace
+        reason: Flag reason (flag only)
+        limit: Maximum number of relationships changed
+        batch_size: Rows per committed transaction
+        bump_version: Bump the graph version if anything changed (off when the caller bumps)
+
+    Returns:
+        Dict with the number of relationships updated per relationship type
+    """
+    if action not in ("confirm", "flag"):
+        raise ValueError(f"Unsupported action for a filter: {action}")
+    ensure_review_schema()
+    params: Dict[str, Any] = {
+        **_reviewer_params(reviewer),
+        "from_status": from_status,
+        "min_confidence": min_confidence,
+        "max_confidence": max_confidence,
+        "min_priority": min_priority,
+        "item": {"action": action, "reason": reason},
+        "batch": batch_size,
+        **STATUS_COUNTER_PARAMS,
+    }
+    if workspace_id:
+        params["workspace_id"] = workspace_id
+    if predicates:
+        params["predicates"] = list(predicates)
+
+    cypher = MATCHING_CYPHER.format(
+        type_filter="AND review.type IN $predicates" if predicates else "",
+        workspace_filter=WORKSPACE_FILTER if workspace_id else "",
+        limit="WITH r LIMIT $limit" if limit is not None else "",
+        review_set=REVIEW_SET,
+        review_item=REVIEW_ITEM_SYNC_CYPHER,
+        status_counters=STATUS_COUNTERS_CYPHER,
+    )
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        updated = {r["rel_type"]: r["updated"] for r in session.run(cypher, limit=limit, **params)}
+
+    total = sum(updated.values())
+    if total and bump_version:
+        bump_graph_version(structural=False)
+    logger.info(f"Bulk {action} by filter updated {total} relationships")
+    return {
+        "action": action,
+        "new_status": ACTION_STATUS[action],
+        "updated": total,
+        "by_predicate": updated,
+    }
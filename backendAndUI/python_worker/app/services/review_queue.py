@@ -0,0 +1,293 @@
+"""Index-ordered review queue.
+
+Extracted relationships carry a non-null ``status`` and a precomputed
+``review_priority`` (see ``REVIEW_PRIORITY``): significant claims that many
+documents rely on and that were extracted with low confidence come first.
+
+Neo4j relationship property indexes are per relationship type, and every
+predicate is its own type, so the queue is not indexed on the relationships
+themselves. Instead each reviewable relationship has a
+``(:ReviewItem {relationship_id, type, status, review_priority})`` node, kept
+in step by every write that sets those properties (``REVIEW_ITEM_SYNC_CYPHER``).
+One composite ``(status, review_priority)`` index over those nodes serves the
+whole queue, however many predicates there are. Items whose relationship no
+longer exists (merged or deleted) are skipped when read and removed by
+``prune_review_items``.
+
+Pages are addressed by an opaque cursor holding the last row's priority and
+relationship id, so reading deep into the queue costs the same as the first
+page. ``backfill_review_priority`` fills in both properties and the review
+items for data written before they existed.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .graph_export import STRUCTURAL_REL_TYPES
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Relationship types that are never review items
+NON_REVIEW_REL_TYPES = set(STRUCTURAL_REL_TYPES) | {
+    "IS_A", "ABOUT_SUBJECT", "ABOUT_OBJECT", "FROM_DOCUMENT", "CREATED_BY", "COMMUNITY_LINK",
+}
+BACKFILL_BATCH_SIZE = 10000
+# Per-type indexes of the previous queue layout, dropped by the backfill
+LEGACY_INDEX_PREFIX = "review_queue_"
+
+# Cypher expression for a relationship ``r``: significance (1-5) scaled by
+# evidence breadth, weighted towards uncertain extractions
+REVIEW_PRIORITY = (
+    "round(coalesce(r.significance, 3) / 5.0"
+    " * (1.0 + log(toFloat(size(coalesce(r.sources, [])) + 1)))"
+    " * (1.5 - coalesce(r.confidence, 0.5)), 6)"
+)
+
+# Upserts the review item of a relationship ``r`` after its status or priority was set
+REVIEW_ITEM_SYNC_CYPHER = """
+MERGE (review_item:ReviewItem {relationship_id: elementId(r)})
+SET review_item.type = type(r),
+    review_item.status = r.status,
+    review_item.review_priority = r.review_priority
+"""
+
+REVIEW_SCHEMA_CYPHER = [
+    "CREATE CONSTRAINT review_item_relationship_unique IF NOT EXISTS "
+    "FOR (i:ReviewItem) REQUIRE i.relationship_id IS UNIQUE",
+    "CREATE INDEX review_item_queue IF NOT EXISTS FOR (i:ReviewItem) ON (i.status, i.review_priority)",
+]
+
+PRUNE_ITEMS_CYPHER = """
+MATCH (item:ReviewItem)
+WHERE NOT EXISTS { MATCH ()-[r]->() WHERE elementId(r) = item.relationship_id }
+CALL {
+    WITH item
+    DELETE item
+} IN TRANSACTIONS OF $batch ROWS
+RETURN count(*) AS deleted
+"""
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def quote_rel_type(rel_type: str) -> str:
+    """Backtick-quote a relationship type for use in a Cypher pattern."""
+    return "`" + rel_type.replace("`", "``") + "`"
+
+
+def ensure_review_schema() -> None:
+    """Create the review item constraint and queue index, once per process."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+            for cypher in REVIEW_SCHEMA_CYPHER:
+                session.run(cypher).consume()
+        _schema_ready = True
+
+
+def review_rel_types() -> List[str]:
+    """Relationship types in the database that hold review items."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        types = [r["relationshipType"] for r in session.run("CALL db.relationshipTypes() YIELD relationshipType")]
+    return sorted(t for t in types if t not in NON_REVIEW_REL_TYPES)
+
+
+def encode_cursor(priority: float, relationship_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([priority, relationship_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Inverse of ``encode_cursor``; raises ValueError for a malformed cursor."""
+    try:
+        priority, relationship_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(priority), str(relationship_id)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {cursor}") from exc
+
+
+WORKSPACE_FILTER = """
+AND (
+    r.sources IS NULL
+    OR size(coalesce(r.sources, [])) = 0
+    OR EXISTS {
+        MATCH (d:Document)-[:IN_WORKSPACE]->(:Workspace {workspace_id: $workspace_id})
+        WHERE d.document_id IN r.sources
+    }
+)
+"""
+
+CURSOR_FILTER = """
+AND r.review_priority <= $after_priority
+AND (r.review_priority < $after_priority OR elementId(r) > $after_id)
+"""
+
+ITEM_CURSOR_FILTER = """
+AND item.review_priority <= $after_priority
+AND (item.review_priority < $after_priority OR item.relationship_id > $after_id)
+"""
+
+ITEM_PROJECTION = """
+WITH s, r, o, type(r) AS rel_type
+OPTIONAL MATCH (d:Document) WHERE d.document_id IN r.sources
+WITH s, r, o, rel_type, collect(DISTINCT {id: d.document_id, title: coalesce(d.title, d.document_id)}) AS docs
+CALL {
+    WITH s
+    OPTIONAL MATCH (s)-[:IS_A]->(stype:Concept)
+    RETURN CASE WHEN count(stype) = 0 THEN ['Concept'] ELSE collect(DISTINCT stype.name) END AS subject_types
+}
+CALL {
+    WITH o
+    OPTIONAL MATCH (o)-[:IS_A]->(otype:Concept)
+    RETURN CASE WHEN count(otype) = 0 THEN ['Concept'] ELSE collect(DISTINCT otype.name) END AS object_types
+}
+RETURN
+    elementId(r) AS relationship_id,
+    s.name AS subject,
+    subject_types AS subject_types,
+    head(subject_types) AS subject_type,
+    rel_type AS predicate,
+    o.name AS object,
+    object_types AS object_types,
+    head(object_types) AS object_type,
+    coalesce(r.confidence, 0.0) AS confidence,
+    coalesce(r.original_text, '') AS original_text,
+    coalesce(r.sources, []) AS sources,
+    r.status AS status,
+    r.review_priority AS review_priority,
+    r.created_at AS created_at,
+    coalesce(r.flag_reason, '') AS flag_reason,
+    docs AS documents
+ORDER BY review_priority DESC, relationship_id
+"""
+
+
+def _queue_cypher(item_filters: str, filters: str) -> str:
+    # Items come off the (status, review_priority) index in order; the
+    # relationship's own status is checked too, in case the item lags behind
+    return f"""
+    MATCH (item:ReviewItem)
+    WHERE item.status = $status AND item.review_priority IS NOT NULL
+    {item_filters}
+    MATCH (s)-[r]->(o)
+    WHERE elementId(r) = item.relationship_id AND r.status = $status
+    {filters}
+    AND s:Entity AND o:Entity
+    WITH s, r, o ORDER BY item.review_priority DESC, item.relationship_id LIMIT $limit
+    """ + ITEM_PROJECTION
+
+
+def _node_queue_cypher(filters: str) -> str:
+    return f"""
+    CALL {{
+        MATCH (n:Entity) WHERE n.name IN $node_ids RETURN n
+        UNION
+        MATCH (n:Entity) WHERE elementId(n) IN $node_ids RETURN n
+    }}
+    MATCH (n)-[r]-(:Entity)
+    WHERE r.status = $status AND r.review_priority IS NOT NULL AND NOT type(r) IN $excluded_types
+    {filters}
+    WITH DISTINCT r
+    MATCH (s)-[r]->(o)
+    WITH s, r, o ORDER BY r.review_priority DESC, elementId(r) LIMIT $limit
+    """ + ITEM_PROJECTION
+
+
+def fetch_review_queue(
+    status: str = "unverified",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    node_ids: Optional[List[str]] = None,
+    workspace_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    One page of review items, highest ``review_priority`` first.
+
+    Args:
+        status: Review status to list (unverified, verified, incorrect)
+        limit: Page size
+        cursor: ``next_cursor`` of the previous page
+        node_ids: Only relationships touching these entities (names or element ids)
+        workspace_id: Only relationships with a source in this workspace
+
+    Returns:
+        Dict with the page's records and the cursor of the next page (None on the last page)
+    """
+    params: Dict[str, Any] = {"status": status, "limit": limit}
+    filters = ""
+    if workspace_id:
+        params["workspace_id"] = workspace_id
+        filters += WORKSPACE_FILTER
+    if cursor:
+        params["after_priority"], params["after_id"] = decode_cursor(cursor)
+
+    if node_ids:
+        params.update(node_ids=node_ids, excluded_types=sorted(NON_REVIEW_REL_TYPES))
+        cypher = _node_queue_cypher(filters + (CURSOR_FILTER if cursor else ""))
+    else:
+        ensure_review_schema()
+        cypher = _queue_cypher(ITEM_CURSOR_FILTER if cursor else "", filters)
+
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        records = [dict(r) for r in session.run(cypher, **params)]
+    next_cursor = None
+    if len(records) == limit:
+        last = records[-1]
+        next_cursor = encode_cursor(last["review_priority"], last["relationship_id"])
+    return {"records": records, "next_cursor": next_cursor}
+
+
+def prune_review_items(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Delete review items whose relationship no longer exists; returns the count."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        deleted = session.run(PRUNE_ITEMS_CYPHER, batch=batch_size).single()["deleted"]
+    if deleted:
+        logger.info(f"Pruned {deleted} orphaned review items")
+    return deleted
+
+
+def backfill_review_priority(batch_size: int = BACKFILL_BATCH_SIZE) -> Dict[str, int]:
+    """Set ``status``, ``review_priority`` and the review item of every reviewable relationship.
+
+    Also drops the per-type indexes of the previous queue layout and prunes
+    orphaned items. Returns counts per relationship type.
+    """
+    ensure_review_schema()
+    updated: Dict[str, int] = {}
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        legacy = [
+            r["name"]
+            for r in session.run("SHOW INDEXES YIELD name WHERE name STARTS WITH $prefix RETURN name", prefix=LEGACY_INDEX_PREFIX)
+        ]
+        for name in legacy:
+            session.run(f"DROP INDEX {name} IF EXISTS").consume()
+        for rel_type in review_rel_types():
+            record = session.run(
+                f"""
+                MATCH ()-[r:{quote_rel_type(rel_type)}]->()
+                CALL {{
+                    WITH r
+                    SET r.status = coalesce(r.status, 'unverified')
+                    SET r.review_priority = {REVIEW_PRIORITY}
+                    {REVIEW_ITEM_SYNC_CYPHER}
+                }} IN TRANSACTIONS OF $batch ROWS
+                RETURN count(*) AS updated
+                """,
+                batch=batch_size,
+            ).single()
+            if record and record["updated"]:
+                updated[rel_type] = record["updated"]
+    prune_review_items(batch_size)
+    logger.info(f"Backfilled review priority on {sum(updated.values())} relationships")
+    return updated
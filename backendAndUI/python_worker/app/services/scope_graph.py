@@ -0,0 +1,77 @@
+"""Load a workspace's (or the global) entity graph as NumPy edge arrays.
+
+Shared by the offline graph jobs (layout, community detection) that work on
+the whole graph of a scope at once.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .graph_export import STRUCTURAL_REL_TYPES
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+WORKSPACE_NODES_CYPHER = """
+MATCH (:Workspace {workspace_id: $workspace_id})<-[:BELONGS_TO]-(:Document)<-[:EXTRACTED_FROM]-(e:Entity)
+WITH collect(DISTINCT e) AS entities
+CALL {
+  WITH entities
+  UNWIND entities AS e
+  UNWIND coalesce(e.ancestor_keys, []) AS ancestor_key
+  MATCH (ancestor:Entity {name: ancestor_key})
+  WHERE ancestor:Concept
+  RETURN collect(DISTINCT ancestor) AS ancestors
+}
+WITH entities + ancestors AS members
+UNWIND members AS n
+RETURN DISTINCT coalesce(n.id, n.name, elementId(n)) AS id, coalesce(n.significance, 0) AS significance
+"""
+
+GLOBAL_NODES_CYPHER = """
+MATCH (n:Concept)
+WHERE NOT EXISTS {
+  MATCH (n)-[:EXTRACTED_FROM]->(:Document)-[:BELONGS_TO]->(:Workspace {privacy: 'private'})
+}
+RETURN coalesce(n.id, n.name, elementId(n)) AS id, coalesce(n.significance, 0) AS significance
+"""
+
+EDGES_CYPHER = """
+MATCH (s:Concept)-[r]->(t:Concept)
+WHERE NOT type(r) IN $excluded_types
+  AND coalesce(s.id, s.name, elementId(s)) IN $node_ids
+  AND coalesce(t.id, t.name, elementId(t)) IN $node_ids
+RETURN coalesce(s.id, s.name, elementId(s)) AS source, coalesce(t.id, t.name, elementId(t)) AS target
+"""
+
+
+def load_scope_graph(
+    workspace_id: Optional[str] = None,
+    exclude_rel_types: Sequence[str] = (),
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Return (node_ids, significance, src, dst) for the nodes and edges in scope.
+
+    The scope matches ``/query/all``: entities extracted from the workspace's
+    documents plus their IS_A ancestors, or every non-private node globally.
+    """
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        if workspace_id:
+            rows = list(session.run(WORKSPACE_NODES_CYPHER, workspace_id=workspace_id))
+        else:
+            rows = list(session.run(GLOBAL_NODES_CYPHER))
+        node_ids = [r["id"] for r in rows]
+        significance = np.array([float(r["significance"] or 0) for r in rows], dtype=np.float32)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        src: List[int] = []
+        dst: List[int] = []
+        result = session.run(
+            EDGES_CYPHER,
+            node_ids=node_ids,
+            excluded_types=list(STRUCTURAL_REL_TYPES) + list(exclude_rel_types),
+        )
+        for r in result:
+            src.append(index[r["source"]])
+            dst.append(index[r["target"]])
+    return node_ids, significance, np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
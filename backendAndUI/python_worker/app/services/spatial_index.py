@@ -0,0 +1,225 @@
+"""Grid spatial index over persisted layouts for viewport queries.
+
+Each scope's layout (see ``graph_layout``) is bucketed into a uniform grid
+whose cells hold roughly ``TARGET_NODES_PER_CELL`` nodes. Node indices are
+stored sorted by cell, row-major, so a bounding box resolves to one contiguous
+slice per grid row. When more nodes fall inside the box than the client asked
+for, level-of-detail thinning bins them on a coarse screen grid and keeps the
+highest-priority nodes of every bin first. Zoomed-out views therefore stay
+spread across the whole box instead of clustering in one corner.
+
+Indexes are cached in memory and rebuilt when the stored layout version
+changes.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .graph_export import STRUCTURAL_REL_TYPES
+from .graph_layout import get_layout_version, layout_scope, load_layout, load_property_positions
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+TARGET_NODES_PER_CELL = 32
+# Layouts read from node x/y properties carry no version; re-read them this often
+PROPERTY_LAYOUT_TTL_SECONDS = 300
+
+PRIORITY_CYPHER = """
+MATCH (n:Entity)
+WHERE coalesce(n.id, n.name, elementId(n)) IN $node_ids
+RETURN coalesce(n.id, n.name, elementId(n)) AS id,
+       coalesce(n.significance, 0) AS significance,
+       COUNT { (n)-[r]-() WHERE NOT type(r) IN $structural_types } AS degree
+"""
+
+Bounds = Tuple[float, float, float, float]
+
+
+@dataclass
+class GridIndex:
+    """Uniform-grid index over one layout."""
+    node_ids: List[str]
+    index_of: Dict[str, int]
+    xs: np.ndarray
+    ys: np.ndarray
+    priority: np.ndarray
+    order: np.ndarray
+    cell_start: np.ndarray
+    min_x: float
+    min_y: float
+    cell_size: float
+    nx: int
+    ny: int
+    version: Optional[int]
+    built_at: float
+
+    @classmethod
+    def build(
+        cls,
+        node_ids: Sequence[str],
+        xs: Sequence[float],
+        ys: Sequence[float],
+        priority: Optional[Sequence[float]] = None,
+        version: Optional[int] = None,
+    ) -> "GridIndex":
+        x = np.asarray(xs, dtype=np.float32)
+        y = np.asarray(ys, dtype=np.float32)
+        n = len(x)
+        pri = np.zeros(n, dtype=np.float32) if priority is None else np.asarray(priority, dtype=np.float32)
+
+        if n:
+            min_x, max_x = float(x.min()), float(x.max())
+            min_y, max_y = float(y.min()), float(y.max())
+        else:
+            min_x = max_x = min_y = max_y = 0.0
+        width = max(max_x - min_x, 1e-6)
+        height = max(max_y - min_y, 1e-6)
+        cells = max(1, n // TARGET_NODES_PER_CELL)
+        cell_size = max(math.sqrt(width * height / cells), 1e-6)
+        nx = int(width // cell_size) + 1
+        ny = int(height // cell_size) + 1
+
+        cell = cls._cell_of(x, y, min_x, min_y, cell_size, nx, ny)
+        # Sort by cell, then by descending priority within the cell
+        order = np.lexsort((-pri, cell)).astype(np.int32)
+        counts = np.bincount(cell, minlength=nx * ny)
+        cell_start = np.zeros(nx * ny + 1, dtype=np.int64)
+        np.cumsum(counts, out=cell_start[1:])
+
+        return cls(
+            node_ids=list(node_ids), index_of={node_id: i for i, node_id in enumerate(node_ids)}, xs=x, ys=y, priority=pri, order=order,
+            cell_start=cell_start, min_x=min_x, min_y=min_y, cell_size=cell_size,
+            nx=nx, ny=ny, version=version, built_at=time.monotonic(),
+        )
+
+    @staticmethod
+    def _cell_of(x, y, min_x, min_y, cell_size, nx, ny) -> np.ndarray:
+        cx = np.clip(((x - min_x) // cell_size).astype(np.int64), 0, nx - 1)
+        cy = np.clip(((y - min_y) // cell_size).astype(np.int64), 0, ny - 1)
+        return cy * nx + cx
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def in_bounds(self, bounds: Optional[Bounds]) -> np.ndarray:
+        """Indices of nodes inside ``bounds`` (all nodes when bounds is None)."""
+        if bounds is None:
+            return self.order
+        min_x, min_y, max_x, max_y = bounds
+        cx0 = max(0, int((min_x - self.min_x) // self.cell_size))
+        cx1 = min(self.nx - 1, int((max_x - self.min_x) // self.cell_size))
+        cy0 = max(0, int((min_y - self.min_y) // self.cell_size))
+        cy1 = min(self.ny - 1, int((max_y - self.min_y) // self.cell_size))
+        if cx0 > cx1 or cy0 > cy1:
+            return np.empty(0, dtype=np.int32)
+
+        slices = [
+            self.order[self.cell_start[row * self.nx + cx0]: self.cell_start[row * self.nx + cx1 + 1]]
+            for row in range(cy0, cy1 + 1)
+        ]
+        candidates = np.concatenate(slices) if slices else np.empty(0, dtype=np.int32)
+        x = self.xs[candidates]
+        y = self.ys[candidates]
+        mask = (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+        return candidates[mask]
+
+    def query(self, bounds: Optional[Bounds], max_nodes: int) -> Tuple[np.ndarray, int]:
+        """Return (selected node indices, total nodes inside bounds) with LOD thinning."""
+        hits = self.in_bounds(bounds)
+        total = len(hits)
+        if total <= max_nodes:
+            return hits, total
+
+        x = self.xs[hits]
+        y = self.ys[hits]
+        if bounds is None:
+            min_x, min_y = float(x.min()), float(y.min())
+            max_x, max_y = float(x.max()), float(y.max())
+        else:
+            min_x, min_y, max_x, max_y = bounds
+
+        # Coarse screen grid with about one bin per node we may return
+        bins_per_side = max(1, int(math.ceil(math.sqrt(max_nodes))))
+        bx = np.clip(((x - min_x) / max(max_x - min_x, 1e-6) * bins_per_side).astype(np.int64), 0, bins_per_side - 1)
+        by = np.clip(((y - min_y) / max(max_y - min_y, 1e-6) * bins_per_side).astype(np.int64), 0, bins_per_side - 1)
+        screen_bin = by * bins_per_side + bx
+        pri = self.priority[hits]
+
+        # Rank every node within its bin by priority, then take rank 0 of every
+        # bin before rank 1 of any, highest priority first within a rank
+        by_bin = np.lexsort((-pri, screen_bin))
+        sorted_bins = screen_bin[by_bin]
+        group_start = np.flatnonzero(np.r_[True, sorted_bins[1:] != sorted_bins[:-1]])
+        group_sizes = np.diff(np.r_[group_start, len(sorted_bins)])
+        rank = np.empty(total, dtype=np.int64)
+        rank[by_bin] = np.arange(total) - np.repeat(group_start, group_sizes)
+
+        chosen = np.lexsort((-pri, rank))[:max_nodes]
+        return hits[chosen], total
+
+    def position(self, i: int) -> Tuple[float, float]:
+        return float(self.xs[i]), float(self.ys[i])
+
+
+class ViewportIndex:
+    """Per-scope cache of grid indexes, reloaded when the stored layout changes."""
+
+    def __init__(self) -> None:
+        self._indexes: Dict[str, GridIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, workspace_id: Optional[str] = None) -> Optional[GridIndex]:
+        scope = layout_scope(workspace_id)
+        version = get_layout_version(scope)
+        cached = self._indexes.get(scope)
+        if self._fresh(cached, version):
+            return cached
+
+        with self._lock:
+            cached = self._indexes.get(scope)
+            if self._fresh(cached, version):
+                return cached
+            layout = load_layout(scope) if version is not None else load_property_positions(workspace_id)
+            if layout is None:
+                self._indexes.pop(scope, None)
+                return None
+            index = GridIndex.build(
+                layout["node_ids"], layout["xs"], layout["ys"],
+                priority=self._priorities(layout["node_ids"]),
+                version=version,
+            )
+            self._indexes[scope] = index
+            logger.info(f"Viewport index for {scope} built: {len(index)} nodes, {index.nx}x{index.ny} grid")
+            return index
+
+    @staticmethod
+    def _fresh(cached: Optional[GridIndex], version: Optional[int]) -> bool:
+        if cached is None or cached.version != version:
+            return False
+        return version is not None or time.monotonic() - cached.built_at < PROPERTY_LAYOUT_TTL_SECONDS
+
+    def invalidate(self, workspace_id: Optional[str] = None) -> None:
+        self._indexes.pop(layout_scope(workspace_id), None)
+
+    @staticmethod
+    def _priorities(node_ids: List[str]) -> np.ndarray:
+        """Level-of-detail priority: significance plus log-scaled degree."""
+        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+            rows = session.run(PRIORITY_CYPHER, node_ids=node_ids, structural_types=STRUCTURAL_REL_TYPES)
+            scores: Dict[str, float] = {
+                r["id"]: float(r["significance"] or 0) + math.log1p(r["degree"] or 0) for r in rows
+            }
+        return np.array([scores.get(node_id, 0.0) for node_id in node_ids], dtype=np.float32)
+
+
+viewport_index = ViewportIndex()
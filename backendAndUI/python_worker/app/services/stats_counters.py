@@ -0,0 +1,331 @@
+"""Maintained review and workspace statistics.
+
+Counts are stored instead of recomputed per request:
+
+* every Workspace node carries ``document_count``, ``entity_count``,
+  ``relationship_count``, ``member_count`` and a review status breakdown
+  (``unverified_count``, ``verified_count``, ``incorrect_count``) over the
+  relationships between its entities;
+* ``(:ReviewStats {scope: '__global__'})`` holds the status breakdown over all
+  reviewable relationships.
+
+Review, manual annotation and membership paths adjust the counters in the same
+transaction as their change, using the Cypher fragments below. The ingestion
+path can pull existing relationships into a workspace when an entity joins
+it, so it recounts just the neighbourhood of the entities it wrote, before and
+after, and applies the difference. A background job reconciles everything
+periodically; counters that have never been reconciled are recounted on first
+read.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .graph_version import GLOBAL_SCOPE
+from .neo4j_client import neo4j_client
+from .review_queue import NON_REVIEW_REL_TYPES, quote_rel_type, review_rel_types
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("unverified", "verified", "incorrect")
+# Relationships between workspace entities that are not counted as workspace relationships
+WORKSPACE_EXCLUDED_REL_TYPES = ["BELONGS_TO", "EXTRACTED_FROM"]
+WORKSPACE_COUNTERS = ("document_count", "entity_count", "relationship_count", "member_count") + tuple(
+    f"{status}_count" for status in STATUSES
+)
+
+
+def _status_deltas(var: str, created_delta: bool) -> str:
+    """SET items moving one relationship from ``old_status`` to ``new_status`` on node ``var``.
+
+    With ``created_delta`` the boolean ``created`` must be in scope and also
+    counts the relationship itself.
+    """
+    items = [
+        f"{var}.{status}_count = coalesce({var}.{status}_count, 0)"
+        f" + CASE new_status WHEN '{status}' THEN 1 ELSE 0 END"
+        f" - CASE old_status WHEN '{status}' THEN 1 ELSE 0 END"
+        for status in STATUSES
+    ]
+    if created_delta:
+        items.append(
+            f"{var}.relationship_count = coalesce({var}.relationship_count, 0)"
+            f" + CASE WHEN created THEN 1 ELSE 0 END"
+        )
+    return ",\n            ".join(items)
+
+
+# Appended to a query with ``r``, ``old_status`` (null when ``r`` was just
+# created) and the new ``r.status`` in scope; needs STATUS_COUNTER_PARAMS.
+STATUS_COUNTERS_CYPHER = f"""
+CALL {{
+    WITH r, old_status
+    WITH r, old_status, r.status AS new_status
+    WHERE old_status IS NULL OR old_status <> new_status
+    MATCH (s)-[r]->(o)
+    CALL {{
+        WITH r, s, o, old_status, new_status
+        // Only review relationships count towards the status breakdown
+        WITH s, o, old_status IS NULL AS created, NOT type(r) IN $non_review_types AS reviewable, old_status, new_status
+        WITH s, o, created,
+             CASE WHEN reviewable THEN old_status END AS old_status,
+             CASE WHEN reviewable THEN new_status END AS new_status
+        MATCH (s)-[:BELONGS_TO]->(w:Workspace)<-[:BELONGS_TO]-(o)
+        SET {_status_deltas("w", created_delta=True)}
+    }}
+    CALL {{
+        WITH r, old_status, new_status
+        WITH r, old_status, new_status WHERE NOT type(r) IN $non_review_types
+        MATCH (g:ReviewStats {{scope: $stats_scope}})
+        SET {_status_deltas("g", created_delta=False)}
+    }}
+}}
+"""
+
+STATUS_COUNTER_PARAMS = {"non_review_types": sorted(NON_REVIEW_REL_TYPES), "stats_scope": GLOBAL_SCOPE}
+
+ADJUST_GLOBAL_CYPHER = """
+MATCH (g:ReviewStats {scope: $stats_scope})
+SET g.unverified_count = coalesce(g.unverified_count, 0) + $unverified,
+    g.verified_count = coalesce(g.verified_count, 0) + $verified,
+    g.incorrect_count = coalesce(g.incorrect_count, 0) + $incorrect
+"""
+
+# Counts over one write's neighbourhood in a workspace: the entities ``names``
+# plus everything extracted from the document, and their relationships to other
+# workspace entities. The difference before/after the write is its effect.
+LOCAL_COUNTS_CYPHER = """
+MATCH (w:Workspace {workspace_id: $workspace_id})
+CALL {
+    WITH w
+    CALL {
+        UNWIND $names AS name
+        MATCH (e:Entity {name: name})
+        RETURN e
+        UNION
+        MATCH (:Document {document_id: $document_id})<-[:EXTRACTED_FROM]-(e:Entity)
+        RETURN e
+    }
+    MATCH (e)-[:BELONGS_TO]->(w)
+    RETURN collect(DISTINCT e) AS entities
+}
+CALL {
+    WITH w
+    OPTIONAL MATCH (d:Document {document_id: $document_id})-[:BELONGS_TO]->(w)
+    RETURN count(d) AS document_count
+}
+CALL {
+    WITH w
+    OPTIONAL MATCH (u:User)-[:MEMBER_OF]->(w)
+    RETURN count(DISTINCT u) AS member_count
+}
+CALL {
+    WITH w, entities
+    UNWIND entities AS e
+    MATCH (e)-[rel]-(:Entity)-[:BELONGS_TO]->(w)
+    WHERE NOT type(rel) IN $excluded_types
+    WITH DISTINCT rel, NOT type(rel) IN $non_review_types AS reviewable
+    RETURN count(rel) AS relationship_count,
+           count(CASE WHEN reviewable AND coalesce(rel.status, 'unverified') = 'unverified' THEN 1 END) AS unverified_count,
+           count(CASE WHEN reviewable AND rel.status = 'verified' THEN 1 END) AS verified_count,
+           count(CASE WHEN reviewable AND rel.status = 'incorrect' THEN 1 END) AS incorrect_count
+}
+RETURN document_count, size(entities) AS entity_count, relationship_count, member_count,
+       unverified_count, verified_count, incorrect_count
+"""
+
+APPLY_LOCAL_DELTA_CYPHER = """
+MATCH (w:Workspace {workspace_id: $workspace_id})
+SET w.document_count = coalesce(w.document_count, 0) + $delta.document_count,
+    w.entity_count = coalesce(w.entity_count, 0) + $delta.entity_count,
+    w.relationship_count = coalesce(w.relationship_count, 0) + $delta.relationship_count,
+    w.member_count = coalesce(w.member_count, 0) + $delta.member_count,
+    w.unverified_count = coalesce(w.unverified_count, 0) + $delta.unverified_count,
+    w.verified_count = coalesce(w.verified_count, 0) + $delta.verified_count,
+    w.incorrect_count = coalesce(w.incorrect_count, 0) + $delta.incorrect_count
+"""
+
+# Setting stats_reconciled_at first takes the workspace's write lock, so
+# concurrent counter updates wait and apply on top of the recount
+RECONCILE_WORKSPACE_CYPHER = """
+MATCH (w:Workspace {workspace_id: $workspace_id})
+SET w.stats_reconciled_at = datetime()
+WITH w
+CALL {
+    WITH w
+    OPTIONAL MATCH (d:Document)-[:BELONGS_TO]->(w)
+    RETURN count(DISTINCT d) AS document_count
+}
+CALL {
+    WITH w
+    OPTIONAL MATCH (e:Entity)-[:BELONGS_TO]->(w)
+    RETURN count(DISTINCT e) AS entity_count
+}
+CALL {
+    WITH w
+    MATCH (e1:Entity)-[:BELONGS_TO]->(w)
+    MATCH (e1)-[rel]->(e2:Entity)-[:BELONGS_TO]->(w)
+    WHERE NOT type(rel) IN $excluded_types
+    WITH DISTINCT rel, NOT type(rel) IN $non_review_types AS reviewable
+    RETURN count(rel) AS relationship_count,
+           count(CASE WHEN reviewable AND coalesce(rel.status, 'unverified') = 'unverified' THEN 1 END) AS unverified_count,
+           count(CASE WHEN reviewable AND rel.status = 'verified' THEN 1 END) AS verified_count,
+           count(CASE WHEN reviewable AND rel.status = 'incorrect' THEN 1 END) AS incorrect_count
+}
+CALL {
+    WITH w
+    OPTIONAL MATCH (u:User)-[:MEMBER_OF]->(w)
+    RETURN count(DISTINCT u) AS member_count
+}
+SET w.document_count = document_count,
+    w.entity_count = entity_count,
+    w.relationship_count = relationship_count,
+    w.member_count = member_count,
+    w.unverified_count = unverified_count,
+    w.verified_count = verified_count,
+    w.incorrect_count = incorrect_count
+"""
+
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def _zero_statuses() -> Dict[str, int]:
+    return {status: 0 for status in STATUSES}
+
+
+def adjust_global_review_counts_tx(tx, deltas: Dict[str, int]) -> None:
+    """Add per-status deltas (e.g. newly written relationships) to the global review counts."""
+    if any(deltas.values()):
+        tx.run(ADJUST_GLOBAL_CYPHER, stats_scope=GLOBAL_SCOPE, **{**_zero_statuses(), **deltas})
+
+
+def lock_workspace_tx(tx, workspace_id: str) -> None:
+    """Take the workspace's write lock so concurrent writers count its neighbourhood one at a time."""
+    tx.run("MATCH (w:Workspace {workspace_id: $workspace_id}) SET w.updated_at = datetime()", workspace_id=workspace_id).consume()
+
+
+def local_workspace_counts_tx(tx, workspace_id: str, document_id: str, names: Iterable[str]) -> Dict[str, int]:
+    record = tx.run(
+        LOCAL_COUNTS_CYPHER,
+        workspace_id=workspace_id,
+        document_id=document_id,
+        names=sorted({name for name in names if name}),
+        excluded_types=WORKSPACE_EXCLUDED_REL_TYPES,
+        non_review_types=STATUS_COUNTER_PARAMS["non_review_types"],
+    ).single()
+    return {key: (record[key] if record else 0) for key in WORKSPACE_COUNTERS}
+
+
+def apply_local_workspace_delta_tx(tx, workspace_id: str, before: Dict[str, int], after: Dict[str, int]) -> None:
+    delta = {key: after[key] - before.get(key, 0) for key in after}
+    if any(delta.values()):
+        tx.run(APPLY_LOCAL_DELTA_CYPHER, workspace_id=workspace_id, delta=delta)
+
+
+def reconcile_workspace_stats(workspace_id: str) -> None:
+    neo4j_client.execute_write(lambda tx: tx.run(
+        RECONCILE_WORKSPACE_CYPHER,
+        workspace_id=workspace_id,
+        excluded_types=WORKSPACE_EXCLUDED_REL_TYPES,
+        non_review_types=STATUS_COUNTER_PARAMS["non_review_types"],
+    ).consume())
+
+
+def reconcile_review_stats() -> Dict[str, int]:
+    """Recount the global review status breakdown over every reviewable relationship type."""
+    rel_types = review_rel_types()
+
+    def work(tx):
+        # Lock the counter node before counting, as for workspaces
+        tx.run(
+            "MERGE (g:ReviewStats {scope: $stats_scope}) SET g.reconciled_at = datetime()",
+            stats_scope=GLOBAL_SCOPE,
+        ).consume()
+        counts = _zero_statuses()
+        for rel_type in rel_types:
+            for record in tx.run(
+                f"MATCH (:Entity)-[r:{quote_rel_type(rel_type)}]->(:Entity) "
+                "RETURN coalesce(r.status, 'unverified') AS status, count(r) AS count"
+            ):
+                if record["status"] in counts:
+                    counts[record["status"]] += record["count"]
+        tx.run(
+            "MATCH (g:ReviewStats {scope: $stats_scope}) "
+            "SET g.unverified_count = $unverified, g.verified_count = $verified, g.incorrect_count = $incorrect",
+            stats_scope=GLOBAL_SCOPE, **counts,
+        ).consume()
+        return counts
+
+    return neo4j_client.execute_write(work)
+
+
+def reconcile_all_stats() -> int:
+    """Reconcile the global review counts and every workspace's counters; returns the workspace count."""
+    reconcile_review_stats()
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        workspace_ids = [r["workspace_id"] for r in session.run("MATCH (w:Workspace) RETURN w.workspace_id AS workspace_id")]
+    for workspace_id in workspace_ids:
+        try:
+            reconcile_workspace_stats(workspace_id)
+        except Exception as exc:
+            logger.warning(f"Stats reconciliation failed for workspace {workspace_id}: {exc}")
+    logger.info(f"Statistics reconciled for {len(workspace_ids)} workspaces")
+    return len(workspace_ids)
+
+
+def start_stats_reconciler() -> None:
+    """Reconcile all counters every ``stats_reconcile_seconds`` in a daemon thread."""
+    global _scheduler_started
+    with _scheduler_lock:
+        if _scheduler_started:
+            return
+        _scheduler_started = True
+
+    def loop():
+        while True:
+            try:
+                reconcile_all_stats()
+            except Exception as exc:
+                logger.warning(f"Statistics reconciliation failed: {exc}")
+            time.sleep(settings.stats_reconcile_seconds)
+
+    threading.Thread(target=loop, name="stats-reconciler", daemon=True).start()
+
+
+def workspace_stats_from_node(w: Any) -> Optional[Dict[str, int]]:
+    """Counters stored on a Workspace node, or None if they were never reconciled."""
+    if w.get("stats_reconciled_at") is None:
+        return None
+    return {key: max(w.get(key) or 0, 0) for key in WORKSPACE_COUNTERS}
+
+
+def get_workspace_counters(workspace_id: str) -> Dict[str, int]:
+    """A workspace's counters, reconciling them first if they were never computed."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run("MATCH (w:Workspace {workspace_id: $workspace_id}) RETURN w", workspace_id=workspace_id).single()
+    if record is None:
+        return {key: 0 for key in WORKSPACE_COUNTERS}
+    counters = workspace_stats_from_node(record["w"])
+    if counters is None:
+        reconcile_workspace_stats(workspace_id)
+        return get_workspace_counters(workspace_id)
+    return counters
+
+
+def get_review_counts() -> Dict[str, int]:
+    """Global review status breakdown, reconciling it first if it was never computed."""
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        record = session.run(
+            "MATCH (g:ReviewStats {scope: $stats_scope}) WHERE g.reconciled_at IS NOT NULL "
+            "RETURN g.unverified_count AS unverified, g.verified_count AS verified, g.incorrect_count AS incorrect",
+            stats_scope=GLOBAL_SCOPE,
+        ).single()
+    if record is None:
+        return reconcile_review_stats()
+    return {status: max(record[status] or 0, 0) for status in STATUSES}
@@ -0,0 +1,87 @@
+"""Materialized transitive IS_A closure.
+
+Every entity carries ``ancestor_keys``: the names of the concepts it reaches
+through one to five IS_A hops. Read paths that include the type ancestors of a
+workspace's entities unwind this list and look the ancestors up by name
+instead of expanding ``[:IS_A*1..5]`` per request and per node.
+
+The write path refreshes the closure of the entities it gives types to, in the
+same transaction. Only when an entity's ancestors actually change are its
+descendants refreshed too, so writes that merely repeat known types stay cheap.
+``rebuild_type_closure`` fills in the property for data written before it
+existed.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable, List
+
+from .neo4j_client import neo4j_client
+from ..core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 5
+REBUILD_BATCH_SIZE = 2000
+
+REFRESH_CYPHER = f"""
+UNWIND $names AS name
+MATCH (root:Entity {{name: name}})
+OPTIONAL MATCH (root)-[:IS_A*1..{MAX_DEPTH}]->(ancestor:Concept)
+WHERE ancestor <> root
+WITH root, collect(DISTINCT ancestor.name) AS keys
+WITH root, keys, root.ancestor_keys AS previous
+WHERE previous IS NULL OR size(keys) <> size(previous) OR any(key IN keys WHERE NOT key IN previous)
+SET root.ancestor_keys = keys
+RETURN collect(root.name) AS changed
+"""
+
+DESCENDANTS_CYPHER = f"""
+UNWIND $names AS name
+MATCH (child:Entity)-[:IS_A*1..{MAX_DEPTH}]->(:Entity {{name: name}})
+RETURN collect(DISTINCT child.name) AS descendants
+"""
+
+MISSING_CYPHER = """
+MATCH (n:Entity) WHERE n.ancestor_keys IS NULL AND n.name IS NOT NULL
+RETURN n.name AS name LIMIT $batch
+"""
+
+
+def refresh_type_closure_tx(tx, names: Iterable[str], include_descendants: bool = False) -> List[str]:
+    """Recompute ``ancestor_keys`` for ``names`` inside ``tx``; returns the names whose closure changed.
+
+    Descendants are refreshed when an entity's ancestors changed, or always
+    with ``include_descendants`` (e.g. after a merge renamed an ancestor).
+    """
+    names = sorted({name for name in names if name})
+    if not names:
+        return []
+    changed = tx.run(REFRESH_CYPHER, names=names).single()["changed"]
+    roots = names if include_descendants else changed
+    if roots:
+        descendants = tx.run(DESCENDANTS_CYPHER, names=roots).single()["descendants"]
+        if descendants:
+            changed += tx.run(REFRESH_CYPHER, names=descendants).single()["changed"]
+    return changed
+
+
+def refresh_type_closure(names: Iterable[str], include_descendants: bool = False) -> List[str]:
+    names = list(names)
+    return neo4j_client.execute_write(lambda tx: refresh_type_closure_tx(tx, names, include_descendants))
+
+
+def rebuild_type_closure(batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Set ``ancestor_keys`` on every entity that lacks it; returns the number of entities updated."""
+    total = 0
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        while True:
+            names = [r["name"] for r in session.run(MISSING_CYPHER, batch=batch_size)]
+            if not names:
+                break
+            total += len(session.execute_write(
+                lambda tx: tx.run(REFRESH_CYPHER, names=names).single()["changed"]
+            ))
+    logger.info(f"Type closure rebuilt for {total} entities")
+    return total
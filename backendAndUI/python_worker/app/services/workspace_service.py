@@ -18,6 +18,8 @@ from ..models.workspace import (
     UpdateMemberRequest,
 )
 from .neo4j_client import neo4j_client
+from .permission_cache import permission_cache
+from .stats_counters import get_workspace_counters, workspace_stats_from_node
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,24 @@ COLLABORATIVE_PRIVACIES = {"public", "shared", "organization"}
 SHARED_OPEN_WRITE_PERMISSIONS = {"view", "add_documents", "edit_relationships"}
 OWNER_PERMISSIONS = ["view", "add_documents", "edit_relationships", "invite_others", "manage_workspace"]
 
+# Appended to a query with ``w`` in scope: collects its members as ``members``
+WORKSPACE_MEMBERS_SUBQUERY = """
+CALL {
+    WITH w
+    MATCH (u:User)-[m:MEMBER_OF]->(w)
+    RETURN collect({user: u, membership: m}) AS members
+}
+"""
+
+
+def _to_datetime(value):
+    """Neo4j temporal values and ISO strings to native datetimes."""
+    if hasattr(value, 'to_native'):
+        return value.to_native()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
+
 
 class WorkspaceService:
     """Service for managing workspaces."""
@@ -49,7 +69,15 @@ class WorkspaceService:
                     created_by: $user_id,
                     created_at: datetime($created_at),
                     updated_at: datetime($created_at),
-                    archived: false
+                    archived: false,
+                    document_count: 0,
+                    entity_count: 0,
+                    relationship_count: 0,
+                    member_count: 0,
+                    unverified_count: 0,
+                    verified_count: 0,
+                    incorrect_count: 0,
+                    stats_reconciled_at: datetime($created_at)
                 })
                 """,
                 workspace_id=workspace_id,
@@ -78,6 +106,7 @@ class WorkspaceService:
                     permissions: $permissions,
                     joined_at: datetime($joined_at)
                 }]->(w)
+                SET w.member_count = coalesce(w.member_count, 0) + 1
                 """,
                 user_id=user_id,
                 user_email=user_email,
@@ -100,9 +129,9 @@ class WorkspaceService:
             result = session.run(
                 """
                 MATCH (w:Workspace {workspace_id: $workspace_id})
-                OPTIONAL MATCH (u:User)-[m:MEMBER_OF]->(w)
-                WHERE u.user_id = $user_id
-                RETURN w, m
+                OPTIONAL MATCH (:User {user_id: $user_id})-[m:MEMBER_OF]->(w)
+                """ + WORKSPACE_MEMBERS_SUBQUERY + """
+                RETURN w, m, members
                 """,
                 workspace_id=workspace_id,
                 user_id=user_id,
@@ -113,51 +142,20 @@ class WorkspaceService:
                 return None
 
             w = record["w"]
-            membership = record["m"]
-            privacy = w.get("privacy", "private")
-
-            if not membership and privacy not in COLLABORATIVE_PRIVACIES:
+            if not record["m"] and w.get("privacy", "private") not in COLLABORATIVE_PRIVACIES:
                 # User is not a member and workspace is not openly shared
                 return None
 
-            # Get members
-            members = WorkspaceService._get_workspace_members(workspace_id)
-
-            # Get stats
-            stats = WorkspaceService._get_workspace_stats(workspace_id)
-
-            # Handle datetime fields - they might be datetime objects or ISO strings
-            created_at = w["created_at"]
-            if hasattr(created_at, 'to_native'):
-                created_at = created_at.to_native()
-            elif isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            
-            updated_at = w.get("updated_at")
-            if updated_at:
-                if hasattr(updated_at, 'to_native'):
-                    updated_at = updated_at.to_native()
-                elif isinstance(updated_at, str):
-                    updated_at = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-            
-            return Workspace(
-                workspace_id=w["workspace_id"],
-                name=w["name"],
-                description=w.get("description"),
-                icon=w.get("icon", "📊"),
-                color=w.get("color", "#3B82F6"),
-                privacy=privacy,
-                created_by=w["created_by"],
-                created_at=created_at,
-                updated_at=updated_at,
-                archived=w.get("archived", False),
-                members=members,
-                stats=stats,
-            )
+        return WorkspaceService._workspace_from_record(w, record["members"])
 
     @staticmethod
     def list_user_workspaces(user_id: str, include_archived: bool = False) -> List[Workspace]:
-        """List all workspaces for a user (includes workspaces they're members of AND public workspaces)."""
+        """
+        List all workspaces for a user (includes workspaces they're members of AND public workspaces).
+
+        One query returns every workspace with its members; stats are the
+        counters stored on the workspace node.
+        """
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
             query = """
             MATCH (w:Workspace)
@@ -168,56 +166,38 @@ class WorkspaceService:
                   MATCH (:User {user_id: $user_id})-[:MEMBER_OF]->(w)
                 }
               )
-            OPTIONAL MATCH (u:User {user_id: $user_id})-[m:MEMBER_OF]->(w)
-            RETURN DISTINCT w, m
+            """ + WORKSPACE_MEMBERS_SUBQUERY + """
+            RETURN w, members
             ORDER BY w.updated_at DESC
             """
 
-            result = session.run(
+            records = list(session.run(
                 query,
                 user_id=user_id,
                 archived=False,
                 include_archived=include_archived,
                 collaborative_privacies=sorted(COLLABORATIVE_PRIVACIES),
-            )
+            ))
 
-            workspaces = []
-            for record in result:
-                w = record["w"]
-                members = WorkspaceService._get_workspace_members(w["workspace_id"])
-                stats = WorkspaceService._get_workspace_stats(w["workspace_id"])
-
-                # Handle datetime fields - they might be datetime objects or ISO strings
-                created_at = w["created_at"]
-                if hasattr(created_at, 'to_native'):
-                    created_at = created_at.to_native()
-                elif isinstance(created_at, str):
-                    created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                
-                updated_at = w.get("updated_at")
-                if updated_at:
-                    if hasattr(updated_at, 'to_native'):
-                        updated_at = updated_at.to_native()
-                    elif isinstance(updated_at, str):
-                        updated_at = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-
-                workspace = Workspace(
-                    workspace_id=w["workspace_id"],
-                    name=w["name"],
-                    description=w.get("description"),
-                    icon=w.get("icon", "📊"),
-                    color=w.get("color", "#3B82F6"),
-                    privacy=w.get("privacy", "private"),
-                    created_by=w["created_by"],
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    archived=w.get("archived", False),
-                    members=members,
-                    stats=stats,
-                )
-                workspaces.append(workspace)
-
-            return workspaces
+        return [WorkspaceService._workspace_from_record(r["w"], r["members"]) for r in records]
+
+    @staticmethod
+    def _workspace_from_record(w, members: List[dict]) -> Workspace:
+        """Build a Workspace from its node and the ``members`` list of WORKSPACE_MEMBERS_SUBQUERY."""
+        return Workspace(
+            workspace_id=w["workspace_id"],
+            name=w["name"],
+            description=w.get("description"),
+            icon=w.get("icon", "📊"),
+            color=w.get("color", "#3B82F6"),
+            privacy=w.get("privacy", "private"),
+            created_by=w["created_by"],
+            created_at=_to_datetime(w["created_at"]),
+            updated_at=_to_datetime(w.get("updated_at")),
+            archived=w.get("archived", False),
+            members=[WorkspaceService._member_from_record(m["user"], m["membership"]) for m in members],
+            stats=WorkspaceService._get_workspace_stats(w["workspace_id"], w),
+        )
 
     @staticmethod
     def get_workspace_metadata(workspace_id: str, user_id: str) -> Optional[Dict[str, object]]:
@@ -225,7 +205,15 @@ class WorkspaceService:
         Fetch a lightweight snapshot of workspace metadata suitable for serialization.
 
         Used by ingestion flows to validate and, if necessary, recreate workspace nodes.
+        Access and metadata are served from the permission cache when possible.
         """
+        access = WorkspaceService._workspace_access(workspace_id, user_id)
+        if not access["exists"] or (access["role"] is None and access["privacy"] not in COLLABORATIVE_PRIVACIES):
+            return None
+        cached = permission_cache.get_metadata(workspace_id)
+        if cached is not None:
+            return cached
+
         workspace = WorkspaceService.get_workspace(workspace_id, user_id)
         if not workspace:
             return None
@@ -276,6 +264,7 @@ class WorkspaceService:
                 "last_name": None,
             }
 
+        permission_cache.set_metadata(workspace_id, metadata)
         return metadata
 
     @staticmethod
@@ -313,6 +302,7 @@ class WorkspaceService:
                 workspace_id=workspace_id,
                 **updates,
             )
+        permission_cache.invalidate(workspace_id)
 
         logger.info(f"Updated workspace {workspace_id}")
         return WorkspaceService.get_workspace(workspace_id, user_id)
@@ -345,6 +335,7 @@ class WorkspaceService:
                 """,
                 workspace_id=workspace_id,
             )
+        permission_cache.invalidate(workspace_id)
 
         logger.info(f"Deleted workspace {workspace_id}")
         return True
@@ -407,32 +398,7 @@ class WorkspaceService:
                 return False
 
             # Set default permissions based on role
-            permissions = request.permissions
-            if not permissions:
-                if request.role == "owner":
-                    permissions = WorkspacePermissions(
-                        view=True,
-                        add_documents=True,
-                        edit_relationships=True,
-                        invite_others=True,
-                        manage_workspace=True,
-                    )
-                elif request.role == "editor":
-                    permissions = WorkspacePermissions(
-                        view=True,
-                        add_documents=True,
-                        edit_relationships=True,
-                        invite_others=False,
-                        manage_workspace=False,
-                    )
-                else:  # viewer
-                    permissions = WorkspacePermissions(
-                        view=True,
-                        add_documents=False,
-                        edit_relationships=False,
-                        invite_others=False,
-                        manage_workspace=False,
-                    )
+            permissions = request.permissions or WorkspaceService._default_permissions(request.role)
 
             # Add member
             session.run(
@@ -444,13 +410,15 @@ class WorkspaceService:
                     permissions: $permissions,
                     joined_at: datetime()
                 }]->(w)
-                SET w.updated_at = datetime()
+                SET w.updated_at = datetime(),
+                    w.member_count = coalesce(w.member_count, 0) + 1
                 """,
                 user_id=user_id,
                 workspace_id=workspace_id,
                 role=request.role,
                 permissions=permissions.dict(),
             )
+        permission_cache.invalidate(workspace_id, user_id)
 
         logger.info(f"Added user {user_id} to workspace {workspace_id}")
         return True
@@ -469,9 +437,11 @@ class WorkspaceService:
                 """
                 MATCH (u:User {user_id: $member_id})-[m:MEMBER_OF]->(w:Workspace {workspace_id: $workspace_id})
                 WHERE m.role <> 'owner'
-                DELETE m
-                SET w.updated_at = datetime()
-                RETURN count(m) as removed
+                WITH w, collect(m) AS memberships
+                FOREACH (m IN memberships | DELETE m)
+                SET w.updated_at = datetime(),
+                    w.member_count = coalesce(w.member_count, 0) - size(memberships)
+                RETURN size(memberships) as removed
                 """,
                 member_id=member_id,
                 workspace_id=workspace_id,
@@ -479,98 +449,128 @@ class WorkspaceService:
 
             record = result.single()
             if record and record["removed"] > 0:
+                permission_cache.invalidate(workspace_id, member_id)
                 logger.info(f"Removed user {member_id} from workspace {workspace_id}")
                 return True
 
         return False
 
     @staticmethod
-    def _get_workspace_members(workspace_id: str) -> List[WorkspaceMember]:
-        """Get all members of a workspace."""
+    def update_member(workspace_id: str, updater_id: str, member_id: str, request: UpdateMemberRequest) -> bool:
+        """Change a member's role and/or permissions (the owner cannot be changed).
+
+        Requires ``manage_workspace``; members cannot change their own membership.
+        """
+        if member_id == updater_id:
+            logger.warning(f"User {updater_id} cannot update their own membership of workspace {workspace_id}")
+            return False
+        if not WorkspaceService._user_has_permission(workspace_id, updater_id, 'manage_workspace'):
+            logger.warning(f"User {updater_id} does not have permission to update members of workspace {workspace_id}")
+            return False
+
+        permissions = request.permissions
+        if permissions is None and request.role:
+            permissions = WorkspaceService._default_permissions(request.role)
+        permission_names = (
+            [name for name, allowed in permissions.model_dump().items() if allowed] if permissions else None
+        )
+
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
             result = session.run(
                 """
-                MATCH (u:User)-[m:MEMBER_OF]->(w:Workspace {workspace_id: $workspace_id})
-                RETURN u, m
+                MATCH (u:User {user_id: $member_id})-[m:MEMBER_OF]->(w:Workspace {workspace_id: $workspace_id})
+                WHERE m.role <> 'owner'
+                SET m.role = coalesce($role, m.role),
+                    m.permissions = coalesce($permissions, m.permissions),
+                    w.updated_at = datetime()
+                RETURN count(m) as updated
                 """,
+                member_id=member_id,
                 workspace_id=workspace_id,
+                role=request.role,
+                permissions=permission_names,
             )
 
-            members = []
-            for record in result:
-                u = record["u"]
-                m = record["m"]
-
-                # Parse permissions
-                perms_dict = m.get("permissions", {})
-                if isinstance(perms_dict, list):
-                    # Old format: list of permission strings
-                    permissions = WorkspacePermissions(
-                        view='view' in perms_dict,
-                        add_documents='add_documents' in perms_dict,
-                        edit_relationships='edit_relationships' in perms_dict,
-                        invite_others='invite_others' in perms_dict,
-                        manage_workspace='manage_workspace' in perms_dict,
-                    )
-                else:
-                    # New format: dict
-                    permissions = WorkspacePermissions(**perms_dict)
-
-                member = WorkspaceMember(
-                    user_id=u["user_id"],
-                    user_email=u.get("user_email", ""),
-                    user_first_name=u.get("user_first_name"),
-                    user_last_name=u.get("user_last_name"),
-                    role=m["role"],
-                    permissions=permissions,
-                    joined_at=m["joined_at"].to_native(),
-                    online=False,  # TODO: Implement presence
-                )
-                members.append(member)
-
-            return members
+            record = result.single()
+            if record and record["updated"] > 0:
+                permission_cache.invalidate(workspace_id, member_id)
+                logger.info(f"Updated user {member_id} in workspace {workspace_id}")
+                return True
+
+        return False
 
     @staticmethod
-    def _get_workspace_stats(workspace_id: str) -> WorkspaceStats:
-        """Get statistics for a workspace."""
-        with neo4j_client._driver.session(database=settings.neo4j_database) as session:
-            result = session.run(
-                """
-                MATCH (w:Workspace {workspace_id: $workspace_id})
-                OPTIONAL MATCH (d:Document)-[:BELONGS_TO]->(w)
-                OPTIONAL MATCH (e:Entity)-[:BELONGS_TO]->(w)
-                OPTIONAL MATCH (e1:Entity)-[:BELONGS_TO]->(w)
-                OPTIONAL MATCH (e2:Entity)-[:BELONGS_TO]->(w)
-                OPTIONAL MATCH (e1)-[rel]->(e2)
-                WHERE type(rel) <> 'BELONGS_TO' AND type(rel) <> 'EXTRACTED_FROM'
-                WITH w, 
-                     count(DISTINCT d) as doc_count, 
-                     count(DISTINCT e) as entity_count,
-                     count(DISTINCT rel) as rel_count
-                OPTIONAL MATCH (u:User)-[:MEMBER_OF]->(w)
-                RETURN 
-                    doc_count, 
-                    entity_count, 
-                    rel_count, 
-                    count(DISTINCT u) as member_count
-                """,
-                workspace_id=workspace_id,
+    def _default_permissions(role: str) -> WorkspacePermissions:
+        """Permissions a role gets when none are given explicitly."""
+        if role == "owner":
+            return WorkspacePermissions(
+                view=True,
+                add_documents=True,
+                edit_relationships=True,
+                invite_others=True,
+                manage_workspace=True,
             )
+        if role == "editor":
+            return WorkspacePermissions(
+                view=True,
+                add_documents=True,
+                edit_relationships=True,
+                invite_others=False,
+                manage_workspace=False,
+            )
+        # viewer
+        return WorkspacePermissions(
+            view=True,
+            add_documents=False,
+            edit_relationships=False,
+            invite_others=False,
+            manage_workspace=False,
+        )
 
-            record = result.single()
-            if record:
-                return WorkspaceStats(
-                    document_count=record["doc_count"] or 0,
-                    entity_count=record["entity_count"] or 0,
-                    relationship_count=record["rel_count"] or 0,
-                    member_count=record["member_count"] or 0,
-                )
+    @staticmethod
+    def _member_from_record(u, m) -> WorkspaceMember:
+        """Build a WorkspaceMember from a User node and its MEMBER_OF relationship."""
+        # Parse permissions
+        perms_dict = m.get("permissions", {})
+        if isinstance(perms_dict, list):
+            # Old format: list of permission strings
+            permissions = WorkspacePermissions(
+                view='view' in perms_dict,
+                add_documents='add_documents' in perms_dict,
+                edit_relationships='edit_relationships' in perms_dict,
+                invite_others='invite_others' in perms_dict,
+                manage_workspace='manage_workspace' in perms_dict,
+            )
+        else:
+            # New format: dict
+            permissions = WorkspacePermissions(**perms_dict)
+
+        return WorkspaceMember(
+            user_id=u["user_id"],
+            user_email=u.get("user_email", ""),
+            user_first_name=u.get("user_first_name"),
+            user_last_name=u.get("user_last_name"),
+            role=m["role"],
+            permissions=permissions,
+            joined_at=m["joined_at"].to_native(),
+            online=False,  # TODO: Implement presence
+        )
 
-        return WorkspaceStats()
+    @staticmethod
+    def _get_workspace_stats(workspace_id: str, w=None) -> WorkspaceStats:
+        """Get statistics for a workspace from its maintained counters (see stats_counters)."""
+        counters = workspace_stats_from_node(w) if w is not None else None
+        if counters is None:
+            counters = get_workspace_counters(workspace_id)
+        return WorkspaceStats(**counters)
 
     @staticmethod
-    def _user_has_permission(workspace_id: str, user_id: str, permission: str) -> bool:
-        """Check if user has a specific permission in workspace."""
+    def _workspace_access(workspace_id: str, user_id: str) -> Dict[str, object]:
+        """A user's role and permissions in a workspace plus its privacy, via the permission cache."""
+        access = permission_cache.get_access(workspace_id, user_id)
+        if access is not None:
+            return access
+
         with neo4j_client._driver.session(database=settings.neo4j_database) as session:
             result = session.run(
                 """
@@ -581,33 +581,49 @@ class WorkspaceService:
                 user_id=user_id,
                 workspace_id=workspace_id,
             )
-
             record = result.single()
-            if not record:
-                return False
 
-            privacy = record.get("privacy") or "private"
-            role = record.get("role")
-            perms_data = record.get("permissions")
-
-            if role is None:
-                normalized_privacy = privacy.lower()
-                # Allow read-only access to collaborative workspaces without explicit membership
-                if permission == 'view' and normalized_privacy in COLLABORATIVE_PRIVACIES:
-                    return True
-                # Shared workspaces enable collaborative editing even without explicit membership
-                if normalized_privacy == "shared" and permission in SHARED_OPEN_WRITE_PERMISSIONS:
-                    return True
-                return False
+        if record:
+            access = {
+                "exists": True,
+                "privacy": record.get("privacy") or "private",
+                "role": record.get("role"),
+                "permissions": record.get("permissions"),
+            }
+        else:
+            access = {"exists": False, "privacy": None, "role": None, "permissions": None}
+        permission_cache.set_access(workspace_id, user_id, access)
+        return access
+
+    @staticmethod
+    def _user_has_permission(workspace_id: str, user_id: str, permission: str) -> bool:
+        """Check if user has a specific permission in workspace."""
+        access = WorkspaceService._workspace_access(workspace_id, user_id)
+        if not access["exists"]:
+            return False
 
-            # Owner has all permissions
-            if role == "owner":
+        privacy = access["privacy"]
+        role = access["role"]
+        perms_data = access["permissions"]
+
+        if role is None:
+            normalized_privacy = privacy.lower()
+            # Allow read-only access to collaborative workspaces without explicit membership
+            if permission == 'view' and normalized_privacy in COLLABORATIVE_PRIVACIES:
+                return True
+            # Shared workspaces enable collaborative editing even without explicit membership
+            if normalized_privacy == "shared" and permission in SHARED_OPEN_WRITE_PERMISSIONS:
                 return True
+            return False
+
+        # Owner has all permissions
+        if role == "owner":
+            return True
 
-            if isinstance(perms_data, list):
-                return permission in perms_data
-            if isinstance(perms_data, dict):
-                return perms_data.get(permission, False)
+        if isinstance(perms_data, list):
+            return permission in perms_data
+        if isinstance(perms_data, dict):
+            return perms_data.get(permission, False)
 
         return False
 
@@ -0,0 +1,56 @@
+from app.services.graph_projection import (
+    STATUS_UNVERIFIED,
+    STATUS_VERIFIED,
+    _Builder,
+    apply_changes,
+)
+
+
+def _edge(edge_id, source, target, status="unverified", significance=None):
+    return {
+        "id": edge_id,
+        "source": source,
+        "target": target,
+        "source_significance": None,
+        "target_significance": significance,
+        "type": "INHIBITS",
+        "confidence": 0.9,
+        "significance": 3,
+        "status": status,
+        "source_count": 1,
+        "polarity": "positive",
+    }
+
+
+def _base():
+    builder = _Builder()
+    builder.edge(_edge("e1", "A", "B"))
+    builder.edge(_edge("e2", "B", "C"))
+    return builder.freeze(version=1)
+
+
+def test_apply_changes_adds_node_without_touching_base():
+    base = _base()
+
+    updated = apply_changes(base, [_edge("e3", "C", "D", significance=4), _edge("e1", "A", "B", "verified")], version=2)
+
+    assert updated.node_ids == ["A", "B", "C", "D"]
+    assert updated.node_significance[updated.index_of["D"]] == 4
+    assert updated.edge_count == 3
+    assert updated.status[updated.edge_index["e1"]] == STATUS_VERIFIED
+    distance, _ = updated.bfs([updated.index_of["A"]], max_hops=3)
+    assert distance[updated.index_of["D"]] == 3
+
+    assert base.node_ids == ["A", "B", "C"]
+    assert "D" not in base.index_of and "e3" not in base.edge_index
+    assert base.status[base.edge_index["e1"]] == STATUS_UNVERIFIED
+    assert len(base.node_significance) == base.node_count
+
+
+def test_apply_changes_twice_in_a_row():
+    first = apply_changes(_base(), [_edge("e3", "C", "D")], version=2)
+    second = apply_changes(first, [_edge("e4", "D", "E")], version=3)
+
+    assert second.node_count == 5
+    assert second.edge_ids == ["e1", "e2", "e3", "e4"]
+    assert list(second.dst) == [1, 2, 3, 4]
@@ -6,6 +6,41 @@ CREATE CONSTRAINT entity_nodekey IF NOT EXISTS
 FOR (e:Entity)
 REQUIRE (e.name, e.type) IS NODE KEY;
 
+// Entities are looked up by name when resolving node ids
+CREATE INDEX entity_name IF NOT EXISTS
+FOR (e:Entity)
+ON (e.name);
+
+// Case-insensitive exact name resolution (name_lower = toLower(trim(name)))
+CREATE INDEX entity_name_lower IF NOT EXISTS
+FOR (e:Entity)
+ON (e.name_lower);
+
+// Change feed of the autocomplete index; set by every entity write
+CREATE INDEX entity_changed_at IF NOT EXISTS
+FOR (e:Entity)
+ON (e.changed_at);
+
+// Structural importance scores written by the centrality job, used for ranking
+CREATE INDEX entity_pagerank IF NOT EXISTS
+FOR (e:Entity)
+ON (e.pagerank);
+
+CREATE INDEX entity_betweenness IF NOT EXISTS
+FOR (e:Entity)
+ON (e.betweenness);
+
+// Review queue: one ReviewItem node per reviewable relationship, mirroring its
+// status and review_priority, so a single index serves every predicate
+// (see app/services/review_queue.py)
+CREATE CONSTRAINT review_item_relationship_unique IF NOT EXISTS
+FOR (i:ReviewItem)
+REQUIRE i.relationship_id IS UNIQUE;
+
+CREATE INDEX review_item_queue IF NOT EXISTS
+FOR (i:ReviewItem)
+ON (i.status, i.review_priority);
+
 // Documents
 // Each document has a unique, stable identifier
 CREATE CONSTRAINT document_id_unique IF NOT EXISTS
@@ -17,6 +52,20 @@ CREATE CONSTRAINT user_username_unique IF NOT EXISTS
 FOR (u:User)
 REQUIRE u.username IS UNIQUE;
 
+// Persisted graph layouts, one per workspace scope
+CREATE CONSTRAINT graph_layout_scope_unique IF NOT EXISTS
+FOR (l:GraphLayout)
+REQUIRE l.scope IS UNIQUE;
+
+// Community summaries, looked up by run and level
+CREATE INDEX community_run_level IF NOT EXISTS
+FOR (c:Community)
+ON (c.run_id, c.level, c.community_id);
+
+CREATE INDEX community_parent IF NOT EXISTS
+FOR (c:Community)
+ON (c.run_id, c.level, c.parent_id);
+
 // Full text search index for entities and documents
 CREATE FULLTEXT INDEX entity_search IF NOT EXISTS
 FOR (n:Entity|Document)
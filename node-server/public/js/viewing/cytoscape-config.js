@@ -160,8 +160,15 @@ export const cytoscapeStyles = [
   }
 ];
 
-export function getLayoutConfig(nodeCount) {
-  if (nodeCount > 200) {
+export function getLayoutConfig(nodeCount, hasPositions = false) {
+  if (hasPositions) {
+    // Every node carries a position from the server-side layout: just render it
+    return {
+      name: 'preset',
+      fit: true,
+      padding: 30
+    };
+  } else if (nodeCount > 200) {
     // Large graphs: use faster preset layout first, then refine
     return {
       name: 'cose',
@@ -297,7 +297,7 @@ export class GraphViewer {
     // First, add all nodes and track their IDs
     (data.nodes || []).forEach(n => {
       nodeIds.add(n.id);
-      elements.push({
+      const element = {
         data: {
           id: n.id,
           label: n.label || n.id,
@@ -305,7 +305,12 @@ export class GraphViewer {
           sources: n.sources,
           significance: n.significance
         }
-      });
+      };
+      // Positions from the server-side layout, when available
+      if (n.x != null && n.y != null) {
+        element.position = { x: n.x, y: n.y };
+      }
+      elements.push(element);
     });
     
     // Then add edges, but only if both source and target nodes exist
@@ -361,7 +366,8 @@ export class GraphViewer {
     
     // Apply layout
     const nodeCount = (data.nodes || []).length;
-    const layoutConfig = getLayoutConfig(nodeCount);
+    const hasPositions = nodeCount > 0 && (data.nodes || []).every(n => n.x != null && n.y != null);
+    const layoutConfig = getLayoutConfig(nodeCount, hasPositions);
     
     state.cy.resize();
     
@@ -0,0 +1,91 @@
+"""
+Benchmark /query/subgraph against growing selection sizes.
+
+Samples random entity names from the configured Neo4j database and times the
+subgraph queries for each selection size. With the single-pass expansion the
+time per selected node should stay roughly flat as the selection grows;
+``--legacy`` also times the old cartesian-product query (for small sizes only)
+to show the quadratic growth it replaced.
+
+Usage:
+    python scripts/benchmark_subgraph.py --sizes 100 500 1000 5000 10000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backendAndUI" / "python_worker"))
+
+from app.core.settings import settings
+from app.routes.query import MAX_SUBGRAPH_NODES, fetch_subgraph
+from app.services.neo4j_client import neo4j_client
+
+
+LEGACY_CYPHER = """
+MATCH (n:Concept)
+WHERE coalesce(n.id, n.name, elementId(n)) IN $node_ids
+WITH collect(n) as nodes
+UNWIND nodes as n1
+UNWIND nodes as n2
+OPTIONAL MATCH (n1)-[r]->(n2)
+RETURN count(DISTINCT r) AS relationships
+"""
+
+# The cartesian product gets impractically slow beyond this
+LEGACY_MAX_NODES = 2000
+
+
+def sample_names(session, count: int, seed: int):
+    names = [r["name"] for r in session.run("MATCH (e:Entity) RETURN e.name AS name")]
+    random.Random(seed).shuffle(names)
+    return names[:count]
+
+
+def time_call(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 5000, 10000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--legacy", action="store_true", help="Also time the old cartesian-product query")
+    args = parser.parse_args()
+
+    sizes = sorted(size for size in args.sizes if 0 < size <= MAX_SUBGRAPH_NODES)
+    with neo4j_client._driver.session(database=settings.neo4j_database) as session:
+        names = sample_names(session, sizes[-1], args.seed)
+        if len(names) < sizes[-1]:
+            print(f"Only {len(names)} entities available; larger sizes are capped")
+
+        print(f"{'nodes':>8} {'rels':>8} {'median ms':>10} {'us/node':>8}" + (f" {'legacy ms':>10}" if args.legacy else ""))
+        for size in sizes:
+            selection = names[:size]
+            result = fetch_subgraph(session, selection)
+            seconds = time_call(lambda: fetch_subgraph(session, selection), args.repeats)
+            line = (
+                f"{len(selection):>8} {len(result['relationships']):>8} "
+                f"{seconds * 1000:>10.1f} {seconds * 1e6 / max(len(selection), 1):>8.1f}"
+            )
+            if args.legacy:
+                if size <= LEGACY_MAX_NODES:
+                    legacy = time_call(lambda: session.run(LEGACY_CYPHER, node_ids=selection).consume(), args.repeats)
+                    line += f" {legacy * 1000:>10.1f}"
+                else:
+                    line += f" {'skipped':>10}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()